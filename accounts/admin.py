@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import User, QueuedEmail
 
 
 # admin.site.register(User)
@@ -9,3 +9,12 @@ from .models import User
 class UserAdmin(admin.ModelAdmin):
     """Userler"""
     readonly_fields = ("password",)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    """Növbədəki e-poçtlar"""
+    list_display = ("id", "recipients", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("recipients",)
+    readonly_fields = ("message", "last_error", "created", "sent_at")
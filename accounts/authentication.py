@@ -0,0 +1,63 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+def ensure_profile(user):
+    """
+    Profili olmayan user üçün profil yaratmaq.
+
+    User.save() profili özü yaradır, amma loaddata (raw save) və adi
+    bulk_create ilə yaradılan userlərin profili olmaya bilər.
+    """
+    Profile = apps.get_model('profiles', 'Profile')
+    try:
+        user.profile
+    except Profile.DoesNotExist:
+        user.profile = Profile.objects.get_or_create(user=user)[0]
+    return user
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """JWT autentifikasiyası, user profili ilə bir sorğuda yüklənir"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = User.objects.select_related('profile').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except User.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return ensure_profile(user)
+
+
+class ProfileTokenAuthentication(TokenAuthentication):
+    """Token autentifikasiyası, user profili ilə bir sorğuda yüklənir"""
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__profile').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (ensure_profile(token.user), token)
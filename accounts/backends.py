@@ -0,0 +1,22 @@
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .mail import enqueue_messages
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    E-poçtları dərhal göndərmək əvəzinə növbəyə yazır.
+
+    Mesajlar `send_queued_emails` komandası ilə QUEUED_EMAIL_BACKEND
+    vasitəsilə göndərilir.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        try:
+            return enqueue_messages(email_messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
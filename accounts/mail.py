@@ -0,0 +1,196 @@
+import base64
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_message(message):
+    """EmailMessage obyektini JSON-a çevirmək"""
+    attachments = []
+    for attachment in message.attachments:
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append([filename, base64.b64encode(content).decode(), mimetype])
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "reply_to": list(message.reply_to),
+        "headers": dict(message.extra_headers),
+        "alternatives": [list(alt) for alt in getattr(message, "alternatives", [])],
+        "attachments": attachments,
+        "content_subtype": message.content_subtype,
+    }
+
+
+def deserialize_message(data, connection=None):
+    """JSON-dan EmailMessage obyektinin yaradılması"""
+    message = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+        alternatives=[tuple(alt) for alt in data["alternatives"]],
+        connection=connection,
+    )
+    message.content_subtype = data.get("content_subtype", "plain")
+    for filename, content, mimetype in data["attachments"]:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+def enqueue_messages(email_messages):
+    """Mesajları göndərmə növbəsinə yazmaq"""
+    emails = []
+    for message in email_messages:
+        if not message.recipients():
+            continue
+        emails.append(QueuedEmail(
+            message=serialize_message(message),
+            recipients=", ".join(message.recipients()),
+        ))
+    QueuedEmail.objects.bulk_create(emails)
+    return len(emails)
+
+
+def get_retry_delay(attempts):
+    """Hər uğursuz cəhddən sonra gözləmə müddəti ikiqat artır"""
+    base = settings.QUEUED_EMAIL_RETRY_DELAY
+    return timedelta(seconds=base * 2 ** max(attempts - 1, 0))
+
+
+def claim_batch(batch_size):
+    """
+    Vaxtı çatmış e-poçtları götürmək.
+
+    Götürülən sətirlərin növbəti cəhd vaxtı irəli çəkilir ki, paralel işləyən
+    digər worker-lər onları eyni anda göndərməsin. Proses yarıda dayansa,
+    e-poçt bu müddət bitdikdən sonra yenidən göndəriləcək.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+                status=QueuedEmail.STATUS_QUEUED, next_attempt_at__lte=now
+            ).order_by("next_attempt_at", "id")[:batch_size]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + get_retry_delay(email.attempts)
+        QueuedEmail.objects.bulk_update(emails, ["attempts", "next_attempt_at"])
+    return emails
+
+
+class ConnectionPool:
+    """Açıq saxlanılan və təkrar istifadə olunan e-poçt bağlantıları"""
+
+    def __init__(self, size, backend=None, **kwargs):
+        self.size = size
+        self.backend = backend or settings.QUEUED_EMAIL_BACKEND
+        self.kwargs = kwargs
+        self._idle = queue.LifoQueue()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            connection = get_connection(self.backend, fail_silently=False, **self.kwargs)
+            connection.open()
+            return connection
+
+    def release(self, connection):
+        if self._idle.qsize() < self.size:
+            self._idle.put(connection)
+        else:
+            self.discard(connection)
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Failed to close mail connection", exc_info=True)
+
+    def close(self):
+        while True:
+            try:
+                self.discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def send_chunk(pool, emails):
+    """Bir bağlantı üzərindən bir neçə e-poçtun göndərilməsi"""
+    results = []
+    connection = None
+    for email in emails:
+        try:
+            if connection is None:
+                connection = pool.acquire()
+            deserialize_message(email.message, connection=connection).send()
+        except Exception as exc:
+            results.append((email, str(exc) or exc.__class__.__name__))
+            # Xətadan sonra bağlantının vəziyyəti məlum deyil
+            if connection is not None:
+                pool.discard(connection)
+                connection = None
+        else:
+            results.append((email, None))
+    if connection is not None:
+        pool.release(connection)
+    return results
+
+
+def deliver_queued_emails(pool, batch_size=None):
+    """Növbədəki e-poçtların bir partiyasını göndərmək"""
+    batch_size = batch_size or settings.QUEUED_EMAIL_BATCH_SIZE
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    chunks = [emails[i::pool.size] for i in range(pool.size)]
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        results = [
+            result
+            for chunk_results in executor.map(lambda chunk: send_chunk(pool, chunk), chunks)
+            for result in chunk_results
+        ]
+
+    now = timezone.now()
+    max_attempts = settings.QUEUED_EMAIL_MAX_ATTEMPTS
+    sent_ids = [email.id for email, error in results if error is None]
+    QueuedEmail.objects.filter(id__in=sent_ids).update(
+        status=QueuedEmail.STATUS_SENT, sent_at=now, last_error=""
+    )
+    failed = [(email, error) for email, error in results if error is not None]
+    for email, error in failed:
+        logger.warning("Sending queued email %s failed: %s", email.id, error)
+        email.last_error = error
+        if email.attempts >= max_attempts:
+            email.status = QueuedEmail.STATUS_FAILED
+    QueuedEmail.objects.bulk_update([email for email, _ in failed], ["last_error", "status"])
+    return len(sent_ids), len(failed)
+
+
+def requeue_failed_emails():
+    """Uğursuz e-poçtları yenidən növbəyə qaytarmaq"""
+    return QueuedEmail.objects.filter(status=QueuedEmail.STATUS_FAILED).update(
+        status=QueuedEmail.STATUS_QUEUED, attempts=0, next_attempt_at=timezone.now(),
+    )
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.mail import ConnectionPool, deliver_queued_emails, requeue_failed_emails
+
+
+class Command(BaseCommand):
+    help = "Növbədəki e-poçtları göndərmək"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Növbəni dayanmadan izləmək (background worker rejimi)",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=settings.QUEUED_EMAIL_POLL_INTERVAL,
+            help="Növbə boş olduqda gözləmə müddəti (saniyə)",
+        )
+        parser.add_argument("--batch-size", type=int, default=settings.QUEUED_EMAIL_BATCH_SIZE)
+        parser.add_argument(
+            "--workers", type=int, default=settings.QUEUED_EMAIL_WORKERS,
+            help="Paralel açıq saxlanılan SMTP bağlantılarının sayı",
+        )
+        parser.add_argument("--backend", default=settings.QUEUED_EMAIL_BACKEND)
+        parser.add_argument(
+            "--host", help="SMTP server (məs. lokal test serveri üçün localhost)"
+        )
+        parser.add_argument("--port", type=int)
+        parser.add_argument(
+            "--requeue-failed", action="store_true",
+            help="Uğursuz e-poçtları əvvəlcə yenidən növbəyə qaytarmaq",
+        )
+
+    def handle(self, *args, **options):
+        connection_kwargs = {}
+        if options["host"]:
+            # Lokal test serverində TLS və autentifikasiya yoxdur
+            connection_kwargs.update(
+                host=options["host"], use_tls=False, username="", password=""
+            )
+        if options["port"]:
+            connection_kwargs["port"] = options["port"]
+
+        if options["requeue_failed"]:
+            count = requeue_failed_emails()
+            self.stdout.write(f"{count} e-poçt yenidən növbəyə qaytarıldı")
+
+        pool = ConnectionPool(
+            options["workers"], backend=options["backend"], **connection_kwargs
+        )
+        try:
+            while True:
+                sent, failed = deliver_queued_emails(pool, options["batch_size"])
+                if sent or failed:
+                    self.stdout.write(f"Göndərildi: {sent}, uğursuz: {failed}")
+                if not options["loop"]:
+                    if not (sent or failed):
+                        break
+                    continue
+                if not (sent or failed):
+                    # Boş növbədə bağlantıları açıq saxlamağa ehtiyac yoxdur
+                    pool.close()
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.close()
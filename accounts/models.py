@@ -1,13 +1,74 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.apps import apps
+from django.db import models, transaction
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+from django.utils import timezone
 # Create your models here.
 
 
+class UserManager(BaseUserManager):
+
+    def bulk_create_with_profiles(self, users, batch_size=None):
+        """Userlərin profilləri ilə birlikdə toplu yaradılması (import üçün)"""
+        Profile = apps.get_model('profiles', 'Profile')
+        with transaction.atomic(using=self.db):
+            users = self.bulk_create(users, batch_size=batch_size)
+            if any(user.pk is None for user in users):
+                # bulk_create id qaytarmayan bazalar üçün (məs. köhnə SQLite)
+                users = list(self.filter(email__in=[user.email for user in users]))
+            profiles = Profile.objects.db_manager(self.db).bulk_create(
+                [Profile(user=user) for user in users], batch_size=batch_size
+            )
+        for user, profile in zip(users, profiles):
+            user.profile = profile
+        return users
+
+
 class User(AbstractUser):
     email = models.EmailField(verbose_name="email", max_length=255, unique=True)
     # phone = models.CharField(null=True, max_length=255)
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     USERNAME_FIELD = 'email'
 
+    objects = UserManager()
+
     def get_username(self):
         return self.username
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # Profil user ilə eyni tranzaksiyada yaradılır
+        Profile = apps.get_model('profiles', 'Profile')
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            super().save(*args, **kwargs)
+            self.profile = Profile.objects.db_manager(self._state.db).create(user=self)
+
+
+class QueuedEmail(models.Model):
+    """Göndərilməyi gözləyən e-poçtlar"""
+    STATUS_QUEUED = "queued"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    message = models.JSONField()
+    recipients = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id} - {self.recipients} ({self.status})"
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="queued_email_due_idx"),
+        ]
@@ -1,3 +1,145 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from djoser.utils import encode_uid
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.tokens import AccessToken
+
+from profiles.models import Profile
+from .authentication import ProfileJWTAuthentication, ProfileTokenAuthentication
+from .mail import ConnectionPool, deliver_queued_emails, enqueue_messages
+from .models import QueuedEmail, User
+
+LOCMEM_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class DisconnectingBackend(BaseEmailBackend):
+    """SMTP server bağlantını qırır (müvəqqəti xəta)"""
+
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+
+# Test runner EMAIL_BACKEND-i locmem edir; burada növbə yolu yoxlanılır
+@override_settings(
+    EMAIL_BACKEND="accounts.backends.QueuedEmailBackend",
+    QUEUED_EMAIL_BACKEND=LOCMEM_BACKEND,
+    QUEUED_EMAIL_RETRY_DELAY=60,
+    QUEUED_EMAIL_MAX_ATTEMPTS=3,
+)
+class QueuedEmailTests(TestCase):
+
+    def deliver(self, backend=LOCMEM_BACKEND):
+        return deliver_queued_emails(ConnectionPool(1, backend=backend))
+
+    def enqueue(self, to="user@example.com"):
+        enqueue_messages([EmailMessage("Salam", "Mətn", "noreply@example.com", [to])])
+        return QueuedEmail.objects.get()
+
+    def test_signup_enqueues_activation_email(self):
+        response = self.client.post(reverse("user-list"), {
+            "email": "new@example.com", "username": "new", "first_name": "New",
+            "last_name": "User", "password": "Secret-pass-123", "re_password": "Secret-pass-123",
+        })
+        self.assertEqual(response.status_code, 201)
+        # sorğu SMTP gözləmir, e-poçt yalnız növbəyə yazılır
+        self.assertEqual(mail.outbox, [])
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.recipients, "new@example.com")
+        self.assertEqual(email.status, QueuedEmail.STATUS_QUEUED)
+
+    def test_activation_enqueues_confirmation_email(self):
+        user = User.objects.create_user(
+            email="inactive@example.com", username="inactive", password="Secret-pass-123",
+            first_name="In", last_name="Active", is_active=False,
+        )
+        response = self.client.post(reverse("user-activation"), {
+            "uid": encode_uid(user.pk), "token": default_token_generator.make_token(user),
+        })
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(QueuedEmail.objects.get().recipients, "inactive@example.com")
+
+    def test_successful_send_marks_sent(self):
+        email = self.enqueue()
+        self.assertEqual(self.deliver(), (1, 0))
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.STATUS_SENT)
+        self.assertIsNotNone(email.sent_at)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+
+    def test_transient_failure_is_retried_with_backoff(self):
+        email = self.enqueue()
+        backend = "accounts.tests.DisconnectingBackend"
+
+        before = timezone.now()
+        self.assertEqual(self.deliver(backend), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.STATUS_QUEUED)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("Connection unexpectedly closed", email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=60))
+        # vaxtı çatmayıb, təkrar götürülmür
+        self.assertEqual(self.deliver(backend), (0, 0))
+
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        before = timezone.now()
+        self.deliver(backend)
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 2)
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=120))
+
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.deliver(backend)
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.STATUS_FAILED)
+
+
+class ProfileAuthenticationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="user@example.com", username="user", password="Secret-pass-123",
+            first_name="U", last_name="Ser",
+        )
+        # adi bulk_create (və loaddata) profil yaratmır
+        cls.bare, = User.objects.bulk_create([
+            User(email="bare@example.com", username="bare", first_name="B", last_name="Are"),
+        ])
+        if cls.bare.pk is None:
+            cls.bare = User.objects.get(email="bare@example.com")
+
+    def jwt(self, user):
+        return ProfileJWTAuthentication(), RequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"JWT {AccessToken.for_user(user)}"
+        )
+
+    def token(self, user):
+        key = Token.objects.create(user=user).key
+        return ProfileTokenAuthentication(), RequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Token {key}"
+        )
+
+    def test_user_loaded_with_profile(self):
+        for make in (self.jwt, self.token):
+            with self.subTest(auth=make.__name__):
+                authentication, request = make(self.user)
+                with self.assertNumQueries(1):
+                    user, _ = authentication.authenticate(request)
+                    self.assertEqual(user.profile.user_id, self.user.pk)
+
+    def test_missing_profile_is_created(self):
+        for make in (self.jwt, self.token):
+            with self.subTest(auth=make.__name__):
+                authentication, request = make(self.bare)
+                user, _ = authentication.authenticate(request)
+                self.assertEqual(user.profile, Profile.objects.get(user=self.bare))
@@ -5,6 +5,6 @@ from . import views
 
 urlpatterns = [
     # checking username and email
-    path("check-username/", views.CheckUsernameView.as_view()),
-    path("check-email/", views.CheckEmailView.as_view()),
+    path("check-username/", views.CheckUsernameView.as_view(), name="check-username"),
+    path("check-email/", views.CheckEmailView.as_view(), name="check-email"),
 ]
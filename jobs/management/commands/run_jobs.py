@@ -0,0 +1,71 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import run_pending
+
+
+def worker_loop(loop, interval, batch_size):
+    while True:
+        results = run_pending(batch_size)
+        if results:
+            continue
+        if not loop:
+            break
+        time.sleep(interval)
+
+
+def child_loop(loop, interval, batch_size):
+    # Valideyn prosesin DB bağlantısı paylaşılmamalıdır
+    connections.close_all()
+    # Ctrl+C valideyn prosesdə tutulur, uşaqlar terminate ilə dayandırılır
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_loop(loop, interval, batch_size)
+
+
+class Command(BaseCommand):
+    help = "Növbədəki fon tapşırıqlarını proses pool-u ilə icra etmək"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=settings.JOBS_PROCESSES,
+            help="Paralel işləyən worker proseslərinin sayı",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Növbəni dayanmadan izləmək (background worker rejimi)",
+        )
+        parser.add_argument("--interval", type=float, default=settings.JOBS_POLL_INTERVAL)
+        parser.add_argument("--batch-size", type=int, default=settings.JOBS_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options["processes"] <= 1:
+            try:
+                worker_loop(options["loop"], options["interval"], options["batch_size"])
+            except KeyboardInterrupt:
+                pass
+            return
+
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=child_loop,
+                args=(options["loop"], options["interval"], options["batch_size"]),
+                daemon=True,
+            )
+            for _ in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Fon tapşırığı"""
+    STATUS_QUEUED = "queued"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id} - {self.name} ({self.status})"
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        verbose_name = "Tapşırıq"
+        verbose_name_plural = "Tapşırıqlar"
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="job_due_idx"),
+        ]
@@ -0,0 +1,108 @@
+"""
+Verilənlər bazasında saxlanılan tapşırıq növbəsi.
+
+Tapşırıqlar `register` ilə adlandırılmış funksiyalardır, `enqueue` onları
+tranzaksiya bitdikdən sonra növbəyə yazır və `run_jobs` komandası proses
+pool-u ilə icra edir. Eyni `key` ilə yazılan tapşırıq yalnız bir dəfə yaradılır;
+uğursuz tapşırıq (və `stale=True` ilə bitmiş tapşırıq da) yenidən növbəyə qoyulur.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register(name):
+    """Funksiyanı fon tapşırığı kimi qeydiyyata almaq"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0, max_attempts=None, stale=False):
+    """
+    Tapşırığı cari tranzaksiya uğurla bitdikdən sonra növbəyə yazmaq.
+
+    `stale=True`: eyni açarlı bitmiş tapşırığın nəticəsi artıq köhnədir,
+    tapşırıq yenidən icra olunsun.
+    """
+    if name not in _registry:
+        raise KeyError(f"Unknown job: {name}")
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "run_at": timezone.now() + timedelta(seconds=delay),
+        "max_attempts": max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    }
+
+    def create():
+        if key is None:
+            Job.objects.create(**fields)
+            return
+        job, created = Job.objects.get_or_create(idempotency_key=key, defaults=fields)
+        rerun = (Job.STATUS_FAILED, Job.STATUS_DONE) if stale else (Job.STATUS_FAILED,)
+        if not created and job.status in rerun:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.STATUS_QUEUED, attempts=0, run_at=fields["run_at"]
+            )
+
+    transaction.on_commit(create)
+
+
+def get_retry_delay(attempts):
+    base = settings.JOBS_RETRY_DELAY
+    return timedelta(seconds=base * 2 ** max(attempts - 1, 0))
+
+
+def claim_jobs(limit):
+    """
+    Vaxtı çatmış tapşırıqları götürmək.
+
+    Götürülən tapşırığın icra vaxtı irəli çəkilir (lease), proses yarıda
+    dayansa tapşırıq bu müddətdən sonra yenidən icra ediləcək.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True).filter(
+                status=Job.STATUS_QUEUED, run_at__lte=now
+            ).order_by("run_at", "id")[:limit]
+        )
+        for job in jobs:
+            job.attempts += 1
+            job.run_at = now + get_retry_delay(job.attempts)
+        Job.objects.bulk_update(jobs, ["attempts", "run_at"])
+    return jobs
+
+
+def run_job(job):
+    """Tapşırığı icra edib nəticəni qeyd etmək"""
+    try:
+        func = _registry[job.name]
+        func(**job.payload)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.id, job.name)
+        job.last_error = str(exc) or exc.__class__.__name__
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+        Job.objects.filter(pk=job.pk).update(status=job.status, last_error=job.last_error)
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.STATUS_DONE, finished_at=timezone.now(), last_error=""
+    )
+    return True
+
+
+def run_pending(limit=None):
+    """Növbədəki tapşırıqların bir partiyasını icra etmək"""
+    jobs = claim_jobs(limit or settings.JOBS_BATCH_SIZE)
+    return [run_job(job) for job in jobs]
@@ -1,11 +1,37 @@
 from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict
 from django.utils.safestring import mark_safe
 from ckeditor_uploader.widgets import CKEditorUploadingWidget
 
 from .models import (Director, Genre, Certificate,
                      ImdbRating, StreamingService, Production,
                      Movie, MovieShots, RatingStar, Review, Rating)
+from .images import needs_variants
+from .publication import set_draft
+
+
+def image_preview(obj, width, height):
+    """
+    Admin üçün kiçik şəkil.
+
+    Variantlar fon worker-ində hazırlanır, hazır olana qədər yer tutucu göstərilir.
+    """
+    if not obj.image:
+        return "-"
+    if needs_variants(obj):
+        return mark_safe(
+            f'<div style="width:{width}px;height:{height}px;background:#ddd;'
+            f'display:flex;align-items:center;justify-content:center">Hazırlanır...</div>'
+        )
+    variants = obj.image_variants["variants"]
+    sizes = next(iter(variants.values()))
+    name = sizes[min(sizes, key=int)]
+    return mark_safe(f'<img src={obj.image.storage.url(name)} width="{width}" height="{height}">')
 
 
 class MovieAdminForm(forms.ModelForm):
@@ -17,10 +43,61 @@ class MovieAdminForm(forms.ModelForm):
         fields = '__all__'
 
 
+def count_subquery(through, field):
+    """M2M əlaqələrinin sayı (JOIN-ların bir-birini çoxaltmaması üçün alt sorğu ilə)"""
+    return Subquery(
+        through.objects.filter(**{field: OuterRef("pk")}).order_by()
+        .values(field).annotate(count=Count("*")).values("count"),
+        output_field=IntegerField(),
+    )
+
+
+def annotate_review_votes(queryset):
+    return queryset.annotate(
+        like_count=Coalesce(count_subquery(Review.likes.through, "review"), 0),
+        unlike_count=Coalesce(count_subquery(Review.unlikes.through, "review"), 0),
+    )
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline obyektlərini səhifələrə bölmək"""
+    page = 1
+    per_page = 50
+    page_param = "page"
+    query = None
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            queryset = super().get_queryset()
+            self.total = queryset.count()
+            self.num_pages = max((self.total - 1) // self.per_page + 1, 1)
+            self.page = min(max(self.page, 1), self.num_pages)
+            start = (self.page - 1) * self.per_page
+            self._queryset = queryset[start:start + self.per_page]
+        return self._queryset
+
+    def page_url(self, page):
+        """Cari querystring (_changelist_filters, digər inline-ların səhifələri) saxlanılır"""
+        params = self.query.copy() if self.query is not None else QueryDict(mutable=True)
+        params[self.page_param] = page
+        return "?" + params.urlencode()
+
+    @property
+    def previous_url(self):
+        return self.page_url(self.page - 1)
+
+    @property
+    def next_url(self):
+        return self.page_url(self.page + 1)
+
+
 class ReviewInline(admin.TabularInline):
     """Film səhifəsindəki rəylər"""
     model = Review
     extra = 0
+    formset = PaginatedInlineFormSet
+    template = "admin/movies/paginated_tabular.html"
+    page_param = "reviews_page"
     readonly_fields = ("user", "parent", "movie", "get_likes", "get_dislikes")
     fieldsets = (
         (None, {
@@ -28,11 +105,27 @@ class ReviewInline(admin.TabularInline):
         }),
     )
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).select_related("user", "parent__user")
+        return annotate_review_votes(queryset).order_by("-timestamp")
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            page = int(request.GET.get(self.page_param, 1))
+        except ValueError:
+            page = 1
+        formset.page = page
+        formset.per_page = settings.ADMIN_INLINE_REVIEWS_PER_PAGE
+        formset.page_param = self.page_param
+        formset.query = request.GET
+        return formset
+
     def get_likes(self, obj):
-        return obj.likes.count()
+        return obj.like_count
 
     def get_dislikes(self, obj):
-        return obj.unlikes.count()
+        return obj.unlike_count
 
     get_likes.short_description = "Like"
     get_dislikes.short_description = "Dislike"
@@ -45,7 +138,7 @@ class MovieShotsInline(admin.TabularInline):
     readonly_fields = ("get_image",)
 
     def get_image(self, obj):
-        return mark_safe(f'<img src={obj.image.url} width="150" height="90"')
+        return image_preview(obj, 150, 90)
 
     get_image.short_description = "Şəkil"
 
@@ -53,13 +146,15 @@ class MovieShotsInline(admin.TabularInline):
 @admin.register(Movie)
 class MovieAdmin(admin.ModelAdmin):
     """Kino"""
-    list_display = ("title", "movie_slug", "draft")
+    list_display = ("title", "movie_slug", "draft", "publish_at", "unpublish_at")
     list_filter = ("genres", "year")
     list_editable = ("draft",)
     search_fields = ("title", )
     actions = ["publish", "unpublish"]
     readonly_fields = ("get_image",)
     inlines = [MovieShotsInline, ReviewInline]
+    raw_id_fields = ("imdb",)
+    autocomplete_fields = ("directors",)
     form = MovieAdminForm
     save_on_top = True
     save_as = True
@@ -83,16 +178,16 @@ class MovieAdmin(admin.ModelAdmin):
             "fields": (("budget", "box_office", "imdb"),)
         }),
         ("Options", {
-            "fields": (("movie_slug", "draft"),)
+            "fields": (("movie_slug", "draft"), ("publish_at", "unpublish_at"))
         }),
     )
 
     def get_image(self, obj):
-        return mark_safe(f'<img src={obj.image.url} width="100" height="150"')
+        return image_preview(obj, 100, 150)
 
     def unpublish(self, request, queryset):
         """Nəşri dayandırmaq"""
-        row_update = queryset.update(draft=True)
+        row_update = set_draft(queryset, True)
         if row_update == 1:
             message_bit = "1 kino qaralamaya salındı"
         else:
@@ -101,7 +196,7 @@ class MovieAdmin(admin.ModelAdmin):
 
     def publish(self, request, queryset):
         """Nəşr etmək"""
-        row_update = queryset.update(draft=False)
+        row_update = set_draft(queryset, False)
         if row_update == 1:
             message_bit = "1 kino qaralamadan çıxarıldı"
         else:
@@ -123,6 +218,9 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "movie", "spoiler")
     list_display_links = ('id', 'user',)
     list_editable = ("spoiler",)
+    list_select_related = ("user", "movie")
+    list_filter = ("spoiler",)
+    raw_id_fields = ("user", "movie", "parent", "likes", "unlikes")
     # readonly_fields = ("user", "parent", "movie")
 
 
@@ -133,7 +231,7 @@ class GenreAdmin(admin.ModelAdmin):
     readonly_fields = ("get_image",)
 
     def get_image(self, obj):
-        return mark_safe(f'<img src={obj.image.url} width="50" height="50"')
+        return image_preview(obj, 50, 50)
 
     get_image.short_description = "Icon"
 
@@ -142,6 +240,7 @@ class GenreAdmin(admin.ModelAdmin):
 class DirectorAdmin(admin.ModelAdmin):
     """Rejissor"""
     list_display = ("name",)
+    search_fields = ("name",)
 
 
 @admin.register(Rating)
@@ -149,6 +248,8 @@ class RatingAdmin(admin.ModelAdmin):
     """Reytinq"""
     list_display = ("star", "movie", "user")
     list_display_links = ("star", "movie")
+    list_select_related = ("star", "movie", "user")
+    raw_id_fields = ("movie", "user")
 
 
 @ admin.register(MovieShots)
@@ -156,10 +257,11 @@ class MovieShotsAdmin(admin.ModelAdmin):
     """Kinodan şəkillər"""
     list_display = ("title", "movie", "get_image")
     list_display_links = ("title", "movie")
+    list_select_related = ("movie",)
     readonly_fields = ("get_image",)
 
     def get_image(self, obj):
-        return mark_safe(f'<img src={obj.image.url} width="150" height="90"')
+        return image_preview(obj, 150, 90)
 
     get_image.short_description = "Şəkil"
 
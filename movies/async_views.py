@@ -0,0 +1,133 @@
+"""
+Oxuma üçün çox istifadə olunan endpoint-lərin async versiyaları (ASGI).
+
+ORM çağırışları və serializer-lər moviesapi.aio thread pool-unda icra olunur.
+Cavablar sinxron view-ların cavabları ilə eyni formadadır.
+"""
+import functools
+
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from moviesapi.aio import get_user, run_db
+from moviesapi.compression import cache_compressed
+from .models import Movie
+from .serializers import (
+    HomePageVideoSerializer, MovieListSerializer, MovieDetailSerializer,
+    ReviewListSerializer,
+)
+from .service import (
+    get_catalog_movies, get_movie_rating_star, get_movies_in_the_last_two_month,
+    parse_catalog_params, parse_field_list, prune_queryset,
+)
+
+
+def async_api_view(view):
+    """Yalnız GET, istifadəçi DRF autentifikasiya sinifləri ilə tapılır"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return JsonResponse(
+                {"detail": f'Method "{request.method}" not allowed.'}, status=405
+            )
+        try:
+            request.user = await get_user(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def serialize(serializer_class, instance, **kwargs):
+    return serializer_class(instance, **kwargs).data
+
+
+def get_home_video():
+    return HomePageVideoSerializer(get_movies_in_the_last_two_month(None).first()).data
+
+
+@async_api_view
+async def home_page_video(request):
+    """Ana səhifədəki video"""
+    data = await run_db(get_home_video)
+    return JsonResponse(data, status=200)
+
+
+@async_api_view
+async def new_movies(request):
+    """Yeni kinoların siyahısı"""
+    end = request.GET.get('count', '')
+    if end == '':
+        return JsonResponse({"count": "This field is required"}, status=400)
+    try:
+        end = int(end)
+    except ValueError:
+        return JsonResponse({"count": "This field has to be number"}, status=400)
+    end = 8 if end != 8 and end != 6 else end
+    qs = get_movies_in_the_last_two_month(None)[1 : end + 1]
+    data = await run_db(serialize, MovieListSerializer, qs, many=True)
+    return JsonResponse(data, safe=False, status=200)
+
+
+@async_api_view
+async def catalog_movies(request):
+    """Kinoları kataloqa görə göstərmək"""
+    movies_count, section_name, errors = parse_catalog_params(request.GET)
+    if errors:
+        return JsonResponse(errors, status=400)
+    data = await run_db(get_catalog_movies, section_name, movies_count)
+    return cache_compressed(JsonResponse(data, safe=False, status=200))
+
+
+@async_api_view
+async def search_movie(request):
+    """Butun kinolarin arasinda limitle axtaris"""
+    title = request.GET.get('title', '')
+    if title == '':
+        return JsonResponse(
+            {"message": "For searching you need write something"}, status=400
+        )
+    qs = Movie.published.filter(title__icontains=title).order_by('imdb__votes')[:5]
+    data = await run_db(serialize, MovieListSerializer, qs, many=True)
+    return JsonResponse(data, safe=False, status=200)
+
+
+def get_movie_data(request, pk):
+    """Sinxron MovieDetailView ilə eyni queryset, ?fields=/?expand= və serializer"""
+    options = {
+        "fields": parse_field_list(request.GET.get("fields")) or None,
+        "expand": parse_field_list(request.GET.get("expand")),
+    }
+    context = {"request": request}
+    queryset = prune_queryset(
+        get_movie_rating_star(request), MovieDetailSerializer(context=context, **options)
+    )
+    movie = queryset.filter(pk=pk).first()
+    if movie is None:
+        return None
+    return MovieDetailSerializer(movie, context=context, **options).data
+
+
+@async_api_view
+async def movie_detail(request, pk):
+    """Tək bir kinonun məlumatları; cavab sinxron movie/<pk>/ ilə eynidir"""
+    data = await run_db(get_movie_data, request, pk)
+    if data is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+    return JsonResponse(data, status=200)
+
+
+def get_movie_reviews(request, pk):
+    movie = Movie.published.filter(pk=pk).first()
+    if movie is None:
+        return None
+    return ReviewListSerializer(movie, context={"request": request}).data
+
+
+@async_api_view
+async def movie_reviews(request, pk):
+    """Bir kinoya aid rəylər"""
+    data = await run_db(get_movie_reviews, request, pk)
+    if data is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+    return JsonResponse(data, status=200)
@@ -0,0 +1,402 @@
+"""
+Performans ölçmələri üçün sintetik məlumat bazası və endpoint ssenariləri.
+
+`generate_dataset` və `bench_endpoints` komandaları bu moduldan istifadə edir.
+"""
+import gzip
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from moviesapi.renderers import MessagePackRenderer
+
+from profiles.models import Watchlist, WatchlistTime
+from .models import (
+    Director, Genre, Certificate, ImdbRating, StreamingService, Production,
+    Movie, RatingStar, Rating, Review
+)
+from .serializers import MovieListSerializer, ReviewListSerializer
+
+User = get_user_model()
+
+PREFIX = "bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def _next_ids(model, count):
+    start = (model.objects.aggregate(m=Max("pk"))["m"] or 0) + 1
+    return range(start, start + count)
+
+
+def _bulk(model, objects, batch_size=1000):
+    model.objects.bulk_create(objects, batch_size=batch_size)
+    return objects
+
+
+def _reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def flush_dataset():
+    """Əvvəl yaradılmış sintetik məlumatların silinməsi"""
+    movies = Movie.objects.filter(title__startswith=f"{PREFIX} ")
+    imdb_ids = list(movies.values_list("imdb_id", flat=True))
+    movies.delete()
+    ImdbRating.objects.filter(id__in=imdb_ids).delete()
+    User.objects.filter(email__startswith=f"{PREFIX}-").delete()
+    Genre.objects.filter(url__startswith=f"{PREFIX}-").delete()
+    Director.objects.filter(name__startswith=f"{PREFIX} ").delete()
+    Production.objects.filter(name__startswith=f"{PREFIX} ").delete()
+    StreamingService.objects.filter(slug__startswith=f"{PREFIX}-").delete()
+    Certificate.objects.filter(url__startswith=f"{PREFIX}-").delete()
+
+
+@transaction.atomic
+def generate_dataset(
+    movies=200, genres=20, directors=100, platforms=6, users=100,
+    ratings_per_movie=20, reviews_per_movie=10, replies_per_review=2,
+    likes_per_review=5, watchlist_per_user=10, seed=0,
+):
+    """
+    Parametrlərə görə sintetik kataloq yaratmaq.
+
+    Bütün cədvəllər bulk_create ilə doldurulur. İd-lər əvvəlcədən təyin edilir
+    ki, cavablar (reply) və M2M əlaqələri id qaytarmayan bazalarda da qurulsun.
+    """
+    rnd = random.Random(seed)
+    today = date.today()
+
+    stars = list(RatingStar.objects.all())
+    if not stars:
+        stars = _bulk(RatingStar, [RatingStar(value=value) for value in range(1, 6)])
+        stars = list(RatingStar.objects.all())
+
+    genre_objs = _bulk(Genre, [
+        Genre(id=pk, name=f"{PREFIX} genre {i}", url=f"{PREFIX}-genre-{pk}")
+        for i, pk in enumerate(_next_ids(Genre, genres))
+    ])
+    director_objs = _bulk(Director, [
+        Director(id=pk, name=f"{PREFIX} director {i}")
+        for i, pk in enumerate(_next_ids(Director, directors))
+    ])
+    production_objs = _bulk(Production, [
+        Production(id=pk, name=f"{PREFIX} production {i}")
+        for i, pk in enumerate(_next_ids(Production, max(directors // 4, 1)))
+    ])
+    platform_objs = _bulk(StreamingService, [
+        StreamingService(
+            id=pk, name=f"{PREFIX} platform {i}", slug=f"{PREFIX}-platform-{pk}",
+            website=f"https://{PREFIX}-platform-{pk}.example.com",
+            image="platform_logos/netflix.jpg",
+        )
+        for i, pk in enumerate(_next_ids(StreamingService, platforms))
+    ])
+    certificate_objs = _bulk(Certificate, [
+        Certificate(id=pk, rated=f"{age}+", url=f"{PREFIX}-{age}-plus-{pk}")
+        for age, pk in zip((0, 6, 12, 16, 18), _next_ids(Certificate, 5))
+    ])
+    imdb_objs = _bulk(ImdbRating, [
+        ImdbRating(id=pk, point=round(rnd.uniform(4.0, 9.5), 1), votes=rnd.randint(1000, 2000000))
+        for pk in _next_ids(ImdbRating, movies)
+    ])
+
+    posters = [
+        "movie_posters/avngers_endgame.jpg", "movie_posters/frozen.jpg",
+        "movie_posters/interstellar.jpg", "movie_posters/the_conjuring.jpg",
+        "movie_posters/the_shawshank_redemption.jpg",
+    ]
+    movie_objs = []
+    for i, (pk, imdb) in enumerate(zip(_next_ids(Movie, movies), imdb_objs)):
+        premiere = today - timedelta(days=rnd.randint(0, 3650))
+        movie_objs.append(Movie(
+            id=pk, title=f"{PREFIX} movie {i}", country="USA", runtime="2h",
+            description="<p>{}</p>".format(" ".join(["Lorem ipsum dolor sit amet."] * 40)),
+            image=rnd.choice(posters), premiere=premiere, year=premiere.year,
+            tagline="Synthetic", trailer=f"https://www.youtube.com/watch?v={PREFIX}{pk}",
+            certificate=rnd.choice(certificate_objs), imdb=imdb,
+            budget=rnd.randint(10 ** 6, 3 * 10 ** 8), box_office=rnd.randint(10 ** 6, 2 * 10 ** 9),
+            movie_slug=f"{PREFIX}-movie-{pk}",
+        ))
+    _bulk(Movie, movie_objs)
+
+    def link(through, left, right, objs, choices, k):
+        rows = []
+        for obj in objs:
+            for choice in rnd.sample(choices, min(k, len(choices))):
+                rows.append(through(**{left: obj.pk, right: choice.pk}))
+        through.objects.bulk_create(rows, batch_size=5000)
+
+    link(Movie.genres.through, "movie_id", "genre_id", movie_objs, genre_objs, 3)
+    link(Movie.directors.through, "movie_id", "director_id", movie_objs, director_objs, 1)
+    link(Movie.production.through, "movie_id", "production_id", movie_objs, production_objs, 2)
+    link(Movie.streaming.through, "movie_id", "streamingservice_id", movie_objs, platform_objs, 2)
+
+    password = make_password(BENCH_PASSWORD)
+    user_objs = User.objects.bulk_create_with_profiles([
+        User(
+            id=pk, email=f"{PREFIX}-user-{pk}@example.com", username=f"{PREFIX}_user_{pk}",
+            first_name="Bench", last_name=str(pk), password=password,
+        )
+        for pk in _next_ids(User, users)
+    ], batch_size=1000)
+
+    rating_rows = []
+    for movie in movie_objs:
+        for user in rnd.sample(user_objs, min(ratings_per_movie, len(user_objs))):
+            rating_rows.append(Rating(user_id=user.pk, movie_id=movie.pk, star=rnd.choice(stars)))
+    _bulk(Rating, rating_rows, batch_size=5000)
+
+    review_ids = iter(_next_ids(Review, movies * reviews_per_movie * (1 + replies_per_review)))
+    parents, replies = [], []
+    for movie in movie_objs:
+        for _ in range(reviews_per_movie):
+            parent = Review(
+                id=next(review_ids), movie_id=movie.pk, user_id=rnd.choice(user_objs).pk,
+                content="Synthetic review " * 10, spoiler=rnd.random() < 0.1,
+            )
+            parents.append(parent)
+            for _ in range(replies_per_review):
+                replies.append(Review(
+                    id=next(review_ids), movie_id=movie.pk, parent_id=parent.pk,
+                    user_id=rnd.choice(user_objs).pk, content="Synthetic reply " * 5,
+                ))
+    _bulk(Review, parents, batch_size=5000)
+    _bulk(Review, replies, batch_size=5000)
+
+    like_rows, unlike_rows = [], []
+    for review in parents + replies:
+        voters = rnd.sample(user_objs, min(likes_per_review * 2, len(user_objs)))
+        for user in voters[:likes_per_review]:
+            like_rows.append(Review.likes.through(review_id=review.pk, user_id=user.pk))
+        for user in voters[likes_per_review:likes_per_review + likes_per_review // 2]:
+            unlike_rows.append(Review.unlikes.through(review_id=review.pk, user_id=user.pk))
+    Review.likes.through.objects.bulk_create(like_rows, batch_size=5000)
+    Review.unlikes.through.objects.bulk_create(unlike_rows, batch_size=5000)
+
+    watchlists = _bulk(Watchlist, [
+        Watchlist(id=pk, user_id=user.pk)
+        for pk, user in zip(_next_ids(Watchlist, len(user_objs)), user_objs)
+    ])
+    _bulk(WatchlistTime, [
+        WatchlistTime(watchlist_id=watchlist.pk, movie_id=movie.pk)
+        for watchlist in watchlists
+        for movie in rnd.sample(movie_objs, min(watchlist_per_user, len(movie_objs)))
+    ], batch_size=5000)
+
+    _reset_sequences([
+        RatingStar, Genre, Director, Production, StreamingService, Certificate,
+        ImdbRating, Movie, User, Review, Watchlist,
+    ])
+    return {
+        "movies": len(movie_objs), "users": len(user_objs), "ratings": len(rating_rows),
+        "reviews": len(parents) + len(replies), "likes": len(like_rows),
+    }
+
+
+class Case:
+    """Bir endpoint ssenarisi"""
+
+    def __init__(self, name, url, method="get", data=None, auth=False, setup=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.data = data
+        self.auth = auth
+        self.setup = setup
+
+
+def get_cases(user):
+    """movies/urls.py və accounts/urls.py-dakı bütün marşrutlar"""
+    movie = Movie.published.filter(
+        title__startswith=f"{PREFIX} ", reviews__isnull=False
+    ).order_by("id").first()
+    review = Review.objects.filter(movie=movie, parent=None).first()
+    director = movie.directors.first()
+    star = RatingStar.objects.first()
+    # watchlist_per_user=0 ilə yaradılmış bazada istifadəçinin siyahısı boşdur
+    entry = WatchlistTime.objects.filter(watchlist__user=user).select_related("movie").first()
+    watchlist_movie = entry.movie if entry is not None else movie
+
+    def new_review():
+        obj = Review.objects.create(user=user, movie=movie, content="Benchmark review")
+        return reverse("review-delete", kwargs={"pk": obj.pk})
+
+    def watchlist_entry():
+        watchlist = Watchlist.objects.filter(user=user).first()
+        watchlist.movie.add(movie)
+        return None
+
+    return [
+        Case("home-page-video", reverse("home-page-video")),
+        Case("genres", reverse("genres")),
+        Case("new-movies", reverse("new-movies") + "?count=8"),
+        Case("catalog-new-added", reverse("catalog-movies") + "?count=12&section=new-added"),
+        Case("catalog-most-popular", reverse("catalog-movies") + "?count=12&section=most-popular"),
+        Case("catalog-most-rated", reverse("catalog-movies") + "?count=12&section=most-rated"),
+        Case("platforms", reverse("platforms")),
+        Case("movies", reverse("movies")),
+        Case("movies-page-100", reverse("movies") + "?page_size=100"),
+        Case("movie-detail", reverse("movie-detail", kwargs={"pk": movie.pk})),
+        Case("movie-detail-auth", reverse("movie-detail", kwargs={"pk": movie.pk}), auth=True),
+        Case("movie-reviews", reverse("movie-reviews", kwargs={"pk": movie.pk}), auth=True),
+        Case(
+            "review-create", reverse("review-create"), method="post", auth=True,
+            data={"movie": movie.pk, "content": "Benchmark review"},
+        ),
+        Case(
+            "review-action", reverse("review-action"), method="post", auth=True,
+            data={"review_id": review.pk, "action": "like"},
+        ),
+        Case("review-delete", None, method="delete", auth=True, setup=new_review),
+        Case("directors", reverse("directors")),
+        Case("director-detail", reverse("director-detail", kwargs={"pk": director.pk})),
+        Case(
+            "add-rating", reverse("add-rating"), method="post", auth=True,
+            data={"movie": movie.pk, "star": star.pk},
+        ),
+        Case(
+            "add-watchlist", reverse("add-watchlist", kwargs={"movie_id": movie.pk}),
+            method="post", auth=True,
+        ),
+        Case("user-watchlist", reverse("user-watchlist"), auth=True),
+        Case(
+            "remove-watchlist", reverse("remove-watchlist"), method="delete", auth=True,
+            data={"ids": str(movie.pk)}, setup=watchlist_entry,
+        ),
+        Case("search-movie", reverse("search-movie") + f"?title={PREFIX}"),
+        Case(
+            "search-watchlist",
+            reverse("search-watchlist") + "?title={}".format(watchlist_movie.title[:8]),
+            auth=True,
+        ),
+        Case(
+            "check-username", reverse("check-username"), method="post",
+            data={"username": user.username},
+        ),
+        Case("check-email", reverse("check-email"), method="post", data={"email": user.email}),
+    ]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(int(round(pct / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def run_case(client, case, headers, iterations, warmup=1, trace_memory=False):
+    """Bir ssenarini bir neçə dəfə icra edib ölçmələri toplamaq"""
+    timings, queries, allocations, statuses = [], [], [], set()
+    for i in range(warmup + iterations):
+        url = case.url
+        if case.setup is not None:
+            url = case.setup() or url
+        request = getattr(client, case.method)
+        kwargs = dict(headers) if case.auth else {}
+        if case.data is not None:
+            kwargs.update(data=case.data, content_type="application/json")
+
+        if trace_memory:
+            tracemalloc.start()
+        # replikalara gedən oxumalar da sayılsın (moviesapi.replicas)
+        with ExitStack() as stack:
+            captured = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in connections
+            ]
+            start = time.perf_counter()
+            response = request(url, **kwargs)
+            elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        if i < warmup:
+            continue
+        statuses.add(response.status_code)
+        timings.append(elapsed * 1000)
+        queries.append(sum(len(context.captured_queries) for context in captured))
+        if trace_memory:
+            allocations.append(peak / 1024)
+
+    return {
+        "name": case.name,
+        "status": sorted(statuses),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "queries": max(queries),
+        "alloc_kib": round(max(allocations), 1) if allocations else None,
+    }
+
+
+def run_suite(iterations=20, warmup=1, trace_memory=False, only=None):
+    """Bütün ssenariləri test client ilə icra etmək"""
+    user = User.objects.filter(email__startswith=f"{PREFIX}-").order_by("id").first()
+    if user is None:
+        raise RuntimeError("Run `manage.py generate_dataset` first")
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+
+    client = Client()
+    results = []
+    for case in get_cases(user):
+        if only and case.name not in only:
+            continue
+        results.append(run_case(client, case, headers, iterations, warmup, trace_memory))
+    return results
+
+
+def get_payloads(page_size=1000):
+    """`movies/?page_size=1000` və ən böyük rəy ağacının serializer nəticəsi"""
+    request = Request(APIRequestFactory().get("/"))
+    movies = (
+        Movie.published.select_related("imdb").prefetch_related("genres")
+        .order_by("-premiere")[:page_size]
+    )
+    movie = (
+        Movie.published.annotate(review_total=Count("reviews"))
+        .order_by("-review_total").first()
+    )
+    return {
+        f"movies-page-{page_size}": MovieListSerializer(movies, many=True).data,
+        "review-tree": ReviewListSerializer(movie, context={"request": request}).data,
+    }
+
+
+def compare_renderers(iterations=20, page_size=1000):
+    """JSON və MessagePack üçün encode vaxtı və ölçü"""
+    renderers = {"json": JSONRenderer(), "msgpack": MessagePackRenderer()}
+    results = []
+    for name, data in get_payloads(page_size).items():
+        for fmt, renderer in renderers.items():
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                body = renderer.render(data)
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append({
+                "payload": name,
+                "format": fmt,
+                "p50_ms": round(statistics.median(timings), 2),
+                "bytes": len(body),
+                "gzip_bytes": len(gzip.compress(body)),
+            })
+    return results
@@ -0,0 +1,95 @@
+"""
+Kataloq keşinin versiyası.
+
+Kataloqdan asılı keş açarları versiya nömrəsini daşıyır. Kinolar dəyişəndə
+versiya artırılır və köhnə açarlar avtomatik olaraq istifadəsiz qalır.
+
+Ana səhifənin bölmələri (id siyahıları) əlavə olaraq öz versiyalarını daşıyır,
+kinoların serializer nəticələri isə kino id-si ilə ayrıca saxlanılır. Belə ki,
+bir bölmənin dəyişməsi (məs. trending) və ya bir neçə kinonun nəşr vəziyyəti
+yalnız həmin hissələri yeniləyir, bütün kataloqu yox.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "catalog:version"
+SECTION_VERSION_KEY = "catalog:section:{}:version"
+HOME_SECTION_NAMES = ["new-movies", *settings.CATALOG_SECTION_NAMES]
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def get_catalog_version():
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return _bump_version(CATALOG_VERSION_KEY)
+
+
+def catalog_cache_key(name, *parts):
+    suffix = ":".join(str(part) for part in parts)
+    return f"catalog:{get_catalog_version()}:{name}:{suffix}"
+
+
+def get_section_versions(names):
+    """Bölmələrin versiyaları, bir get_many ilə"""
+    keys = {name: SECTION_VERSION_KEY.format(name) for name in names}
+    found = cache.get_many(list(keys.values()))
+    return {
+        name: found[key] if key in found else _get_version(key)
+        for name, key in keys.items()
+    }
+
+
+def bump_section_version(name):
+    return _bump_version(SECTION_VERSION_KEY.format(name))
+
+
+def section_cache_keys(counts):
+    """{bölmə: açar}; `counts` bölmə adı -> kino sayı"""
+    catalog = get_catalog_version()
+    versions = get_section_versions(counts)
+    return {
+        name: f"catalog:{catalog}:section:{name}:{versions[name]}:{count}"
+        for name, count in counts.items()
+    }
+
+
+def home_cache_key(size):
+    """Bütün ana səhifə cavabı; istənilən bölmənin versiyası dəyişəndə yenilənir"""
+    versions = get_section_versions(HOME_SECTION_NAMES)
+    return catalog_cache_key("home", size, *(versions[name] for name in HOME_SECTION_NAMES))
+
+
+def movie_cache_keys(ids, version=None):
+    """{kino id-si: açar} kinonun siyahı serializer nəticəsi üçün"""
+    version = version or get_catalog_version()
+    return {pk: f"catalog:{version}:movie:{pk}" for pk in ids}
+
+
+def invalidate_movies(ids):
+    """
+    Nəşr vəziyyəti dəyişən kinolar üçün keşi yeniləmək.
+
+    Kinoların öz qeydləri bir delete_many ilə silinir; bölmələrin tərkibi
+    dəyişə biləcəyi üçün onların versiyaları artırılır. Kataloq versiyası
+    (bütün kinoların qeydləri) toxunulmaz qalır.
+    """
+    cache.delete_many(list(movie_cache_keys(ids).values()))
+    for name in HOME_SECTION_NAMES:
+        bump_section_version(name)
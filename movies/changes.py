@@ -0,0 +1,141 @@
+"""
+Kataloq dəyişikliklərinin jurnalı (change feed).
+
+Movie, ImdbRating, Rating, Review və WatchlistTime dəyişdikcə ChangeEvent
+cədvəlinə dəyişikliyin özü ilə eyni tranzaksiyada qısa bir hadisə yazılır.
+Xarici servislər `changes/?since=<seq>` ilə yalnız yeni hadisələri oxuyur.
+
+Hadisənin `id`-si INSERT sırasıdır, commit sırası deyil: uzun tranzaksiya
+kiçik id-ni istehlakçı ondan sonrakıları oxuduqdan sonra commit edə bilər.
+Ona görə `seq` oxuma zamanı (assign_seqs) kilid altında yalnız commit olunmuş
+hadisələrə verilir. Gec commit olunan hadisə artıq verilmiş hər şeydən böyük
+seq alır, istehlakçı onu buraxmır.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .models import ChangeEvent, ChangeFeedState
+
+
+def _movie(obj):
+    return {"title": obj.title, "draft": obj.draft, "imdb": obj.imdb_id}
+
+
+def _imdb(obj):
+    return {"point": obj.point, "votes": obj.votes}
+
+
+def _rating(obj):
+    return {"movie": obj.movie_id, "user": obj.user_id, "star": obj.star_id}
+
+
+def _review(obj):
+    return {"movie": obj.movie_id, "user": obj.user_id, "parent": obj.parent_id}
+
+
+def _watchlist(obj):
+    return {"movie": obj.movie_id, "watchlist": obj.watchlist_id}
+
+
+# model label -> (feed-dəki ad, payload funksiyası)
+TRACKED_MODELS = {
+    "movies.Movie": ("movie", _movie),
+    "movies.ImdbRating": ("imdb", _imdb),
+    "movies.Rating": ("rating", _rating),
+    "movies.Review": ("review", _review),
+    "profiles.WatchlistTime": ("watchlist", _watchlist),
+}
+
+
+def make_event(instance, op):
+    name, payload = TRACKED_MODELS[instance._meta.label]
+    data = payload(instance) if op == ChangeEvent.OP_UPSERT else {}
+    return ChangeEvent(model=name, object_id=instance.pk, op=op, data=data)
+
+
+def record(instance, op=ChangeEvent.OP_UPSERT):
+    """Bir obyektin dəyişikliyini jurnala yazmaq"""
+    make_event(instance, op).save(using=instance._state.db)
+
+
+def record_many(instances, op=ChangeEvent.OP_UPSERT):
+    """Toplu dəyişikliklər üçün bir INSERT"""
+    ChangeEvent.objects.bulk_create([make_event(obj, op) for obj in instances])
+
+
+def assign_seqs(batch_size):
+    """
+    Commit olunmuş hadisələrə ardıcıl seq vermək, verilmiş seq sayı.
+
+    Eyni anda yalnız bir proses seq verir: ChangeFeedState sətri
+    select_for_update ilə kilidlənir, kilid məşğuldursa çağırış heç nə etmir
+    (seq-ləri onsuz da başqası verir).
+    """
+    ChangeFeedState.objects.get_or_create(
+        pk=1, defaults={"last_seq": ChangeEvent.objects.aggregate(seq=Max("seq"))["seq"] or 0}
+    )
+    with transaction.atomic():
+        state = ChangeFeedState.objects.select_for_update(skip_locked=True).filter(pk=1).first()
+        if state is None:
+            return 0
+        pending = list(
+            ChangeEvent.objects.filter(seq__isnull=True).order_by("id").only("id")[:batch_size]
+        )
+        if not pending:
+            return 0
+        for offset, event in enumerate(pending, 1):
+            event.seq = state.last_seq + offset
+        ChangeEvent.objects.bulk_update(pending, ["seq"], batch_size=1000)
+        state.last_seq += len(pending)
+        state.save(update_fields=["last_seq"])
+    return len(pending)
+
+
+def read_changes(since, limit):
+    """`since`-dən sonrakı hadisələr seq sırası ilə: (hadisələr, has_more)"""
+    batch_size = settings.CHANGE_FEED_MAX_PAGE_SIZE
+    assigned = assign_seqs(batch_size)
+    events = list(ChangeEvent.objects.filter(seq__gt=since).order_by("seq")[:limit + 1])
+    has_more = len(events) > limit or assigned == batch_size
+    return events[:limit], has_more
+
+
+def is_expired(since):
+    """
+    İstehlakçı retention müddətindən çox geridə qalıbmı.
+
+    Belə istehlakçı silinmiş obyektlərin hadisələrini (tombstone) görməyə
+    bilər və tam sinxronizasiya etməlidir.
+    """
+    boundary = timezone.now() - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+    expired_seq = ChangeEvent.objects.filter(timestamp__lt=boundary).aggregate(
+        seq=Max("seq")
+    )["seq"]
+    return expired_seq is not None and since < expired_seq
+
+
+def compact(older_than, batch_size=5000):
+    """
+    Köhnə hadisələrin sıxılması.
+
+    `older_than`-dan köhnə hissədə hər obyekt üçün yalnız son hadisə saxlanılır,
+    silinmiş obyektlərin hadisələri isə tamamilə atılır. Obyektlərin son
+    vəziyyəti dəyişmədiyi üçün istehlakçılar yenə düzgün nəticəyə gəlir.
+    """
+    newer = ChangeEvent.objects.filter(
+        model=OuterRef("model"), object_id=OuterRef("object_id"), id__gt=OuterRef("id")
+    )
+    # seq-i olmayan hadisələrə toxunulmur; son seq ChangeFeedState-də saxlanılır
+    old = ChangeEvent.objects.filter(timestamp__lt=older_than, seq__isnull=False)
+    removed = 0
+    for queryset in (old.filter(Exists(newer)), old.filter(op=ChangeEvent.OP_DELETE)):
+        while True:
+            ids = list(queryset.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            removed += ChangeEvent.objects.filter(id__in=ids).delete()[0]
+    return removed
@@ -0,0 +1,187 @@
+"""
+Şəkillərin ölçülərə görə kiçildilmiş variantları (afişa, kadr, ikon, loqo).
+
+Variantlar orijinal faylın yanında, məzmun hash-ına görə qovluqda saxlanılır:
+eyni şəkil yenidən yüklənsə, artıq hazır olan variantlardan istifadə olunur.
+"""
+import base64
+import hashlib
+import json
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps, features
+
+VARIANTS_DIR = "derivatives"
+MANIFEST_NAME = "manifest.json"
+PLACEHOLDER_WIDTH = 16
+
+PIL_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP", "avif": "AVIF"}
+
+
+def get_supported_formats():
+    """Quraşdırılmış Pillow-un yaza bildiyi əlavə formatlar"""
+    Image.init()
+    supported = []
+    for fmt in settings.IMAGE_VARIANT_FORMATS:
+        if fmt == "webp" and not features.check("webp"):
+            continue
+        if PIL_FORMATS.get(fmt) not in Image.SAVE:
+            continue
+        supported.append(fmt)
+    return supported
+
+
+def get_content_hash(field_file):
+    digest = hashlib.sha1()
+    field_file.open("rb")
+    try:
+        field_file.seek(0)
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    options = {"quality": settings.IMAGE_VARIANT_QUALITY}
+    if fmt == "jpeg":
+        options.update(optimize=True, progressive=True)
+    elif fmt == "png":
+        options = {"optimize": True}
+    elif fmt == "webp":
+        options["method"] = 4
+    image.save(buffer, PIL_FORMATS[fmt], **options)
+    return buffer.getvalue()
+
+
+def get_placeholder(image):
+    """Şəkil yüklənənə qədər göstərilən kiçik bulanıq JPEG (data URI)"""
+    height = max(round(image.height * PLACEHOLDER_WIDTH / image.width), 1)
+    tiny = image.convert("RGB").resize((PLACEHOLDER_WIDTH, height), Image.BILINEAR)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    tiny.save(buffer, "JPEG", quality=40)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def get_dominant_color(image):
+    """Ən çox işlənən rəngin hex kodu"""
+    small = image.convert("RGB").resize((64, 64), Image.BILINEAR)
+    palette_image = small.quantize(colors=5)
+    count, index = max(palette_image.getcolors())
+    palette = palette_image.getpalette()
+    red, green, blue = palette[index * 3:index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _load_manifest(storage, name):
+    if not storage.exists(name):
+        return None
+    with storage.open(name, "rb") as fp:
+        return json.loads(fp.read().decode())
+
+
+def build_variants(field_file):
+    """
+    Şəkil üçün bütün variantları yaratmaq və manifesti qaytarmaq.
+
+    Manifest modeldə `image_variants` sahəsində saxlanılır:
+    {"source": ..., "hash": ..., "width": ..., "height": ...,
+     "variants": {"webp": {"320": "derivatives/ab/abcd.../320.webp"}, ...},
+     "placeholder": "data:image/jpeg;base64,...", "color": "#1a2b3c"}
+    """
+    storage = field_file.storage
+    content_hash = get_content_hash(field_file)
+    directory = posixpath.join(VARIANTS_DIR, content_hash[:2], content_hash)
+    manifest_name = posixpath.join(directory, MANIFEST_NAME)
+
+    manifest = _load_manifest(storage, manifest_name)
+    if manifest is None or "placeholder" not in manifest:
+        manifest = _generate(field_file, storage, directory, content_hash)
+        if storage.exists(manifest_name):
+            storage.delete(manifest_name)
+        storage.save(manifest_name, ContentFile(json.dumps(manifest).encode()))
+    manifest["source"] = field_file.name
+    return manifest
+
+
+def _generate(field_file, storage, directory, content_hash):
+    field_file.open("rb")
+    try:
+        field_file.seek(0)
+        image = Image.open(field_file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    base_format = "png" if has_alpha else "jpeg"
+    width, height = image.size
+
+    widths = [w for w in settings.IMAGE_VARIANT_WIDTHS if w < width] or [width]
+    formats = [base_format] + get_supported_formats()
+    variants = {fmt: {} for fmt in formats}
+    for target in widths:
+        resized = image.resize(
+            (target, max(round(height * target / width), 1)), Image.LANCZOS
+        )
+        for fmt in formats:
+            name = posixpath.join(directory, f"{target}.{fmt}")
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(_encode(resized, fmt)))
+            variants[fmt][str(target)] = name
+
+    return {
+        "hash": content_hash,
+        "width": width,
+        "height": height,
+        "variants": variants,
+        "placeholder": get_placeholder(image),
+        "color": get_dominant_color(image),
+    }
+
+
+def get_variants(instance, field_name="image"):
+    """`<sahə>_variants` manifesti (məs. image -> image_variants)"""
+    return getattr(instance, f"{field_name}_variants", None) or {}
+
+
+def needs_variants(instance, field_name="image"):
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return False
+    if not getattr(instance, f"{field_name}_placeholder"):
+        return True
+    return get_variants(instance, field_name).get("source") != field_file.name
+
+
+def update_variants(instance, field_name="image"):
+    """Modelin şəkil variantlarını yeniləmək (save siqnallarını işə salmadan)"""
+    manifest = build_variants(getattr(instance, field_name))
+    fields = {
+        f"{field_name}_variants": manifest,
+        f"{field_name}_placeholder": manifest["placeholder"],
+        f"{field_name}_color": manifest["color"],
+    }
+    type(instance).objects.filter(pk=instance.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(instance, name, value)
+    return manifest
+
+
+def get_srcset(manifest, storage):
+    """Manifestdən hər format üçün `srcset` sətri"""
+    srcset = {}
+    for fmt, sizes in (manifest or {}).get("variants", {}).items():
+        srcset[fmt] = ", ".join(
+            f"{storage.url(name)} {width}w"
+            for width, name in sorted(sizes.items(), key=lambda item: int(item[0]))
+        )
+    return srcset
@@ -0,0 +1,90 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def ping(cursor):
+    cursor.execute("SELECT 1")
+    cursor.fetchone()
+
+
+class Command(BaseCommand):
+    help = (
+        "DB bağlantısının xərcini ölçmək: hər sorğuya yeni bağlantı, "
+        "ENGINE-in connect/close dövrü (pool) və daimi bağlantı. "
+        "--threads ilə eyni anda bir neçə thread (threaded/async worker kimi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="hər thread üçün")
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument("--database", default="default")
+
+    def run_thread(self, func, database, iterations):
+        # Django bağlantıları thread-ə aiddir: hər thread öz bağlantısını alır
+        connection = connections[database]
+        timings = []
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                func(connection)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+        return timings
+
+    def measure(self, func, database, iterations, threads):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [
+                executor.submit(self.run_thread, func, database, iterations)
+                for _ in range(threads)
+            ]
+            timings = sorted(t for future in futures for t in future.result())
+        elapsed = time.perf_counter() - start
+        return (
+            statistics.median(timings),
+            timings[int(len(timings) * 0.95) - 1],
+            len(timings) / elapsed,
+        )
+
+    def handle(self, *args, **options):
+        database = options["database"]
+        iterations = options["iterations"]
+        threads = options["threads"]
+
+        def new_connection(connection):
+            # CONN_MAX_AGE=0 olan köhnə rejim: hər sorğuda TCP + autentifikasiya
+            raw = connection.Database.connect(**connection.get_connection_params())
+            try:
+                with raw.cursor() as cursor:
+                    ping(cursor)
+            finally:
+                raw.close()
+
+        def engine_cycle(connection):
+            # ENGINE-in öz connect/close dövrü (pool rejimində pool-dan götürülür)
+            connection.connect()
+            with connection.cursor() as cursor:
+                ping(cursor)
+            connection.close()
+
+        def persistent(connection):
+            with connection.cursor() as cursor:
+                ping(cursor)
+
+        rows = [
+            ("new connection", self.measure(new_connection, database, iterations, threads)),
+            ("engine connect/close", self.measure(engine_cycle, database, iterations, threads)),
+            ("persistent", self.measure(persistent, database, iterations, threads)),
+        ]
+
+        header = f"{'mode':<24}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}"
+        self.stdout.write(f"ENGINE: {connections[database].settings_dict['ENGINE']}, threads: {threads}")
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, (p50, p95, throughput) in rows:
+            self.stdout.write(f"{name:<24}{p50:>10.2f}{p95:>10.2f}{throughput:>10.0f}")
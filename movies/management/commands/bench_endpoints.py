@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from movies.benchmarks import run_suite
+
+
+class Command(BaseCommand):
+    help = "Endpoint-lərin gecikmə, SQL sorğu sayı və yaddaş ölçmələri"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument(
+            "--memory", action="store_true",
+            help="tracemalloc ilə pik yaddaş istifadəsini ölçmək (gecikməni artırır)",
+        )
+        parser.add_argument("--only", nargs="*", help="Yalnız bu ssenariləri icra etmək")
+        parser.add_argument("--output", help="Nəticələri JSON faylına yazmaq")
+        parser.add_argument("--compare", help="Əvvəlki JSON nəticəsi ilə müqayisə")
+
+    def handle(self, *args, **options):
+        # Ölçmələrə budget middleware-inin loq xərci qarışmasın
+        with override_settings(QUERY_BUDGET_ENABLED=False, DEBUG=False, ALLOWED_HOSTS=["*"]):
+            results = run_suite(
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                trace_memory=options["memory"],
+                only=options["only"],
+            )
+
+        previous = {}
+        if options["compare"]:
+            with open(options["compare"]) as fp:
+                previous = {row["name"]: row for row in json.load(fp)["results"]}
+
+        header = f"{'endpoint':<24}{'status':>10}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'KiB':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            line = "{:<24}{:>10}{:>10.2f}{:>10.2f}{:>9}{:>9}".format(
+                row["name"], ",".join(map(str, row["status"])), row["p50_ms"],
+                row["p95_ms"], row["queries"],
+                "-" if row["alloc_kib"] is None else row["alloc_kib"],
+            )
+            old = previous.get(row["name"])
+            if old:
+                line += "   p50 {:+.1f}%  queries {:+d}".format(
+                    (row["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0,
+                    row["queries"] - old["queries"],
+                )
+            self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as fp:
+                json.dump({
+                    "database": settings.DATABASES["default"]["ENGINE"],
+                    "iterations": options["iterations"],
+                    "results": results,
+                }, fp, indent=2)
+            self.stdout.write(f"Nəticələr {options['output']} faylına yazıldı")
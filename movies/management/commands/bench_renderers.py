@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from movies.benchmarks import compare_renderers
+
+
+class Command(BaseCommand):
+    help = "JSON və MessagePack renderer-lərinin encode vaxtı və cavab ölçüsü"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        results = compare_renderers(options["iterations"], options["page_size"])
+        header = f"{'payload':<20}{'format':>9}{'p50 ms':>10}{'bytes':>12}{'gzip':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            self.stdout.write("{:<20}{:>9}{:>10.2f}{:>12}{:>10}".format(
+                row["payload"], row["format"], row["p50_ms"], row["bytes"], row["gzip_bytes"]
+            ))
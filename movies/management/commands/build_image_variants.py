@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from movies.images import needs_variants, update_variants
+
+MODELS = ("movies.Movie", "movies.MovieShots", "movies.Genre", "movies.StreamingService")
+FIELDS = ("id", "image", "image_variants", "image_placeholder")
+
+
+def process_image(label, pk, force):
+    """Bir şəklin variantlarını, yer tutucusunu və rəngini hesablamaq"""
+    instance = apps.get_model(label).objects.only(*FIELDS).filter(pk=pk).first()
+    if instance is None or not (force or needs_variants(instance)):
+        return False
+    update_variants(instance)
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        "Mövcud şəkillər üçün variantların, bulanıq yer tutucuların və "
+        "əsas rənglərin paralel hesablanması"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Hazır olanları da yenidən hesablamaq"
+        )
+        parser.add_argument(
+            "--processes", type=int, default=None,
+            help="Proses sayı (default: CPU sayı)",
+        )
+
+    def handle(self, *args, **options):
+        tasks = []
+        for label in MODELS:
+            queryset = apps.get_model(label).objects.exclude(image="").only(*FIELDS)
+            for instance in queryset.iterator():
+                if options["force"] or needs_variants(instance):
+                    tasks.append((label, instance.pk))
+        if not tasks:
+            self.stdout.write("Bütün şəkillər hazırdır")
+            return
+
+        # Uşaq proseslər valideynin DB bağlantısını paylaşmamalıdır
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options["processes"]) as executor:
+            futures = {
+                executor.submit(process_image, label, pk, options["force"]): (label, pk)
+                for label, pk in tasks
+            }
+            for future in as_completed(futures):
+                label, pk = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{label} {pk}: {exc}")
+                else:
+                    done += 1
+        self.stdout.write(self.style.SUCCESS(f"Hazırlandı: {done}, uğursuz: {failed}"))
@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies.similarity import build_similar_movies
+
+
+class Command(BaseCommand):
+    help = "Oxşar kinoların siyahılarını yenidən hesablamaq"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=settings.SIMILAR_MOVIES_TOP_K)
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.SIMILAR_MOVIES_CHUNK_SIZE,
+            help="Bir dəfədə hesablanan kino sayı (yaddaşı məhdudlaşdırır)",
+        )
+        parser.add_argument(
+            "--min-score", type=float, default=settings.SIMILAR_MOVIES_MIN_SCORE
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stored = build_similar_movies(
+            options["top_k"], options["chunk_size"], options["min_score"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Yazıldı: {stored} qonşu, {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from movies.changes import compact
+
+
+class Command(BaseCommand):
+    help = "Dəyişiklik jurnalının köhnə hissəsini sıxmaq"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.CHANGE_FEED_RETENTION_DAYS,
+            help="Bundan köhnə hadisələr sıxılır",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options["days"])
+        removed = compact(older_than, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Silinən hadisələr: {removed}"))
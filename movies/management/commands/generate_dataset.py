@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from movies.benchmarks import flush_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Performans ölçmələri üçün sintetik məlumatların yaradılması"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movies", type=int, default=200)
+        parser.add_argument("--genres", type=int, default=20)
+        parser.add_argument("--directors", type=int, default=100)
+        parser.add_argument("--platforms", type=int, default=6)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--ratings-per-movie", type=int, default=20)
+        parser.add_argument("--reviews-per-movie", type=int, default=10)
+        parser.add_argument("--replies-per-review", type=int, default=2)
+        parser.add_argument("--likes-per-review", type=int, default=5)
+        parser.add_argument("--watchlist-per-user", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--flush", action="store_true",
+            help="Əvvəlki sintetik məlumatları silmək",
+        )
+
+    def handle(self, *args, **options):
+        if options["flush"]:
+            flush_dataset()
+            self.stdout.write("Köhnə sintetik məlumatlar silindi")
+
+        counts = generate_dataset(
+            movies=options["movies"],
+            genres=options["genres"],
+            directors=options["directors"],
+            platforms=options["platforms"],
+            users=options["users"],
+            ratings_per_movie=options["ratings_per_movie"],
+            reviews_per_movie=options["reviews_per_movie"],
+            replies_per_review=options["replies_per_review"],
+            likes_per_review=options["likes_per_review"],
+            watchlist_per_user=options["watchlist_per_user"],
+            seed=options["seed"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{name}: {count}" for name, count in counts.items())
+        ))
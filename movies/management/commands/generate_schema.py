@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from moviesapi.yasg import SCHEMA_FORMATS, write_schema
+
+
+class Command(BaseCommand):
+    help = "API sxemini (OpenAPI) JSON və YAML faylları kimi yazmaq"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir", default=settings.SCHEMA_DIR,
+            help="Faylların yazılacağı qovluq",
+        )
+        parser.add_argument(
+            "--format", choices=list(SCHEMA_FORMATS), action="append",
+            help="Yalnız bu format (təkrarlana bilər)",
+        )
+
+    def handle(self, *args, **options):
+        formats = options["format"] or list(SCHEMA_FORMATS)
+        for path in write_schema(options["output_dir"], formats):
+            self.stdout.write(self.style.SUCCESS(f"Yazıldı: {path}"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.publication import apply_schedule
+
+
+class Command(BaseCommand):
+    help = "Planlaşdırılmış nəşr və nəşrin bitmə vaxtlarını tətbiq etmək"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop", action="store_true", help="Dayanmadan işləmək (cron əvəzinə)"
+        )
+        parser.add_argument("--interval", type=float, default=60)
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                published, unpublished = apply_schedule(options["batch_size"])
+                if published or unpublished:
+                    self.stdout.write(
+                        f"Nəşr olundu: {published}, qaralamaya salındı: {unpublished}"
+                    )
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movies.recommendations import export_ratings, save_model, train
+
+
+class Command(BaseCommand):
+    help = "Reytinqlərdən tövsiyə modelini (ALS) öyrətmək və faktorları yazmaq"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--factors", type=int, default=settings.RECOMMENDATIONS_FACTORS)
+        parser.add_argument(
+            "--iterations", type=int, default=settings.RECOMMENDATIONS_ITERATIONS
+        )
+        parser.add_argument(
+            "--regularization", type=float, default=settings.RECOMMENDATIONS_REGULARIZATION
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        users, movies, stars = export_ratings()
+        if not stars.size:
+            self.stdout.write("Reytinq yoxdur")
+            return
+        user_ids, movie_ids, user_factors, item_factors = train(
+            users, movies, stars, options["factors"],
+            options["iterations"], options["regularization"],
+        )
+        version = save_model(user_ids, movie_ids, user_factors, item_factors)
+        self.stdout.write(self.style.SUCCESS(
+            f"Versiya {version}: {user_ids.size} istifadəçi, {movie_ids.size} kino, "
+            f"{time.perf_counter() - start:.1f}s"
+        ))
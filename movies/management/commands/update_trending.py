@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from movies.cache import bump_section_version
+from movies.trending import fold_buckets
+
+
+class Command(BaseCommand):
+    help = "Bağlanmış aktivlik intervallarını trend ballarına əlavə etmək"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true", help="Dayanmadan işləmək (cron əvəzinə)"
+        )
+        parser.add_argument("--interval", type=float, default=60)
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                movies = fold_buckets()
+                if movies:
+                    # yalnız trending bölməsinin keşi yenilənir
+                    bump_section_version("trending")
+                    self.stdout.write(f"Yenilənən kinolar: {movies}")
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
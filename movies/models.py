@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Q
+from django.utils import timezone
 from datetime import date
 from django.urls import reverse
 from django.conf import settings
@@ -7,6 +9,30 @@ from django.conf import settings
 User = settings.AUTH_USER_MODEL
 
 
+class AtomicSaveMixin:
+    """
+    save() və post_save siqnalları bir tranzaksiyada icra olunur.
+
+    Dəyişiklik jurnalı (movies.changes) siqnalda yazıldığı üçün dəyişiklik
+    və onun hadisəsi ya birlikdə yazılır, ya da heç biri yazılmır.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class ImageVariantsModel(models.Model):
+    """Kiçildilmiş şəkil variantları olan modellər (movies.images)"""
+    image_variants = models.JSONField("Şəkil variantları", default=dict, blank=True, editable=False)
+    image_placeholder = models.TextField("Bulanıq yer tutucu", blank=True, editable=False)
+    image_color = models.CharField("Əsas rəng", max_length=7, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class Director(models.Model):
     """Rejissor"""
     name = models.CharField("Ad Soyad", max_length=100)
@@ -25,7 +51,7 @@ class Director(models.Model):
         verbose_name_plural = "Rejissorlar"
 
 
-class Genre(models.Model):
+class Genre(ImageVariantsModel):
     """Janr"""
     name = models.CharField("Ad", max_length=100)
     image = models.ImageField("Icon", upload_to="genre_icons/", null=True, blank=True)
@@ -53,7 +79,7 @@ class Certificate(models.Model):
         verbose_name_plural = "Sertifikatlar"
 
 
-class ImdbRating(models.Model):
+class ImdbRating(AtomicSaveMixin, models.Model):
     """IMDb Reytinqi"""
     point = models.FloatField(null=True, blank=True)
     votes = models.IntegerField(null=True, blank=True)
@@ -67,7 +93,7 @@ class ImdbRating(models.Model):
         verbose_name_plural = "IMDb Reytinqləri"
 
 
-class StreamingService(models.Model):
+class StreamingService(ImageVariantsModel):
     """Yayım Platforması"""
     name = models.CharField(max_length=50)
     image = models.ImageField("Logo", upload_to="platform_logos/", null=True, blank=True)
@@ -94,7 +120,14 @@ class Production(models.Model):
         verbose_name_plural = "İstehsal Şirkətləri"
 
 
-class Movie(models.Model):
+class PublishedManager(models.Manager):
+    """İctimai görünən kinolar (bütün public sorğular üçün vahid şərt)"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(draft=False)
+
+
+class Movie(AtomicSaveMixin, ImageVariantsModel):
     """Kino"""
     title = models.CharField("Adı", max_length=100)
     country = models.CharField("Ölkə", max_length=30)
@@ -127,19 +160,49 @@ class Movie(models.Model):
     # timestamp = models.DateTimeField(auto_now_add=True)
     movie_slug = models.SlugField(max_length=130, unique=True, null=True, blank=True)
     draft = models.BooleanField("Qaralama", default=False)
+    publish_at = models.DateTimeField(
+        "Nəşr vaxtı", null=True, blank=True,
+        help_text="Bu vaxt çatdıqda kino avtomatik nəşr olunur"
+    )
+    unpublish_at = models.DateTimeField(
+        "Nəşrin bitmə vaxtı", null=True, blank=True,
+        help_text="Bu vaxt çatdıqda kino avtomatik qaralamaya salınır"
+    )
+
+    objects = models.Manager()
+    published = PublishedManager()
 
     def __str__(self):
         return self.title
 
+    def clean(self):
+        # Gələcəkdə nəşr olunacaq kino o vaxta qədər qaralamada qalır
+        if self.publish_at and self.publish_at > timezone.now():
+            self.draft = True
+
     # def get_absolute_url(self):
     #    return reverse("movie_detail", kwargs={"slug": self.url})
 
     class Meta:
         verbose_name = "Kino"
         verbose_name_plural = "Kinolar"
-
-
-class MovieShots(models.Model):
+        indexes = [
+            models.Index(fields=["year"], name="movie_year_idx"),
+            models.Index(
+                fields=["-premiere"], condition=Q(draft=False), name="movie_published_idx"
+            ),
+            models.Index(
+                fields=["publish_at"], condition=Q(draft=True, publish_at__isnull=False),
+                name="movie_publish_at_idx"
+            ),
+            models.Index(
+                fields=["unpublish_at"], condition=Q(draft=False, unpublish_at__isnull=False),
+                name="movie_unpublish_at_idx"
+            ),
+        ]
+
+
+class MovieShots(ImageVariantsModel):
     """Kinodan şəkillər"""
     title = models.CharField("Başlıq", max_length=100)
     image = models.ImageField("Şəkil", upload_to="movie_shots/")
@@ -166,7 +229,7 @@ class RatingStar(models.Model):
         ordering = ["-value"]
 
 
-class Rating(models.Model):
+class Rating(AtomicSaveMixin, models.Model):
     """Reytinqlər"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="User")
     star = models.ForeignKey(RatingStar, on_delete=models.CASCADE, verbose_name="Ulduz")
@@ -182,7 +245,7 @@ class Rating(models.Model):
         verbose_name_plural = "Reytinqlər"
 
 
-class Review(models.Model):
+class Review(AtomicSaveMixin, models.Model):
     """Rəylər"""
     spoiler = models.BooleanField(default=False)
     content = models.TextField("Mətn", max_length=800)
@@ -208,3 +271,109 @@ class Review(models.Model):
         verbose_name = "Rəy"
         verbose_name_plural = "Rəylər"
         ordering = ["-timestamp"]
+
+
+class SimilarMovie(models.Model):
+    """Oxşar kinolar (movies.similarity tərəfindən hesablanır)"""
+    movie = models.ForeignKey(
+        Movie, on_delete=models.CASCADE, related_name="similar_movies", db_index=False
+    )
+    similar = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    def __str__(self):
+        return f"{self.movie_id} -> {self.similar_id} ({self.score:.3f})"
+
+    class Meta:
+        ordering = ["movie", "rank"]
+        verbose_name = "Oxşar kino"
+        verbose_name_plural = "Oxşar kinolar"
+        constraints = [
+            # (movie, rank) indeksi endpoint-in yeganə oxuma yoludur
+            models.UniqueConstraint(fields=["movie", "rank"], name="similar_movie_rank_uniq"),
+        ]
+
+
+class TrendingScore(models.Model):
+    """Kinonun zamanla sönən aktivlik balı (log miqyasında, movies.trending)"""
+    movie = models.OneToOneField(
+        Movie, on_delete=models.CASCADE, primary_key=True, related_name="trending"
+    )
+    score = models.FloatField()
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.movie_id} - {self.score:.3f}"
+
+    class Meta:
+        verbose_name = "Trend balı"
+        verbose_name_plural = "Trend balları"
+        indexes = [
+            models.Index(fields=["-score"], name="trending_score_idx"),
+        ]
+
+
+class TrendingBucket(models.Model):
+    """Hələ trend balına əlavə olunmamış aktivlik (zaman intervalı üzrə)"""
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    start = models.BigIntegerField()
+    weight = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.movie_id} @ {self.start} - {self.weight}"
+
+    class Meta:
+        verbose_name = "Trend intervalı"
+        verbose_name_plural = "Trend intervalları"
+        constraints = [
+            models.UniqueConstraint(fields=["movie", "start"], name="trending_bucket_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["start"], name="trending_bucket_start_idx"),
+        ]
+
+
+class ChangeEvent(models.Model):
+    """Kataloq dəyişikliklərinin jurnalı (yalnız əlavə olunur)"""
+    OP_UPSERT = "upsert"
+    OP_DELETE = "delete"
+    OP_CHOICES = (
+        (OP_UPSERT, "Upsert"),
+        (OP_DELETE, "Delete"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    # commit sırası ilə verilən nömrə (movies.changes.assign_seqs)
+    seq = models.BigIntegerField(null=True, blank=True, unique=True)
+    model = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    data = models.JSONField(default=dict, blank=True)
+    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.seq} - {self.op} {self.model}:{self.object_id}"
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Dəyişiklik"
+        verbose_name_plural = "Dəyişikliklər"
+        indexes = [
+            models.Index(fields=["model", "object_id", "id"], name="change_object_idx"),
+            models.Index(
+                fields=["id"], name="change_pending_idx", condition=Q(seq__isnull=True)
+            ),
+        ]
+
+
+class ChangeFeedState(models.Model):
+    """Change feed-in son verilmiş seq-i; tək sətir, assign_seqs onu kilidləyir"""
+    last_seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.last_seq)
+
+    class Meta:
+        verbose_name = "Change feed vəziyyəti"
+        verbose_name_plural = "Change feed vəziyyəti"
@@ -0,0 +1,73 @@
+"""
+Kinoların nəşr vəziyyətinin toplu dəyişdirilməsi.
+
+`queryset.update(draft=...)` save siqnallarını işə salmır, ona görə keş və
+indekslər xəbərsiz qalırdı. `set_draft` bir UPDATE icra edir və tranzaksiya
+bitdikdən sonra dəyişən bütün id-lər ilə bir `visibility_changed` hadisəsi
+göndərir. Keş, indeks və s. bu siqnala qoşulub yalnız həmin id-ləri yeniləyir.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .changes import record_many
+from .models import Movie
+
+# Arqumentlər: sender=Movie, ids=[...], draft=True/False
+visibility_changed = Signal()
+
+
+def set_draft(queryset, draft, **fields):
+    """
+    Kinoları toplu şəkildə qaralamaya salmaq və ya nəşr etmək.
+
+    `fields` eyni UPDATE-də yazılacaq əlavə sahələrdir.
+    """
+    with transaction.atomic(using=queryset.db):
+        # Admin filtrləri queryset-i .distinct() edə bilər, DISTINCT ilə isə
+        # FOR UPDATE olmur; kilid id-lərə görə ayrıca sorğuda qoyulur.
+        ids = list(
+            Movie.objects.using(queryset.db)
+            .filter(pk__in=queryset.values("pk")).exclude(draft=draft)
+            .select_for_update().order_by().values_list("id", flat=True)
+        )
+        if not ids:
+            return 0
+        Movie.objects.filter(id__in=ids).update(draft=draft, **fields)
+        # payload yalnız bu sütunları oxuyur (movies.changes._movie)
+        record_many(Movie.objects.filter(id__in=ids).only("id", "title", "draft", "imdb"))
+        transaction.on_commit(
+            lambda: visibility_changed.send(sender=Movie, ids=ids, draft=draft),
+            using=queryset.db,
+        )
+    return len(ids)
+
+
+def apply_schedule(batch_size, now=None):
+    """
+    Vaxtı çatmış planlaşdırılmış nəşrləri tətbiq etmək.
+
+    publish_at keçmiş qaralamalar nəşr olunur, unpublish_at keçmiş kinolar
+    qaralamaya salınır. Tətbiq olunan vaxt sahəsi silinir ki, redaktor kinonu
+    sonradan əl ilə dəyişsə planlayıcı onu geri qaytarmasın. İşlər partiyalarla
+    aparılır, hər partiya bir UPDATE və bir visibility_changed hadisəsidir.
+    """
+    now = now or timezone.now()
+    published = unpublished = 0
+    while True:
+        ids = list(
+            Movie.objects.filter(draft=True, publish_at__lte=now)
+            .order_by("publish_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        published += set_draft(Movie.objects.filter(id__in=ids), False, publish_at=None)
+    while True:
+        ids = list(
+            Movie.objects.filter(draft=False, unpublish_at__lte=now)
+            .order_by("unpublish_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        unpublished += set_draft(Movie.objects.filter(id__in=ids), True, unpublish_at=None)
+    return published, unpublished
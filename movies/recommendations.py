@@ -0,0 +1,196 @@
+"""
+Şəxsi tövsiyələr (Rating matrisinin ALS ilə faktorizasiyası).
+
+`train_recommendations` komandası reytinqləri bir axın sorğusu ilə oxuyur,
+istifadəçi və kino faktorlarını hesablayır və RECOMMENDATIONS_DIR-də yeni
+versiya qovluğuna `.npy` faylları kimi yazır; `CURRENT` faylı aktiv versiyanı
+göstərir. Gunicorn worker-ləri faylları mmap ilə açır, səhifələr ƏS keşində
+bütün proseslər arasında paylaşılır.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from profiles.models import WatchlistTime
+from .models import Movie, Rating
+
+CURRENT_NAME = "CURRENT"
+FILES = ("users", "items", "user_ids", "movie_ids")
+
+
+def export_ratings():
+    """(user_ids, movie_ids, stars) massivləri, bir sorğu ilə"""
+    rows = Rating.objects.values_list("user_id", "movie_id", "star__value").iterator(
+        chunk_size=10000
+    )
+    data = np.fromiter(
+        (value for row in rows for value in row), dtype=np.float64
+    ).reshape(-1, 3)
+    return data[:, 0].astype(np.int64), data[:, 1].astype(np.int64), data[:, 2]
+
+
+def _solve(matrix, factors, regularization):
+    """Matrisin hər sətri üçün qarşı tərəfin faktorlarına görə ridge həlli"""
+    rank = factors.shape[1]
+    result = np.zeros((matrix.shape[0], rank))
+    identity = np.eye(rank)
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        if start == end:
+            continue
+        known = factors[matrix.indices[start:end]]
+        gram = known.T @ known + regularization * (end - start) * identity
+        result[row] = np.linalg.solve(gram, known.T @ matrix.data[start:end])
+    return result
+
+
+def train(users, movies, stars, factors, iterations, regularization, seed=0):
+    """Explicit ALS: (user_ids, movie_ids, user faktorları, kino faktorları)"""
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    movie_ids, movie_index = np.unique(movies, return_inverse=True)
+    # qlobal orta çıxılır, sıralamaya təsir etmir
+    ratings = sparse.csr_matrix(
+        (stars - stars.mean(), (user_index, movie_index)),
+        shape=(user_ids.size, movie_ids.size),
+    )
+    by_movie = ratings.T.tocsr()
+
+    rng = np.random.default_rng(seed)
+    item_factors = rng.normal(scale=0.1, size=(movie_ids.size, factors))
+    user_factors = np.zeros((user_ids.size, factors))
+    for _ in range(iterations):
+        user_factors = _solve(ratings, item_factors, regularization)
+        item_factors = _solve(by_movie, user_factors, regularization)
+    return user_ids, movie_ids, user_factors, item_factors
+
+
+def save_model(user_ids, movie_ids, user_factors, item_factors, directory=None):
+    """Yeni versiyanı yazmaq, CURRENT-i atomar dəyişmək, köhnələri silmək"""
+    directory = directory or settings.RECOMMENDATIONS_DIR
+    os.makedirs(directory, exist_ok=True)
+    # eyni saniyədə iki təlim eyni qovluğa yazmasın: pid və təsadüfi şəkilçi
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    # fayllar müvəqqəti qovluğa yazılır, hazır qovluq bir rename ilə görünür
+    tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+    arrays = {
+        "users": user_factors.astype(np.float32),
+        "items": item_factors.astype(np.float32),
+        "user_ids": user_ids.astype(np.int64),
+        "movie_ids": movie_ids.astype(np.int64),
+    }
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        os.rename(tmp_path, os.path.join(directory, version))
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    tmp = os.path.join(directory, f"{CURRENT_NAME}.{version}.tmp")
+    with open(tmp, "w") as fp:
+        fp.write(version)
+    os.replace(tmp, os.path.join(directory, CURRENT_NAME))
+
+    # açıq mmap-lər silinmiş fayllarla da işləyir, sonuncu iki versiya saxlanılır;
+    # başqa təlimin müvəqqəti qovluğuna (".tmp-") toxunulmur
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if not name.startswith(".") and os.path.isdir(os.path.join(directory, name))
+    )
+    for name in versions[:-2]:
+        if name != version:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return version
+
+
+class FactorStore:
+    """Proses daxilində mmap ilə açılmış aktiv model"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.arrays = None
+        self.checked = None
+
+    def _read_version(self):
+        try:
+            with open(os.path.join(settings.RECOMMENDATIONS_DIR, CURRENT_NAME)) as fp:
+                return fp.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def get(self):
+        """Aktiv versiyanın massivləri; CURRENT hər RELOAD_INTERVAL-da yoxlanılır"""
+        now = time.monotonic()
+        interval = settings.RECOMMENDATIONS_RELOAD_INTERVAL
+        if self.checked is not None and now - self.checked < interval:
+            return self.arrays
+        with self.lock:
+            self.checked = now
+            version = self._read_version()
+            if version == self.version:
+                return self.arrays
+            arrays = None
+            if version is not None:
+                path = os.path.join(settings.RECOMMENDATIONS_DIR, version)
+                arrays = {
+                    name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                    for name in FILES
+                }
+            self.arrays, self.version = arrays, version
+        return self.arrays
+
+
+store = FactorStore()
+
+
+def _positions(ids, values):
+    """Sıralanmış `ids` massivində `values`-un indeksləri (olmayanlar atılır)"""
+    values = np.asarray(values, dtype=np.int64)
+    if not ids.size or not values.size:
+        return np.empty(0, dtype=np.int64)
+    positions = np.searchsorted(ids, values)
+    positions = np.minimum(positions, ids.size - 1)
+    return positions[ids[positions] == values]
+
+
+def get_recommendations(user, count):
+    """
+    İstifadəçi üçün tövsiyə olunan kinolar (sıralı siyahı).
+
+    Reytinq verdiyi və watchlist-ə əlavə etdiyi kinolar çıxarılır. Model
+    yoxdursa və ya istifadəçi modeldə yoxdursa (yeni istifadəçi), ən yüksək
+    reytinqli kinolar qaytarılır.
+    """
+    seen = set(Rating.objects.filter(user=user).values_list("movie_id", flat=True))
+    seen.update(
+        WatchlistTime.objects.filter(watchlist__user=user).values_list("movie_id", flat=True)
+    )
+
+    arrays = store.get()
+    user_position = _positions(arrays["user_ids"], [user.pk]) if arrays else []
+    if not len(user_position):
+        queryset = Movie.published.exclude(id__in=seen).order_by("-imdb__point")
+        return list(queryset.select_related("imdb").prefetch_related("genres")[:count])
+
+    scores = arrays["items"] @ arrays["users"][user_position[0]]
+    scores[_positions(arrays["movie_ids"], list(seen))] = -np.inf
+    # nəşr olunmamış kinolar sonradan çıxarılır, ona görə ehtiyatla çox götürülür
+    size = min(count * 3, scores.size)
+    if size == 0:
+        return []
+    top = np.argpartition(-scores, size - 1)[:size]
+    top = top[np.argsort(-scores[top])]
+    top = top[np.isfinite(scores[top])]
+    ids = [int(pk) for pk in arrays["movie_ids"][top]]
+
+    movies = Movie.published.filter(id__in=ids).select_related("imdb").prefetch_related("genres")
+    by_id = {movie.id: movie for movie in movies}
+    return [by_id[pk] for pk in ids if pk in by_id][:count]
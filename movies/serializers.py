@@ -1,7 +1,9 @@
 from django.conf import settings
 from rest_framework import serializers
+from moviesapi.metrics import MetricsSerializerMixin
 from profiles.serializers import ProfileSerializer
 from profiles.models import Watchlist, WatchlistTime
+from .images import get_srcset, get_variants
 from .models import (
     Director, Movie, Review, Rating, RatingStar, 
     Genre, ImdbRating, StreamingService
@@ -12,6 +14,61 @@ REVIEW_ACTION_OPTIONS = settings.REVIEW_ACTION_OPTIONS
 CATALOG_SECTION_NAMES = settings.CATALOG_SECTION_NAMES
 
 
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Şəklin kiçildilmiş variantları: {"webp": "url 160w, url 320w", ...}
+
+    Manifest `<image_field>_variants` sahəsindən oxunur (image -> image_variants).
+    """
+
+    def __init__(self, image_field="image", **kwargs):
+        self.image_field = image_field
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        if not field_file:
+            return {}
+        return get_srcset(get_variants(instance, self.image_field), field_file.storage)
+
+
+class DynamicFieldsMixin:
+    """
+    `fields` və `expand` parametrləri (?fields=id,title&expand=genres).
+
+    `fields` yalnız göstərilən sahələri saxlayır, `expand` isə
+    `expandable_fields`-dəki sahələri iç-içə serializer ilə əvəz edir.
+    Parametrlər verilməyibsə, iç-içə serializer-lər onları context-dəki
+    `fields_context_key` açarından götürür. `field_requirements` source-u "*"
+    olan sahələrin model sütunlarını göstərir (movies.service.prune_queryset).
+    """
+
+    expandable_fields = {}
+    field_requirements = {}
+    fields_context_key = None
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.requested_fields = fields
+        self.requested_expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested, expand = self.requested_fields, self.requested_expand
+        if requested is None and expand is None and self.fields_context_key:
+            requested, expand = self.context.get(self.fields_context_key, (None, None))
+        for name in expand or ():
+            if name in self.expandable_fields:
+                serializer_class, options = self.expandable_fields[name]
+                fields[name] = serializer_class(read_only=True, **options)
+        if requested:
+            for name in list(fields):
+                if name not in requested:
+                    del fields[name]
+        return fields
+
+
 class FilterReviewListSerializer(serializers.ListSerializer):
     """Parent reviews filter"""
 
@@ -24,7 +81,11 @@ class RecursiveSerializer(serializers.Serializer):
     """Children reviews"""
 
     def to_representation(self, value):
-        serializer = self.parent.parent.__class__(value, context=self.context)
+        parent = self.parent.parent
+        serializer = parent.__class__(
+            value, context=self.context,
+            fields=parent.requested_fields, expand=parent.requested_expand,
+        )
         return serializer.data
 
 
@@ -42,9 +103,10 @@ class ReviewActionSerializer(serializers.Serializer):
         return value
 
 
-class ReviewCreateSerializer(serializers.ModelSerializer):
+class ReviewCreateSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
     """Rəylərin əlavə olunması"""
 
+    # request.user profili ilə birlikdə yüklənir (accounts.authentication)
     user = ProfileSerializer(source="user.profile", read_only=True)
 
     class Meta:
@@ -79,9 +141,11 @@ class ParentReviewSerializer(serializers.ModelSerializer):
         return obj.user.username
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(MetricsSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Rəylərin gosterilmesi"""
 
+    fields_context_key = "review_fields"
+
     # user = ProfileSerializer(source='user.profile', read_only=True)
     likes = serializers.SerializerMethodField(read_only=True)
     unlikes = serializers.SerializerMethodField(read_only=True)
@@ -121,7 +185,7 @@ class ReviewSerializer(serializers.ModelSerializer):
             return False
 
 
-class ReviewListSerializer(serializers.ModelSerializer):
+class ReviewListSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
     """Rəylərin list şəklində göstərilməsi"""
 
     review_count = serializers.SerializerMethodField(read_only=True)
@@ -135,12 +199,14 @@ class ReviewListSerializer(serializers.ModelSerializer):
         return obj.reviews.count()
 
 
-class GenreListSerializer(serializers.ModelSerializer):
+class GenreListSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
     """Janrları göstərmək"""
 
+    image_srcset = ImageSrcsetField()
+
     class Meta:
         model = Genre
-        fields = "__all__"  
+        exclude = ("image_variants",)
 
 
 class ImdbListSerializer(serializers.ModelSerializer):
@@ -157,7 +223,7 @@ class ImdbListSerializer(serializers.ModelSerializer):
         return f"{votes:,}"
 
 
-class DirectorListSerializer(serializers.ModelSerializer):
+class DirectorListSerializer(MetricsSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Rejissorlarin siyahisi"""
 
     class Meta:
@@ -165,7 +231,7 @@ class DirectorListSerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
-class DirectorDetailSerializer(serializers.ModelSerializer):
+class DirectorDetailSerializer(MetricsSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Tek rejissorun melumatlari"""
 
     class Meta:
@@ -173,21 +239,41 @@ class DirectorDetailSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class MovieListSerializer(serializers.ModelSerializer):
+class StreamingListSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
+    """Janrları göstərmək"""
+
+    image_srcset = ImageSrcsetField()
+
+    class Meta:
+        model = StreamingService
+        fields = ("image", "image_srcset", "image_placeholder", "image_color", "slug")
+
+
+class MovieListSerializer(MetricsSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Kinoların siyahısı"""
 
     genres = serializers.SlugRelatedField(slug_field="name", read_only=True, many=True)
     imdb = serializers.SlugRelatedField(slug_field="point", read_only=True)
+    image_srcset = ImageSrcsetField()
+
+    expandable_fields = {
+        "genres": (GenreListSerializer, {"many": True}),
+        "imdb": (ImdbListSerializer, {}),
+    }
+    field_requirements = {"image_srcset": ("image", "image_variants")}
 
     class Meta:
         model = Movie
-        fields = ("id", "title", "image", "genres", "imdb")
+        fields = (
+            "id", "title", "image", "image_srcset", "image_placeholder",
+            "image_color", "genres", "imdb",
+        )
 
     # def get_user_star(self, instance):
     #    user_id = self.context['request'].user
 
 
-class MovieDetailSerializer(serializers.ModelSerializer):
+class MovieDetailSerializer(MetricsSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     """Kinonun detallari"""
 
     certificate = serializers.SlugRelatedField(slug_field="rated", read_only=True)
@@ -208,10 +294,17 @@ class MovieDetailSerializer(serializers.ModelSerializer):
     )
     budget = serializers.SerializerMethodField(read_only=True)
     box_office = serializers.SerializerMethodField(read_only=True)
+    image_srcset = ImageSrcsetField()
+
+    expandable_fields = {
+        "directors": (DirectorListSerializer, {"many": True}),
+        "streaming": (StreamingListSerializer, {"many": True}),
+    }
+    field_requirements = {"image_srcset": ("image", "image_variants")}
 
     class Meta:
         model = Movie
-        exclude = ("draft",)
+        exclude = ("draft", "publish_at", "unpublish_at", "image_variants")
 
     def get_budget(self, obj):
         return f"{obj.budget:,}"
@@ -220,10 +313,12 @@ class MovieDetailSerializer(serializers.ModelSerializer):
         return f"{obj.box_office:,}"
     
     def get_count_votes(self, obj):
-        return obj.ratings.count()
+        # movies/batch/ sayı annotasiya ilə bir sorğuda hesablayır
+        count = getattr(obj, "ratings_count", None)
+        return obj.ratings.count() if count is None else count
 
 
-class HomePageVideoSerializer(serializers.ModelSerializer):
+class HomePageVideoSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
     """Ana səhifədəki video"""
 
     welcome_text = serializers.SerializerMethodField(read_only=True)
@@ -248,14 +343,6 @@ class HomePageVideoSerializer(serializers.ModelSerializer):
                  tv-series will be available for you!"
 
 
-class StreamingListSerializer(serializers.ModelSerializer):
-    """Janrları göstərmək"""
-
-    class Meta:
-        model = StreamingService
-        fields = ("image", "slug")
-
-
 class CreateRatingSerializer(serializers.ModelSerializer):
     """Kinolara reytinqin əlavə olunması"""
 
@@ -274,7 +361,7 @@ class CreateRatingSerializer(serializers.ModelSerializer):
         return rating
 
 
-class UserWatchlistSerializer(serializers.ModelSerializer):
+class UserWatchlistSerializer(MetricsSerializerMixin, serializers.ModelSerializer):
     # User Watchlist siyahisi
 
     movie = MovieListSerializer(read_only=True)
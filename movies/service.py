@@ -5,11 +5,18 @@ from django.db.models import Avg, Sum, Q, Count
 from datetime import datetime, date, timedelta
 from django.utils import timezone
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
 
+from moviesapi.compression import cache_compressed
 from profiles.models import WatchlistTime
-from .models import Movie, Review
+from .cache import movie_cache_keys, section_cache_keys
+from .models import Movie, Review, Genre, StreamingService, SimilarMovie
+from .trending import get_trending_movies
 from .serializers import (
-    ReviewActionSerializer, ReviewSerializer, MovieListSerializer
+    ReviewActionSerializer, ReviewSerializer, MovieListSerializer,
+    HomePageVideoSerializer, GenreListSerializer, StreamingListSerializer,
 )
 
 CATALOG_SECTION_NAMES = settings.CATALOG_SECTION_NAMES
@@ -17,7 +24,7 @@ CATALOG_SECTION_NAMES = settings.CATALOG_SECTION_NAMES
 
 def get_movie_rating_star(request):
     if request.user.is_authenticated:
-        movies = Movie.objects.filter(draft=False).annotate(
+        movies = Movie.published.annotate(
             rating_user=Avg(
                 'ratings__star', filter=Q(ratings__user=request.user)
             )
@@ -30,7 +37,7 @@ def get_movie_rating_star(request):
         ).order_by('id')
         return movies
     else:
-        movies = Movie.objects.filter(draft=False).annotate(
+        movies = Movie.published.annotate(
             middle_star=Avg('ratings__star')
         ).order_by('id')
         return movies
@@ -38,57 +45,150 @@ def get_movie_rating_star(request):
 
 def get_movies_in_the_last_two_month(self):
     last_two_month = date.today() - timedelta(days=2920)
-    qs = Movie.objects.filter(draft=False, premiere__gte=last_two_month)
+    qs = Movie.published.filter(premiere__gte=last_two_month)
     qs = qs.filter(imdb__point__gte=6.0).order_by('-imdb__votes')
     return qs
 
 
-def get_movies_catalog_queryset(request):
-    movies_count = request.GET.get('count', '')
-    section_name = request.GET.get('section', '')
+def get_new_added_movies():
+    last_days = timezone.now() - timedelta(days=100)
+    return Movie.published.filter(
+        timestamp__gte=last_days, premiere__lt=last_days
+    ).order_by('-timestamp')
+
+
+def get_most_popular_movies():
+    return Movie.published.filter(
+        imdb__point__range=[7.0, 8.0], imdb__votes__gte=300000
+    ).order_by('-premiere')
+
+
+def get_most_rated_movies():
+    return Movie.published.filter(
+        imdb__votes__gte=800000
+    ).order_by('-imdb__point')
+
+
+# kataloq bölməsinin adı -> queryset funksiyası
+CATALOG_SECTIONS = {
+    "new-added": get_new_added_movies,
+    "most-popular": get_most_popular_movies,
+    "most-rated": get_most_rated_movies,
+    "trending": get_trending_movies,
+}
+
+
+def parse_catalog_params(params):
+    """`count` və `section` parametrlərini yoxlamaq: (count, section, errors)"""
+    movies_count = params.get('count', '')
+    section_name = params.get('section', '')
 
     if movies_count == '' or section_name == '':
-        return Response(
-            {
-                "count": "This field is required",
-                "section": "This field is required"
-            }, status=400
-        )
+        return None, None, {
+            "count": "This field is required",
+            "section": "This field is required"
+        }
     try:
         movies_count = int(movies_count)
         movies_count = 12 if movies_count != 12 and movies_count != 6 else movies_count
     except ValueError:
-        return Response(
-            {"count": "This field has to be a number"}, status=400
-        )
+        return None, None, {"count": "This field has to be a number"}
 
     section_name = section_name.lower().strip()
-    if section_name not in CATALOG_SECTION_NAMES:
-        return Response(
-            {"section": "This is not a valid section name for catalog"}, status=400
-        )
+    if section_name not in CATALOG_SECTION_NAMES or section_name not in CATALOG_SECTIONS:
+        return None, None, {"section": "This is not a valid section name for catalog"}
+    return movies_count, section_name, None
+
 
-    if section_name == "new-added":
-        last_days = timezone.now() - timedelta(days=100)
-        queryset = Movie.objects.filter(
-            draft=False, timestamp__gte=last_days, premiere__lt=last_days
-        ).order_by('-timestamp')[:movies_count]
-        serializer = MovieListSerializer(queryset, many=True)
-        return Response(serializer.data, status=200)
-
-    elif section_name == "most-popular":
-        queryset = Movie.objects.filter(
-            draft=False, imdb__point__range=[7.0, 8.0], imdb__votes__gte=300000
-        ).order_by('-premiere')[:movies_count]
-        serializer = MovieListSerializer(queryset, many=True)
-        return Response(serializer.data, status=200)
-
-    elif section_name == "most-rated":
-        queryset = Movie.objects.filter(
-            draft=False, imdb__votes__gte=800000
-        ).order_by('-imdb__point')[:movies_count]
-        serializer = MovieListSerializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+def get_movies_catalog_queryset(request):
+    movies_count, section_name, errors = parse_catalog_params(request.GET)
+    if errors:
+        return Response(errors, status=400)
+
+    return cache_compressed(Response(get_catalog_movies(section_name, movies_count), status=200))
+
+
+def get_catalog_movies(name, count):
+    """Kataloq bölməsi ana səhifə ilə eyni keşdən (bölmə id-ləri və kinolar)"""
+    ids = get_cached_sections({name: count})[name]
+    movies = get_cached_movies(ids)
+    return [movies[pk] for pk in ids if pk in movies]
+
+
+def get_section_ids(name, count):
+    if name == "new-movies":
+        queryset = get_movies_in_the_last_two_month(None)
+        return list(queryset.values_list("id", flat=True)[1 : count + 1])
+    return list(CATALOG_SECTIONS[name]().values_list("id", flat=True)[:count])
+
+
+def get_cached_sections(counts):
+    """Bölmələrin id siyahıları; hər bölmə öz versiyası ilə keşlənir"""
+    keys = section_cache_keys(counts)
+    found = cache.get_many(list(keys.values()))
+    sections, missing = {}, {}
+    for name, key in keys.items():
+        if key in found:
+            sections[name] = found[key]
+        else:
+            sections[name] = missing[key] = get_section_ids(name, counts[name])
+    if missing:
+        cache.set_many(missing, settings.HOME_CACHE_TIMEOUT)
+    return sections
+
+
+def get_cached_movies(ids):
+    """{id: MovieListSerializer nəticəsi}; yalnız keşdə olmayanlar yüklənir"""
+    keys = movie_cache_keys(ids)
+    found = cache.get_many(list(keys.values()))
+    movies = {pk: found[key] for pk, key in keys.items() if key in found}
+    missing = [pk for pk in ids if pk not in movies]
+    if missing:
+        queryset = (
+            Movie.published.filter(id__in=missing)
+            .select_related("imdb").prefetch_related("genres")
+        )
+        loaded = {movie["id"]: movie for movie in MovieListSerializer(queryset, many=True).data}
+        cache.set_many(
+            {keys[pk]: data for pk, data in loaded.items()}, settings.HOME_CACHE_TIMEOUT
+        )
+        movies.update(loaded)
+    return movies
+
+
+def get_home_page(small=False):
+    """
+    Ana səhifənin bütün bölmələri bir cavabda.
+
+    Bölmələr yalnız kino id-lərini saxlayır; bir neçə bölmədə təkrarlanan
+    kinolar `movies` lüğətində bir dəfə, bir sorğu ilə yüklənir. Bölmələr və
+    kinolar ayrıca keşlənir (movies.cache), bir bölmənin dəyişməsi digərlərini
+    yenidən hesablatmır.
+    """
+    new_count, catalog_count = (6, 6) if small else (8, 12)
+    counts = {"new-movies": new_count}
+    counts.update((name, catalog_count) for name in CATALOG_SECTION_NAMES)
+    sections = get_cached_sections(counts)
+
+    ids = sorted({pk for section in sections.values() for pk in section})
+    return {
+        "video": HomePageVideoSerializer(get_movies_in_the_last_two_month(None).first()).data,
+        "genres": GenreListSerializer(Genre.objects.all(), many=True).data,
+        "platforms": StreamingListSerializer(StreamingService.objects.all(), many=True).data,
+        "movies": get_cached_movies(ids),
+        "sections": sections,
+    }
+
+
+def get_similar_movies(pk):
+    """Əvvəlcədən hesablanmış qonşular, (movie, rank) indeksi ilə bir sorğu"""
+    rows = (
+        # similar__draft: Movie.published ilə eyni şərt, JOIN içində
+        SimilarMovie.objects.filter(movie_id=pk, similar__draft=False)
+        .select_related("similar__imdb").prefetch_related("similar__genres")
+        .order_by("rank")
+    )
+    return [row.similar for row in rows]
 
 
 def get_review_action(request):
@@ -136,8 +236,116 @@ def get_review_action(request):
     return Response({}, status=200)
 
 
+def parse_field_list(value):
+    """"id, title,genres" -> ["id", "title", "genres"]"""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def parse_id_list(value, limit):
+    """"3,1,3" -> ([3, 1], None); təkrarlar atılır, sıra saxlanılır"""
+    values = parse_field_list(value)
+    # int() "-1", "+1" və "1_0" qəbul edir, id isə yalnız müsbət rəqəmlərdir
+    if not all(pk.isascii() and pk.isdigit() and int(pk) > 0 for pk in values):
+        return None, {"ids": "This field has to be comma-separated positive numbers"}
+    ids = list(dict.fromkeys(int(pk) for pk in values))
+    if not ids:
+        return None, {"ids": "This field is required"}
+    if len(ids) > limit:
+        return None, {"ids": f"Ensure this field has no more than {limit} ids"}
+    return ids, None
+
+
+def get_movies_batch(request, ids, serializer):
+    """
+    Bir neçə kinonun detalları: bir annotasiyalı sorğu və toplu prefetch-lər.
+
+    Nəticə istənilən sırada qaytarılır, tapılmayan id-lər ayrıca göstərilir.
+    """
+    queryset = get_movie_rating_star(request).filter(id__in=ids).annotate(
+        ratings_count=Count('ratings', distinct=True)
+    )
+    by_id = {movie.id: movie for movie in prune_queryset(queryset, serializer)}
+    movies = [by_id[pk] for pk in ids if pk in by_id]
+    missing = [pk for pk in ids if pk not in by_id]
+    return movies, missing
+
+
+def prune_queryset(queryset, serializer):
+    """
+    Serializer-in sahələrinə görə queryset-i daraltmaq.
+
+    Yalnız lazım olan sütunlar `only()` ilə yüklənir (məs. böyük `description`
+    istənilməyibsə oxunmur), əlaqəli sahələr yalnız istənildikdə
+    select_related/prefetch_related olunur.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    model = queryset.model
+    requirements = getattr(serializer, "field_requirements", {})
+    columns, related, prefetch = {"pk"}, set(), set()
+    for name, field in serializer.fields.items():
+        if name in requirements:
+            paths, traverse = requirements[name], False
+        elif field.source == "*":
+            if not isinstance(field, serializers.SerializerMethodField):
+                continue
+            # get_budget kimi metodlar çox vaxt eyniadlı sütunu formatlayır;
+            # sütun yoxdursa aşağıda FieldDoesNotExist ilə atlanır
+            paths, traverse = [name], False
+        else:
+            paths = [field.source.split(".")[0]]
+            relation = getattr(field, "child_relation", field)
+            traverse = not isinstance(relation, serializers.PrimaryKeyRelatedField)
+        for path in paths:
+            try:
+                model_field = model._meta.get_field(path)
+            except FieldDoesNotExist:
+                # annotasiya, property və ya SerializerMethodField
+                continue
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetch.add(path)
+            elif not model_field.concrete:
+                prefetch.add(path)
+            else:
+                columns.add(path)
+                if model_field.is_relation and traverse:
+                    related.add(path)
+    queryset = queryset.only(*columns)
+    if related:
+        queryset = queryset.select_related(*related)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class SparseFieldsMixin:
+    """Generic view-lar üçün ?fields= və ?expand= dəstəyi"""
+
+    def get_field_options(self):
+        request = getattr(self, "request", None)
+        if request is None or getattr(self, "swagger_fake_view", False):
+            return {}
+        return {
+            "fields": parse_field_list(request.query_params.get("fields")) or None,
+            "expand": parse_field_list(request.query_params.get("expand")),
+        }
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_field_options())
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, "swagger_fake_view", False):
+            return queryset
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context(), **self.get_field_options()
+        )
+        return prune_queryset(queryset, serializer)
+
+
 class PaginationMovies(PageNumberPagination):
     page_size = 10
+    page_size_query_param = 'page_size'
     max_page_size = 1000
 
     def get_paginated_response(self, data):
@@ -1,7 +1,16 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.contrib.auth.models import Group
 from django.conf import settings
-from .models import Movie
+from profiles.models import Watchlist, WatchlistTime
+from .cache import bump_catalog_version, invalidate_movies
+from .changes import record, record_many
+from .images import needs_variants
+from .models import (
+    Movie, MovieShots, Genre, StreamingService, ImdbRating, Rating, Review, ChangeEvent
+)
+from .publication import visibility_changed
+from .tasks import enqueue_image_variants
+from .trending import record_activity
 
 
 def user_did_save(sender, instance, created, *args, **kwargs):
@@ -16,3 +25,92 @@ def user_did_save(sender, instance, created, *args, **kwargs):
         obj.save()
 
 post_save.connect(user_did_save, sender=Movie)
+
+
+def image_did_save(sender, instance, *args, **kwargs):
+    if needs_variants(instance):
+        enqueue_image_variants(instance)
+
+for model in (Movie, MovieShots, Genre, StreamingService):
+    post_save.connect(image_did_save, sender=model)
+
+
+def catalog_did_change(sender, *args, **kwargs):
+    bump_catalog_version()
+
+for model in (Movie, ImdbRating, Genre, StreamingService):
+    post_save.connect(catalog_did_change, sender=model)
+    post_delete.connect(catalog_did_change, sender=model)
+
+
+def visibility_did_change(sender, ids, *args, **kwargs):
+    invalidate_movies(ids)
+
+visibility_changed.connect(visibility_did_change, sender=Movie)
+
+
+def change_did_save(sender, instance, raw=False, *args, **kwargs):
+    if not raw:
+        record(instance)
+
+
+def change_did_delete(sender, instance, *args, **kwargs):
+    record(instance, ChangeEvent.OP_DELETE)
+
+for model in (Movie, ImdbRating, Rating, Review, WatchlistTime):
+    post_save.connect(change_did_save, sender=model)
+    post_delete.connect(change_did_delete, sender=model)
+
+
+def watchlist_did_change(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    # movie.add() WatchlistTime-ı bulk_create ilə yaradır, post_save göndərilmir.
+    # Silinmə post_delete ilə qeyd olunur.
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        rows = WatchlistTime.objects.filter(movie=instance, watchlist_id__in=pk_set)
+    else:
+        rows = WatchlistTime.objects.filter(watchlist=instance, movie_id__in=pk_set)
+    record_many(rows)
+
+m2m_changed.connect(watchlist_did_change, sender=Watchlist.movie.through)
+
+
+def rating_did_save(sender, instance, created, raw=False, *args, **kwargs):
+    if created and not raw:
+        record_activity(instance.movie_id, "rating")
+
+post_save.connect(rating_did_save, sender=Rating)
+
+
+def review_did_save(sender, instance, created, raw=False, *args, **kwargs):
+    if created and not raw:
+        record_activity(instance.movie_id, "review")
+
+post_save.connect(review_did_save, sender=Review)
+
+
+def review_did_like(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        # user.review_user_like.add(*reviews)
+        movies = Review.objects.filter(id__in=pk_set).values_list("movie_id", flat=True)
+        for movie_id in movies:
+            record_activity(movie_id, "like")
+    else:
+        record_activity(instance.movie_id, "like", len(pk_set))
+
+m2m_changed.connect(review_did_like, sender=Review.likes.through)
+
+
+def watchlist_did_add(sender, instance, action, reverse, pk_set, *args, **kwargs):
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        record_activity(instance.pk, "watchlist", len(pk_set))
+    else:
+        for movie_id in pk_set:
+            record_activity(movie_id, "watchlist")
+
+m2m_changed.connect(watchlist_did_add, sender=Watchlist.movie.through)
@@ -0,0 +1,161 @@
+"""
+"Oxşar kinolar" (item-to-item) hesablanması.
+
+Hər kino seyrək vektorla təsvir olunur: istifadəçi reytinqləri (istifadəçinin
+orta balı çıxılmaqla), watchlist-lər, janrlar və rejissorlar. Hər blok ayrıca
+normallaşdırılıb SIMILAR_MOVIES_WEIGHTS ilə çəkilir, oxşarlıq isə kosinusdur.
+Qonşular kinolar üzrə hissə-hissə hesablanır ki, yaddaş
+SIMILAR_MOVIES_CHUNK_SIZE x kino sayı ilə məhdud qalsın.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from profiles.models import WatchlistTime
+from .models import Movie, Rating, SimilarMovie
+
+
+def _columns(rows, count):
+    """values_list nəticəsini numpy sütunlarına çevirmək"""
+    data = np.fromiter(
+        (value for row in rows for value in row), dtype=np.float64
+    ).reshape(-1, count)
+    return [data[:, i] for i in range(count)]
+
+
+def get_rating_pairs():
+    movie, user, star = _columns(
+        Rating.objects.values_list("movie_id", "user_id", "star__value").iterator(), 3
+    )
+    if star.size:
+        # adjusted cosine: hər istifadəçinin orta balı çıxılır
+        _, users = np.unique(user, return_inverse=True)
+        means = np.bincount(users, weights=star) / np.bincount(users)
+        star = star - means[users]
+    return movie, user, star
+
+
+def get_watchlist_pairs():
+    movie, watchlist = _columns(
+        WatchlistTime.objects.values_list("movie_id", "watchlist_id").iterator(), 2
+    )
+    return movie, watchlist, np.ones_like(movie)
+
+
+def get_genre_pairs():
+    movie, genre = _columns(
+        Movie.genres.through.objects.values_list("movie_id", "genre_id").iterator(), 2
+    )
+    return movie, genre, np.ones_like(movie)
+
+
+def get_director_pairs():
+    movie, director = _columns(
+        Movie.directors.through.objects.values_list("movie_id", "director_id").iterator(), 2
+    )
+    return movie, director, np.ones_like(movie)
+
+
+FEATURES = {
+    "ratings": get_rating_pairs,
+    "watchlists": get_watchlist_pairs,
+    "genres": get_genre_pairs,
+    "directors": get_director_pairs,
+}
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def build_block(pairs, movie_ids):
+    """(kino, əlamət, dəyər) cütlərindən kinolar x əlamətlər matrisi"""
+    movie, feature, values = pairs
+    if not movie.size or not movie_ids.size:
+        return None
+    rows = np.searchsorted(movie_ids, movie)
+    known = movie_ids[np.minimum(rows, movie_ids.size - 1)] == movie
+    if not known.any():
+        return None
+    _, cols = np.unique(feature[known], return_inverse=True)
+    block = sparse.csr_matrix(
+        (values[known], (rows[known], cols)), shape=(movie_ids.size, cols.max() + 1)
+    )
+    return normalize_rows(block)
+
+
+def build_item_matrix(movie_ids):
+    """Kino vektorları: sətirləri normallaşdırılmış seyrək CSR matris"""
+    blocks = []
+    for name, weight in settings.SIMILAR_MOVIES_WEIGHTS.items():
+        if not weight:
+            continue
+        block = build_block(FEATURES[name](), movie_ids)
+        if block is not None:
+            # sqrt(weight): skalyar hasildə blokun payı weight * cos olur
+            blocks.append(block * np.sqrt(weight))
+    if not blocks:
+        return None
+    matrix = sparse.hstack(blocks, format="csr").astype(np.float32)
+    return normalize_rows(matrix).tocsr()
+
+
+def iter_top_k(matrix, k, chunk_size):
+    """Hər hissə üçün (başlanğıc, qonşu indeksləri, oxşarlıqlar)"""
+    count = matrix.shape[0]
+    k = min(k, count - 1)
+    if k <= 0:
+        return
+    transposed = matrix.T.tocsc()
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        scores = (matrix[start:stop] @ transposed).toarray()
+        scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        yield (
+            start,
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+
+def store_neighbors(chunk_ids, movie_ids, top, scores, min_score):
+    rows = []
+    for pk, neighbors, values in zip(chunk_ids, top, scores):
+        for rank, (index, score) in enumerate(zip(neighbors, values)):
+            if score < min_score:
+                break
+            rows.append(SimilarMovie(
+                movie_id=int(pk), similar_id=int(movie_ids[index]),
+                rank=rank, score=float(score),
+            ))
+    with transaction.atomic():
+        SimilarMovie.objects.filter(movie_id__in=[int(pk) for pk in chunk_ids]).delete()
+        SimilarMovie.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def build_similar_movies(k=None, chunk_size=None, min_score=None):
+    """Bütün nəşr olunmuş kinolar üçün qonşu siyahılarını yenidən hesablamaq"""
+    k = k or settings.SIMILAR_MOVIES_TOP_K
+    chunk_size = chunk_size or settings.SIMILAR_MOVIES_CHUNK_SIZE
+    if min_score is None:
+        min_score = settings.SIMILAR_MOVIES_MIN_SCORE
+
+    movie_ids = np.array(
+        Movie.published.order_by("id").values_list("id", flat=True), dtype=np.float64
+    )
+    matrix = build_item_matrix(movie_ids)
+    stored = 0
+    if matrix is not None:
+        for start, top, scores in iter_top_k(matrix, k, chunk_size):
+            chunk_ids = movie_ids[start:start + top.shape[0]]
+            stored += store_neighbors(chunk_ids, movie_ids, top, scores, min_score)
+    # qaralamaya salınmış kinoların köhnə siyahıları
+    SimilarMovie.objects.exclude(movie__in=Movie.published.all()).delete()
+    return stored
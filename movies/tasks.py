@@ -0,0 +1,36 @@
+from django.apps import apps
+
+from jobs.queue import enqueue, register
+from .cache import bump_catalog_version
+from .images import needs_variants, update_variants
+
+
+@register("images.build_variants")
+def build_image_variants(model, pk, name):
+    """Şəklin variantlarını fon worker-ində yaratmaq"""
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is None or instance.image.name != name:
+        # Bu arada şəkil dəyişdirilib və ya obyekt silinib
+        return
+    if needs_variants(instance):
+        update_variants(instance)
+        # update_variants save siqnallarını göndərmir, keşlənmiş srcset köhnəlməsin
+        bump_catalog_version()
+
+
+def enqueue_image_variants(instance):
+    """
+    Şəklin variantlarını növbəyə yazmaq; çağıran tərəf variantların köhnə
+    olduğunu (needs_variants) artıq yoxlayıb.
+
+    Şəkil A→B→A dəyişəndə A üçün bitmiş tapşırığın açarı təkrarlanır, ona görə
+    bitmiş tapşırıq da yenidən icra olunur (stale=True).
+    """
+    name = instance.image.name
+    label = instance._meta.label
+    enqueue(
+        "images.build_variants",
+        {"model": label, "pk": instance.pk, "name": name},
+        key=f"variants:{label}:{instance.pk}:{name}",
+        stale=True,
+    )
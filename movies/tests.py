@@ -1,3 +1,588 @@
-from django.test import TestCase
+import math
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from PIL import Image
+from scipy import sparse
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.http import QueryDict
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.models import Job
+from .admin import ReviewInline
+from .benchmarks import generate_dataset
+from .cache import (
+    bump_section_version, get_section_versions, home_cache_key, invalidate_movies,
+    movie_cache_keys,
+)
+from .changes import read_changes
+from .images import build_variants, get_srcset, needs_variants
+from .models import (
+    Genre, ImdbRating, Movie, Rating, SimilarMovie, TrendingBucket, TrendingScore,
+)
+from .publication import set_draft
+from .recommendations import CURRENT_NAME, FactorStore, _positions, save_model, train
+from .service import get_cached_movies, get_cached_sections, get_home_page, get_section_ids
+from .serializers import ImageSrcsetField
+from .similarity import build_block, build_similar_movies, iter_top_k, normalize_rows
+from .tasks import enqueue_image_variants
+from .trending import (
+    EPOCH, fold_buckets, get_bucket, get_log_weight, get_trending_movies, logaddexp,
+    record_activity,
+)
+
+SMALL_DATASET = dict(
+    movies=5, genres=3, directors=3, platforms=2, users=3, ratings_per_movie=2,
+    reviews_per_movie=1, replies_per_review=1, likes_per_review=1, watchlist_per_user=1,
+)
+
+
+class PublicationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_set_draft_with_distinct_queryset(self):
+        # admin-in M2M janr filtri queryset-i .distinct() edir
+        genre = Genre.objects.filter(movie__isnull=False).first()
+        queryset = Movie.objects.filter(genres=genre).distinct()
+        expected = queryset.filter(draft=False).count()
+        self.assertEqual(set_draft(queryset, True), expected)
+        self.assertFalse(Movie.objects.filter(genres=genre, draft=False).exists())
+
+    def test_invalidate_movies_is_incremental(self):
+        ids = list(Movie.objects.values_list("id", flat=True))
+        keys = movie_cache_keys(ids)
+        cache.set_many({key: {"id": pk} for pk, key in keys.items()})
+        before = get_section_versions(["trending"])["trending"]
+
+        invalidate_movies(ids[:1])
+
+        self.assertIsNone(cache.get(keys[ids[0]]))
+        self.assertEqual(cache.get(keys[ids[1]]), {"id": ids[1]})
+        self.assertEqual(get_section_versions(["trending"])["trending"], before + 1)
+
+
+class HomeSectionCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sections_are_cached(self):
+        counts = {"new-movies": 8, "trending": 12, "most-rated": 12}
+        first = get_cached_sections(counts)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_sections(counts), first)
+
+    def test_bumped_section_is_recomputed_alone(self):
+        counts = {"new-movies": 8, "trending": 12, "most-rated": 12}
+        get_cached_sections(counts)
+
+        bump_section_version("trending")
+        with mock.patch("movies.service.get_section_ids", wraps=get_section_ids) as compute:
+            get_cached_sections(counts)
+        compute.assert_called_once_with("trending", 12)
+
+    def test_movies_are_cached_by_id(self):
+        ids = list(Movie.published.values_list("id", flat=True))
+        first = get_cached_movies(ids)
+        self.assertEqual(sorted(first), ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_movies(ids), first)
+
+        invalidate_movies(ids[:1])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(get_cached_movies(ids), first)
+        # yalnız dəyişən kino yenidən yüklənir
+        self.assertIn(f"IN ({ids[0]})", queries[0]["sql"])
+
+    def test_home_page_follows_section_versions(self):
+        url = reverse("home")
+        with mock.patch("movies.views.get_home_page", wraps=get_home_page) as build:
+            first = self.client.get(url).json()
+            self.assertEqual(self.client.get(url).json(), first)
+            self.assertEqual(build.call_count, 1)
+
+            key = home_cache_key(12)
+            bump_section_version("trending")
+            self.assertNotEqual(home_cache_key(12), key)
+            self.assertEqual(self.client.get(url).json(), first)
+            self.assertEqual(build.call_count, 2)
+
+
+class SimilarityTests(SimpleTestCase):
+
+    def test_normalize_rows(self):
+        matrix = sparse.csr_matrix(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        normalized = normalize_rows(matrix).toarray()
+        np.testing.assert_allclose(normalized, [[0.6, 0.8], [0.0, 0.0]])
+
+    def test_block_ignores_unknown_movies(self):
+        movie_ids = np.array([1.0, 2.0, 5.0])
+        pairs = (np.array([1.0, 2.0, 3.0, 5.0]), np.array([10.0, 10.0, 10.0, 20.0]), np.ones(4))
+        block = build_block(pairs, movie_ids).toarray()
+        # 3 kataloqda yoxdur, sütunlar yalnız tanınan əlamətlərdəndir
+        np.testing.assert_allclose(block, [[1, 0], [1, 0], [0, 1]])
+        self.assertIsNone(build_block(pairs, np.array([7.0])))
+
+    def test_top_k_matches_dense_cosine(self):
+        dense = np.random.RandomState(0).rand(7, 5)
+        dense[dense < 0.5] = 0
+        dense[:, 0] += 0.1
+        matrix = normalize_rows(sparse.csr_matrix(dense)).tocsr()
+        unit = dense / np.linalg.norm(dense, axis=1, keepdims=True)
+        expected = unit @ unit.T
+        np.fill_diagonal(expected, -np.inf)
+
+        for chunk_size in (2, 10):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(iter_top_k(matrix, 3, chunk_size))
+                top = np.vstack([chunk[1] for chunk in chunks])
+                scores = np.vstack([chunk[2] for chunk in chunks])
+                self.assertEqual(chunks[-1][0], 6 // chunk_size * chunk_size)
+                np.testing.assert_array_equal(top, np.argsort(-expected, axis=1)[:, :3])
+                np.testing.assert_allclose(scores, -np.sort(-expected, axis=1)[:, :3])
+
+    def test_top_k_is_limited_by_movie_count(self):
+        matrix = normalize_rows(sparse.csr_matrix(np.eye(2))).tocsr()
+        (start, top, scores), = iter_top_k(matrix, 5, 10)
+        np.testing.assert_array_equal(top, [[1], [0]])
+        self.assertEqual(list(iter_top_k(matrix[:1], 5, 10)), [])
+
+
+class SimilarMoviesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def test_neighbors_are_stored_in_rank_order(self):
+        stored = build_similar_movies(k=3, min_score=0)
+        self.assertEqual(SimilarMovie.objects.count(), stored)
+        self.assertFalse(SimilarMovie.objects.filter(movie=F("similar")).exists())
+        for movie in Movie.published.all():
+            rows = list(SimilarMovie.objects.filter(movie=movie).order_by("rank"))
+            self.assertLessEqual(len(rows), 3)
+            self.assertEqual([row.rank for row in rows], list(range(len(rows))))
+            scores = [row.score for row in rows]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_draft_movies_are_removed(self):
+        build_similar_movies(k=3, min_score=0)
+        movie = Movie.published.first()
+        set_draft(Movie.objects.filter(pk=movie.pk), True)
+
+        build_similar_movies(k=3, min_score=0)
+        self.assertFalse(SimilarMovie.objects.filter(movie=movie).exists())
+        self.assertFalse(SimilarMovie.objects.filter(similar=movie).exists())
+
+
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+        cls.first, cls.second = Movie.published.order_by("id")[:2]
+
+    def setUp(self):
+        cache.clear()
+        # generate_dataset-in siqnallarla yaratdığı aktivlik
+        TrendingBucket.objects.all().delete()
+        TrendingScore.objects.all().delete()
+        self.now = EPOCH + timedelta(days=400)
+
+    def at(self, now):
+        return mock.patch("movies.trending.timezone.now", return_value=now)
+
+    def test_logaddexp(self):
+        self.assertAlmostEqual(logaddexp(math.log(2), math.log(3)), math.log(5))
+        self.assertAlmostEqual(logaddexp(1000, 1000), 1000 + math.log(2))
+        self.assertEqual(logaddexp(-math.inf, 1.5), 1.5)
+
+    def test_weight_doubles_every_half_life(self):
+        buckets = settings.TRENDING_HALF_LIFE_HOURS * 3600 // settings.TRENDING_BUCKET_SECONDS
+        self.assertAlmostEqual(
+            get_log_weight(100 + buckets, 1) - get_log_weight(100, 1), math.log(2)
+        )
+
+    def test_activity_is_collected_per_bucket(self):
+        with self.at(self.now):
+            record_activity(self.first.pk, "review")
+            record_activity(self.first.pk, "like", 2)
+            record_activity(self.first.pk, "unknown")
+        with self.at(self.now + timedelta(seconds=settings.TRENDING_BUCKET_SECONDS)):
+            record_activity(self.first.pk, "rating")
+
+        buckets = list(
+            TrendingBucket.objects.filter(movie=self.first).order_by("start")
+            .values_list("start", "weight")
+        )
+        start = get_bucket(self.now)
+        self.assertEqual(buckets, [(start, 3.0), (start + 1, 1.0)])
+
+    def test_only_closed_buckets_are_folded(self):
+        with self.at(self.now):
+            record_activity(self.first.pk, "review")
+            self.assertEqual(fold_buckets(), 0)
+        self.assertFalse(TrendingScore.objects.exists())
+
+        # interval bağlandı
+        with self.at(self.now + timedelta(seconds=settings.TRENDING_BUCKET_SECONDS)):
+            record_activity(self.first.pk, "rating")
+            self.assertEqual(fold_buckets(), 1)
+
+        score = TrendingScore.objects.get(movie=self.first)
+        self.assertAlmostEqual(score.score, get_log_weight(get_bucket(self.now), 2.0))
+        self.assertEqual(TrendingBucket.objects.get().start, get_bucket(self.now) + 1)
+
+    def test_scores_accumulate_across_folds(self):
+        step = timedelta(seconds=settings.TRENDING_BUCKET_SECONDS)
+        for offset in range(2):
+            with self.at(self.now + step * offset):
+                record_activity(self.first.pk, "review")
+            with self.at(self.now + step * (offset + 1)):
+                fold_buckets()
+
+        start = get_bucket(self.now)
+        expected = logaddexp(get_log_weight(start, 2.0), get_log_weight(start + 1, 2.0))
+        self.assertAlmostEqual(TrendingScore.objects.get(movie=self.first).score, expected)
+
+    def test_recent_activity_outranks_older_activity(self):
+        # 3 xal bir gün əvvəl < 2 xal indi (yarımparçalanma 24 saat)
+        with self.at(self.now - timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)):
+            record_activity(self.first.pk, "rating", 3)
+        with self.at(self.now):
+            record_activity(self.second.pk, "review")
+        with self.at(self.now + timedelta(seconds=settings.TRENDING_BUCKET_SECONDS)):
+            self.assertEqual(fold_buckets(), 2)
+
+        ranked = list(get_trending_movies().values_list("id", flat=True))
+        self.assertEqual(ranked, [self.second.pk, self.first.pk])
+
+    def test_command_bumps_trending_section(self):
+        with self.at(self.now - timedelta(hours=1)):
+            record_activity(self.first.pk, "review")
+        versions = get_section_versions(["trending", "most-rated"])
+
+        call_command("update_trending", stdout=StringIO())
+
+        self.assertEqual(get_section_versions(["trending", "most-rated"]), {
+            "trending": versions["trending"] + 1, "most-rated": versions["most-rated"],
+        })
+        self.assertFalse(TrendingBucket.objects.exists())
+
+
+class FieldPruningTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, params=None):
+        """Cavab, sorğu sayı və təxirə salınmış sütunların ayrıca yüklənmə sayı"""
+        refresh = mock.patch.object(
+            Movie, "refresh_from_db", autospec=True, side_effect=Movie.refresh_from_db
+        )
+        with refresh as refresh_from_db, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries), refresh_from_db.call_count
+
+    def test_detail_loads_method_field_columns(self):
+        pk = Movie.published.values_list("id", flat=True).first()
+        url = reverse("movie-detail", args=[pk])
+        for params in (None, {"fields": "title,budget,box_office"}):
+            with self.subTest(params=params):
+                response, count, refreshes = self.get(url, params)
+                # get_budget/get_box_office sütunu sonradan bir-bir yükləməməlidir
+                self.assertEqual(refreshes, 0)
+                self.assertLessEqual(count, settings.QUERY_BUDGETS["movie-detail"])
+                self.assertIn("budget", response.data)
+
+    def test_list_without_deferred_loads(self):
+        for params in (None, {"fields": "id,title"}):
+            with self.subTest(params=params):
+                _, count, refreshes = self.get(reverse("movies"), params)
+                self.assertEqual(refreshes, 0)
+                self.assertLessEqual(count, settings.QUERY_BUDGETS["movies"])
+
+    def test_batch_query_count_does_not_grow(self):
+        ids = list(Movie.published.values_list("id", flat=True))
+        counts = []
+        for batch in (ids[:1], ids):
+            _, count, refreshes = self.get(
+                reverse("movies-batch"), {"ids": ",".join(map(str, batch))}
+            )
+            self.assertEqual(refreshes, 0)
+            counts.append(count)
+        self.assertEqual(counts[0], counts[1])
+        self.assertLessEqual(counts[1], settings.QUERY_BUDGETS["movies-batch"])
+
+    def test_batch_rejects_invalid_ids(self):
+        for value in ("-1", "0", "1_0", "+1", "1,x", ""):
+            with self.subTest(value=value):
+                response = self.client.get(reverse("movies-batch"), {"ids": value})
+                self.assertEqual(response.status_code, 400)
+
+
+class AdminInlineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**dict(SMALL_DATASET, reviews_per_movie=3))
+
+    @override_settings(ADMIN_INLINE_REVIEWS_PER_PAGE=1)
+    def test_review_pages_keep_querystring(self):
+        movie = Movie.objects.filter(reviews__isnull=False).first()
+        request = RequestFactory().get("/", {
+            "_changelist_filters": "draft__exact=0", "shots_page": "3", "reviews_page": "2",
+        })
+        request.user = get_user_model().objects.create_superuser(
+            email="admin@example.com", username="admin", password="x",
+            first_name="A", last_name="D",
+        )
+        formset = ReviewInline(Movie, admin.site).get_formset(request, movie)(instance=movie)
+        formset.get_queryset()
+
+        for url, page in ((formset.previous_url, "1"), (formset.next_url, "3")):
+            params = QueryDict(url[1:])
+            self.assertEqual(params["reviews_page"], page)
+            self.assertEqual(params["_changelist_filters"], "draft__exact=0")
+            self.assertEqual(params["shots_page"], "3")
+
+
+class AsyncViewTests(TransactionTestCase):
+    # async view ORM-i moviesapi.aio thread-lərində işlədir, data commit olunmalıdır
+
+    def setUp(self):
+        cache.clear()
+        generate_dataset(**SMALL_DATASET)
+
+    def test_movie_detail_matches_sync(self):
+        from rest_framework.authtoken.models import Token
+
+        rating = Rating.objects.select_related("user").first()
+        token = Token.objects.create(user=rating.user)
+        pk = rating.movie_id
+        for headers in ({}, {"HTTP_AUTHORIZATION": f"Token {token.key}"}):
+            for params in (None, {"fields": "id,title,rating_user,is_watchlist"}):
+                with self.subTest(authenticated=bool(headers), params=params):
+                    sync = self.client.get(reverse("movie-detail", args=[pk]), params, **headers)
+                    async_ = self.client.get(
+                        reverse("async-movie-detail", args=[pk]), params, **headers
+                    )
+                    self.assertEqual(sync.status_code, 200)
+                    self.assertEqual(async_.json(), sync.json())
+
+
+class ChangeFeedTests(TransactionTestCase):
+
+    def test_late_commit_gets_later_seq(self):
+        started, release = threading.Event(), threading.Event()
+
+        def long_transaction():
+            try:
+                with transaction.atomic():
+                    ImdbRating.objects.create(point=7.0, votes=10)
+                    started.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=long_transaction)
+        thread.start()
+        started.wait(10)
+        later = ImdbRating.objects.create(point=8.0, votes=20)
+
+        # açıq uzun tranzaksiya feed-i saxlamır
+        events, _ = read_changes(0, 100)
+        self.assertEqual([event.object_id for event in events], [later.pk])
+        served = events[-1].seq
+
+        release.set()
+        thread.join()
+        # kiçik id-li, gec commit olunan hadisə verilmişlərdən sonra gəlir
+        events, has_more = read_changes(served, 100)
+        self.assertEqual(len(events), 1)
+        self.assertLess(events[0].object_id, later.pk)
+        self.assertGreater(events[0].seq, served)
+        self.assertFalse(has_more)
+        self.assertEqual(read_changes(events[-1].seq, 100), ([], False))
+
+
+class ImageVariantJobTests(TransactionTestCase):
+
+    def enqueue(self, name):
+        # Job-lar on_commit-də yaradılır; autocommit rejimində dərhal
+        enqueue_image_variants(Movie(pk=1, image=name))
+        return Job.objects.get(idempotency_key=f"variants:movies.Movie:1:{name}")
+
+    def test_image_changed_back_is_rebuilt(self):
+        for name in ("posters/a.jpg", "posters/b.jpg"):
+            job = self.enqueue(name)
+            Job.objects.filter(pk=job.pk).update(status=Job.STATUS_DONE)
+
+        # A→B→A: A-nın bitmiş tapşırığı yenidən icra olunmalıdır
+        job = self.enqueue("posters/a.jpg")
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertEqual(job.attempts, 0)
+
+
+class RecommendationModelTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def save(self, scale=1.0):
+        return save_model(
+            np.array([1, 2]), np.array([10, 20, 30]),
+            np.full((2, 4), scale), np.full((3, 4), scale), directory=self.directory,
+        )
+
+    def test_versions_saved_in_same_second_do_not_collide(self):
+        with mock.patch("movies.recommendations.time.strftime", return_value="20260101000000"):
+            first, second = self.save(1.0), self.save(2.0)
+        self.assertNotEqual(first, second)
+        with open(os.path.join(self.directory, CURRENT_NAME)) as fp:
+            self.assertEqual(fp.read(), second)
+        items = np.load(os.path.join(self.directory, first, "items.npy"))
+        self.assertEqual(items[0, 0], 1.0)
+        # yarımçıq müvəqqəti qovluq qalmır
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted([first, second, CURRENT_NAME]))
+
+    def test_only_two_versions_are_kept(self):
+        stamps = ["20260101000001", "20260101000002", "20260101000003"]
+        with mock.patch("movies.recommendations.time.strftime", side_effect=stamps):
+            versions = [self.save(scale) for scale in (1.0, 2.0, 3.0)]
+        self.assertFalse(os.path.exists(os.path.join(self.directory, versions[0])))
+        self.assertTrue(os.path.isdir(os.path.join(self.directory, versions[1])))
+
+    def test_store_loads_and_swaps_versions(self):
+        store = FactorStore()
+        with override_settings(RECOMMENDATIONS_DIR=self.directory, RECOMMENDATIONS_RELOAD_INTERVAL=0):
+            self.assertIsNone(store.get())
+
+            first = self.save(1.0)
+            arrays = store.get()
+            self.assertEqual(store.version, first)
+            self.assertIsInstance(arrays["items"], np.memmap)
+            np.testing.assert_array_equal(arrays["movie_ids"], [10, 20, 30])
+
+            second = self.save(2.0)
+            self.assertEqual(store.get()["items"][0, 0], 2.0)
+            self.assertEqual(store.version, second)
+            # köhnə massivlər əlində olanlar üçün oxunaqlı qalır
+            self.assertEqual(arrays["items"][0, 0], 1.0)
+
+    def test_store_checks_current_once_per_interval(self):
+        store = FactorStore()
+        with override_settings(RECOMMENDATIONS_DIR=self.directory, RECOMMENDATIONS_RELOAD_INTERVAL=60):
+            first = self.save(1.0)
+            store.get()
+            self.save(2.0)
+            self.assertEqual(store.get()["items"][0, 0], 1.0)
+            self.assertEqual(store.version, first)
+
+    def test_positions(self):
+        ids = np.array([10, 20, 30])
+        np.testing.assert_array_equal(_positions(ids, [30, 15, 10, 40]), [2, 0])
+        self.assertEqual(_positions(np.array([], dtype=np.int64), [1]).size, 0)
+
+    def test_train_fits_known_ratings(self):
+        users = np.array([1, 1, 1, 2, 2, 2, 3, 3, 3])
+        movies = np.array([10, 20, 30] * 3)
+        stars = np.array([5, 3, 1, 4, 3, 2, 1, 3, 5], dtype=np.float64)
+        user_ids, movie_ids, user_factors, item_factors = train(
+            users, movies, stars, factors=3, iterations=10, regularization=0.001,
+        )
+        np.testing.assert_array_equal(user_ids, [1, 2, 3])
+        np.testing.assert_array_equal(movie_ids, [10, 20, 30])
+        predicted = user_factors @ item_factors.T + stars.mean()
+        np.testing.assert_allclose(predicted, stars.reshape(3, 3), atol=0.1)
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[160, 320, 640, 1024], IMAGE_VARIANT_FORMATS=[])
+class ImageVariantTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name, base_url="/media/")
+        self.field = models.ImageField(storage=self.storage)
+
+    def make_image(self, name="poster.png", mode="RGB", size=(800, 400)):
+        # əsasən qırmızı, küncündə kiçik mavi sahə
+        image = Image.new(mode, size, (255, 0, 0) if mode == "RGB" else (255, 0, 0, 128))
+        image.paste((0, 0, 255) if mode == "RGB" else (0, 0, 255, 128), (0, 0, 40, 40))
+        buffer = BytesIO()
+        image.save(buffer, "PNG")
+        name = self.storage.save(name, ContentFile(buffer.getvalue()))
+        return FieldFile(None, self.field, name)
+
+    def test_variants_placeholder_and_color(self):
+        manifest = build_variants(self.make_image())
+        # orijinaldan enli variant yaradılmır
+        self.assertEqual(sorted(manifest["variants"]["jpeg"], key=int), ["160", "320", "640"])
+        self.assertEqual((manifest["width"], manifest["height"]), (800, 400))
+        self.assertTrue(manifest["placeholder"].startswith("data:image/jpeg;base64,"))
+        self.assertEqual(manifest["color"], "#ff0000")
+        self.assertEqual(manifest["source"], "poster.png")
+        for name in manifest["variants"]["jpeg"].values():
+            self.assertTrue(self.storage.exists(name))
+
+    def test_transparent_image_keeps_png(self):
+        manifest = build_variants(self.make_image(mode="RGBA"))
+        self.assertEqual(list(manifest["variants"]), ["png"])
+
+    def test_same_content_reuses_variants(self):
+        first = build_variants(self.make_image("a.png"))
+        with mock.patch("movies.images._generate") as generate:
+            second = build_variants(self.make_image("b.png"))
+        generate.assert_not_called()
+        self.assertEqual(second["variants"], first["variants"])
+        self.assertEqual(second["source"], "b.png")
+
+    def test_srcset_and_needs_variants_use_field_name(self):
+        field_file = self.make_image()
+        manifest = build_variants(field_file)
+        instance = SimpleNamespace(
+            poster=field_file, poster_variants=manifest, poster_placeholder=manifest["placeholder"],
+        )
+        self.assertFalse(needs_variants(instance, "poster"))
+        srcset = ImageSrcsetField(image_field="poster").to_representation(instance)
+        self.assertEqual(srcset, get_srcset(manifest, self.storage))
+        self.assertIn("/media/derivatives/", srcset["jpeg"])
+        self.assertTrue(srcset["jpeg"].endswith("640w"))
@@ -0,0 +1,104 @@
+"""
+Trend olan kinolar: istifadəçi aktivliyinin zamanla sönən balı.
+
+Bal sum(weight * 2 ** ((t - EPOCH) / half_life)) kimi, log miqyasında
+saxlanılır. Bütün kinolar eyni sürətlə söndüyü üçün sabit EPOCH-a görə
+hesablanan balların sırası istənilən an üçün düzgündür: köhnə balları
+yenidən hesablamağa ehtiyac yoxdur, yeni aktivlik logaddexp ilə əlavə olunur.
+
+Aktivlik əvvəlcə TrendingBucket-də (TRENDING_BUCKET_SECONDS intervalları)
+toplanır, `update_trending` komandası bağlanmış intervalları TrendingScore-a
+köçürür. Top-k oxuma `trending_score_idx` indeksi ilə O(k)-dır.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Movie, TrendingBucket, TrendingScore
+
+EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def logaddexp(a, b):
+    """log(exp(a) + exp(b)) daşmadan"""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def get_bucket(now=None):
+    seconds = ((now or timezone.now()) - EPOCH).total_seconds()
+    return int(seconds // settings.TRENDING_BUCKET_SECONDS)
+
+
+def get_log_weight(bucket, weight):
+    """İntervalın aktivliyinin EPOCH-a görə log miqyasında balı"""
+    hours = bucket * settings.TRENDING_BUCKET_SECONDS / 3600
+    return math.log(weight) + hours * math.log(2) / settings.TRENDING_HALF_LIFE_HOURS
+
+
+def record_activity(movie_id, kind, count=1):
+    """Kinonun cari intervalına aktivlik əlavə etmək (rating, review, like, watchlist)"""
+    weight = settings.TRENDING_WEIGHTS.get(kind, 0) * count
+    if weight <= 0:
+        return
+    bucket = get_bucket()
+    updated = TrendingBucket.objects.filter(movie_id=movie_id, start=bucket).update(
+        weight=F("weight") + weight
+    )
+    if not updated:
+        TrendingBucket.objects.bulk_create(
+            [TrendingBucket(movie_id=movie_id, start=bucket, weight=0)],
+            ignore_conflicts=True,
+        )
+        TrendingBucket.objects.filter(movie_id=movie_id, start=bucket).update(
+            weight=F("weight") + weight
+        )
+
+
+def fold_buckets():
+    """Bağlanmış intervalları trend ballarına köçürmək, köçürülmüş kino sayı"""
+    current = get_bucket()
+    with transaction.atomic():
+        buckets = list(
+            TrendingBucket.objects.select_for_update()
+            .filter(start__lt=current)
+            .values_list("id", "movie_id", "start", "weight")
+        )
+        if not buckets:
+            return 0
+
+        added = defaultdict(lambda: -math.inf)
+        for _, movie_id, start, weight in buckets:
+            if weight <= 0:
+                continue
+            added[movie_id] = logaddexp(added[movie_id], get_log_weight(start, weight))
+
+        scores = TrendingScore.objects.select_for_update().in_bulk(list(added))
+        now = timezone.now()
+        new = []
+        for movie_id, value in added.items():
+            if movie_id in scores:
+                score = scores[movie_id]
+                score.score = logaddexp(score.score, value)
+                score.updated = now
+            else:
+                new.append(TrendingScore(movie_id=movie_id, score=value))
+        TrendingScore.objects.bulk_update(
+            scores.values(), ["score", "updated"], batch_size=1000
+        )
+        TrendingScore.objects.bulk_create(new, batch_size=1000)
+        # Yalnız oxunmuş sətirlər silinir: SELECT-dən sonra commit olunmuş
+        # sətirlər növbəti çağırışda köçürülür
+        TrendingBucket.objects.filter(id__in=[row[0] for row in buckets]).delete()
+    return len(added)
+
+
+def get_trending_movies():
+    """Trend olan nəşr olunmuş kinolar (kataloq bölməsi)"""
+    return Movie.published.filter(trending__isnull=False).order_by("-trending__score")
@@ -2,35 +2,54 @@ from django.urls import path, re_path
 # from rest_framework.routers import DefaultRouter
 # from rest_framework.urlpatterns import format_suffix_patterns
 
-from . import views
+from . import async_views, views
 
 
 urlpatterns = [
     # home page urls
-    path("home-page-video/", views.HomePageVideoView.as_view()),
-    path("genres/", views.AllGenresListView.as_view()),
-    path("new-movies/", views.NewMoviesListView.as_view()),
-    path("catalog-movies/", views.MovieCatalogListView.as_view()),
-    path("platforms/", views.PlatformsListView.as_view()),
+    path("home/", views.HomePageView.as_view(), name="home"),
+    path("home-page-video/", views.HomePageVideoView.as_view(), name="home-page-video"),
+    path("genres/", views.AllGenresListView.as_view(), name="genres"),
+    path("new-movies/", views.NewMoviesListView.as_view(), name="new-movies"),
+    path("catalog-movies/", views.MovieCatalogListView.as_view(), name="catalog-movies"),
+    path("platforms/", views.PlatformsListView.as_view(), name="platforms"),
     # all movies and detail urls
-    path("movies/", views.AllMoviesListView.as_view()),
-    path("movie/<int:pk>/", views.MovieDetailView.as_view()),
+    path("movies/", views.AllMoviesListView.as_view(), name="movies"),
+    path("movies/batch/", views.MovieBatchView.as_view(), name="movies-batch"),
+    path("movie/<int:pk>/", views.MovieDetailView.as_view(), name="movie-detail"),
+    path("movie/<int:pk>/similar/", views.SimilarMoviesView.as_view(), name="movie-similar"),
+    path("recommendations/", views.RecommendationsView.as_view(), name="recommendations"),
     # review urls
-    path("review/create/", views.ReviewCreateView.as_view()),
-    path("review/action/", views.ReviewActionView.as_view()),
-    path("movie/<int:pk>/reviews/", views.ReviewListView.as_view()),
-    path("review/<int:pk>/delete/", views.ReviewDeleteView.as_view()),
+    path("review/create/", views.ReviewCreateView.as_view(), name="review-create"),
+    path("review/action/", views.ReviewActionView.as_view(), name="review-action"),
+    path("movie/<int:pk>/reviews/", views.ReviewListView.as_view(), name="movie-reviews"),
+    path("review/<int:pk>/delete/", views.ReviewDeleteView.as_view(), name="review-delete"),
     # all directors and detail urls
-    path("directors/", views.DirectorListView.as_view()),
-    path("director/<int:pk>/", views.DirectorDetailView.as_view()),
+    path("directors/", views.DirectorListView.as_view(), name="directors"),
+    path("director/<int:pk>/", views.DirectorDetailView.as_view(), name="director-detail"),
     # profile urls
-    path("add-rating/", views.AddStarRatingView.as_view()),
-    path("add-watchlist/<int:movie_id>/", views.AddOrRemoveMovieWatchlistView.as_view()),
-    path("user-watchlist/", views.UserWatchlistView.as_view()),
-    path("remove-watchlist/", views.RemoveMovieWatchlistView.as_view()),
+    path("add-rating/", views.AddStarRatingView.as_view(), name="add-rating"),
+    path(
+        "add-watchlist/<int:movie_id>/", views.AddOrRemoveMovieWatchlistView.as_view(),
+        name="add-watchlist"
+    ),
+    path("user-watchlist/", views.UserWatchlistView.as_view(), name="user-watchlist"),
+    path("remove-watchlist/", views.RemoveMovieWatchlistView.as_view(), name="remove-watchlist"),
     # search
-    path("search-movie/", views.SearchMovieListView.as_view()),
-    path("search-watchlist/", views.SearchMovieWatchlistView.as_view())
+    path("search-movie/", views.SearchMovieListView.as_view(), name="search-movie"),
+    path("search-watchlist/", views.SearchMovieWatchlistView.as_view(), name="search-watchlist"),
+    # async (ASGI) versions of the read-heavy endpoints
+    path("async/home-page-video/", async_views.home_page_video, name="async-home-page-video"),
+    path("async/new-movies/", async_views.new_movies, name="async-new-movies"),
+    path("async/catalog-movies/", async_views.catalog_movies, name="async-catalog-movies"),
+    path("async/movie/<int:pk>/", async_views.movie_detail, name="async-movie-detail"),
+    path(
+        "async/movie/<int:pk>/reviews/", async_views.movie_reviews,
+        name="async-movie-reviews"
+    ),
+    path("async/search-movie/", async_views.search_movie, name="async-search-movie"),
+    # change feed
+    path("changes/", views.ChangeFeedView.as_view(), name="changes"),
 ]
 
 
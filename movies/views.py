@@ -2,21 +2,30 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework import viewsets, permissions, generics, renderers
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from datetime import datetime, date, timedelta
 from django.utils import timezone
 from drf_yasg import openapi
 from django.conf import settings
+from django.core.cache import cache
 
+from moviesapi.compression import cache_compressed
+from moviesapi.metrics import record_cache
 from profiles.models import Watchlist, WatchlistTime  
+from .cache import home_cache_key
+from .changes import is_expired, read_changes
+from .recommendations import get_recommendations
 from .models import Movie, Review, Director, Genre, StreamingService
 from .service import (
     MovieFilter, PaginationMovies, get_movie_rating_star,
     get_review_action, get_movies_in_the_last_two_month,
-    get_movies_catalog_queryset, WatchlistMovieFilter
+    get_movies_catalog_queryset, WatchlistMovieFilter, get_home_page,
+    get_similar_movies, SparseFieldsMixin, parse_field_list, parse_id_list,
+    get_movies_batch,
 )
 from .serializers import (
     HomePageVideoSerializer, GenreListSerializer, MovieListSerializer, 
@@ -28,6 +37,38 @@ from .serializers import (
 
 CATALOG_SECTION_NAMES = settings.CATALOG_SECTION_NAMES
 
+sparse_fields_schema = swagger_auto_schema(manual_parameters=[
+    openapi.Parameter(
+        'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description="Comma-separated fields to return, e.g. id,title"
+    ),
+    openapi.Parameter(
+        'expand', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+        description="Comma-separated relations to return as nested objects"
+    ),
+])
+
+
+class HomePageView(APIView):
+    """Ana səhifənin bütün bölmələri bir sorğuda"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    count_param = openapi.Parameter(
+        'count', openapi.IN_QUERY, description="6 for small screens (default 8/12)",
+        type=openapi.TYPE_INTEGER
+    )
+    @swagger_auto_schema(manual_parameters=[count_param])
+    def get(self, request):
+        small = request.GET.get('count', '') == '6'
+        key = home_cache_key(6 if small else 12)
+        data = cache.get(key)
+        record_cache("home", data is not None)
+        if data is None:
+            data = get_home_page(small)
+            cache.set(key, data, settings.HOME_CACHE_TIMEOUT)
+        return cache_compressed(Response(data, status=200))
+
 
 class HomePageVideoView(APIView):
     """Ana səhifədəki video"""
@@ -109,10 +150,11 @@ class PlatformsListView(generics.ListAPIView):
     serializer_class = StreamingListSerializer
 
 
-class AllMoviesListView(generics.ListAPIView):
+@method_decorator(sparse_fields_schema, name="get")
+class AllMoviesListView(SparseFieldsMixin, generics.ListAPIView):
     """Bütün kinoların siyahısını göstərmək"""
 
-    queryset = Movie.objects.filter(draft=False)
+    queryset = Movie.published.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = MovieListSerializer
     filter_backends = (DjangoFilterBackend, SearchFilter, OrderingFilter)
@@ -139,9 +181,9 @@ class SearchMovieListView(APIView):
     def get(self, request, *args, **kwargs):
         title = request.GET.get('title', '')
         if title != '':
-            qs = Movie.objects.filter(
-                draft=False, title__icontains=title
-            ).order_by('imdb__vote')[:5]
+            qs = Movie.published.filter(
+                title__icontains=title
+            ).order_by('imdb__votes')[:5]
             serializer = MovieListSerializer(qs, many=True)
             return Response(serializer.data, status=200)
         else:
@@ -151,7 +193,8 @@ class SearchMovieListView(APIView):
             )
 
 
-class MovieDetailView(generics.RetrieveAPIView):
+@method_decorator(sparse_fields_schema, name="get")
+class MovieDetailView(SparseFieldsMixin, generics.RetrieveAPIView):
     """Tək bir kinonun məlumatlarını göstərmək"""
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -162,13 +205,84 @@ class MovieDetailView(generics.RetrieveAPIView):
         return get_movie_rating_star(self.request)
 
 
+class MovieBatchView(SparseFieldsMixin, APIView):
+    """Bir neçə kinonun detalları bir sorğuda (?ids=1,2,3)"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    ids_param = openapi.Parameter(
+        'ids', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+        description="Comma-separated movie ids (max {})".format(settings.MOVIES_BATCH_MAX_IDS)
+    )
+    @swagger_auto_schema(manual_parameters=[ids_param])
+    def get(self, request):
+        ids, errors = parse_id_list(request.GET.get('ids'), settings.MOVIES_BATCH_MAX_IDS)
+        if errors:
+            return Response(errors, status=400)
+        options = self.get_field_options()
+        context = {"request": request}
+        movies, missing = get_movies_batch(
+            request, ids, MovieDetailSerializer(context=context, **options)
+        )
+        serializer = MovieDetailSerializer(movies, many=True, context=context, **options)
+        return Response({"results": serializer.data, "missing": missing}, status=200)
+
+
+class SimilarMoviesView(APIView):
+    """Oxşar kinolar"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    @swagger_auto_schema(responses={200: MovieListSerializer(many=True)})
+    def get(self, request, pk):
+        serializer = MovieListSerializer(get_similar_movies(pk), many=True)
+        return Response(serializer.data, status=200)
+
+
+class RecommendationsView(APIView):
+    """İstifadəçi üçün tövsiyə olunan kinolar"""
+
+    permission_classes = [IsAuthenticated]
+
+    count_param = openapi.Parameter(
+        'count', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+        description="movies count (max {})".format(settings.RECOMMENDATIONS_MAX_COUNT)
+    )
+    @swagger_auto_schema(
+        manual_parameters=[count_param],
+        responses={200: MovieListSerializer(many=True)}
+    )
+    def get(self, request):
+        try:
+            count = int(request.GET.get('count', settings.RECOMMENDATIONS_COUNT))
+        except ValueError:
+            return Response({"count": "This field has to be a number"}, status=400)
+        count = min(max(count, 1), settings.RECOMMENDATIONS_MAX_COUNT)
+        movies = get_recommendations(request.user, count)
+        serializer = MovieListSerializer(movies, many=True)
+        return Response(serializer.data, status=200)
+
+
+@method_decorator(sparse_fields_schema, name="get")
 class ReviewListView(generics.RetrieveAPIView):
     """Bir kinoya aid rəyləri göstərmək"""
 
-    queryset = Movie.objects.filter(draft=False)
+    queryset = Movie.published.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = ReviewListSerializer
 
+    def get_serializer_context(self):
+        # ?fields= və ?expand= hər rəyə (cavablar da daxil) tətbiq olunur
+        context = super().get_serializer_context()
+        if self.request is None or getattr(self, 'swagger_fake_view', False):
+            return context
+        params = self.request.query_params
+        context["review_fields"] = (
+            parse_field_list(params.get('fields')) or None,
+            parse_field_list(params.get('expand')),
+        )
+        return context
+
 
 class ReviewCreateView(generics.CreateAPIView):
     """Rəylərin kinoya əlavə olunması"""
@@ -305,10 +419,9 @@ class SearchMovieWatchlistView(APIView):
     def get(self, request, *args, **kwargs):
         title = request.GET.get('title', '')
         if title != '':
-            qs = Movie.objects.filter(
-                draft=False, title__icontains=title, 
-                watchlist__user=request.user
-            ).order_by('imdb__vote')[:5]
+            qs = Movie.published.filter(
+                title__icontains=title, watchlist__user=request.user
+            ).order_by('imdb__votes')[:5]
             serializer = MovieListSerializer(qs, many=True)
             return Response(serializer.data, status=200)
         else:
@@ -318,7 +431,8 @@ class SearchMovieWatchlistView(APIView):
             )
 
 
-class DirectorListView(generics.ListAPIView):
+@method_decorator(sparse_fields_schema, name="get")
+class DirectorListView(SparseFieldsMixin, generics.ListAPIView):
     """Bütün rejissorların siyahısı"""
 
     queryset = Director.objects.all()
@@ -327,7 +441,8 @@ class DirectorListView(generics.ListAPIView):
     pagination_class = PaginationMovies
 
 
-class DirectorDetailView(generics.RetrieveAPIView):
+@method_decorator(sparse_fields_schema, name="get")
+class DirectorDetailView(SparseFieldsMixin, generics.RetrieveAPIView):
     """Tek bir rejissorun melumatları"""
 
     queryset = Director.objects.all()
@@ -335,6 +450,41 @@ class DirectorDetailView(generics.RetrieveAPIView):
     serializer_class = DirectorDetailSerializer
 
 
+class ChangeFeedView(APIView):
+    """Kataloq dəyişikliklərinin jurnalı (inkremental sinxronizasiya üçün)"""
+
+    permission_classes = [IsAdminUser]
+
+    since_param = openapi.Parameter(
+        'since', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+        description="Son oxunan hadisənin seq-i"
+    )
+    limit_param = openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)
+
+    @swagger_auto_schema(manual_parameters=[since_param, limit_param])
+    def get(self, request):
+        try:
+            since = max(int(request.GET.get('since', 0)), 0)
+            limit = int(request.GET.get('limit', settings.CHANGE_FEED_PAGE_SIZE))
+        except ValueError:
+            return Response({"message": "since and limit must be integers"}, status=400)
+        limit = min(max(limit, 1), settings.CHANGE_FEED_MAX_PAGE_SIZE)
+
+        events, has_more = read_changes(since, limit)
+        return Response({
+            "events": [
+                {
+                    "seq": event.seq, "model": event.model, "id": event.object_id,
+                    "op": event.op, "data": event.data,
+                }
+                for event in events
+            ],
+            "next": events[-1].seq if events else since,
+            "has_more": has_more,
+            "reset": is_expired(since),
+        }, status=200)
+
+
 """
 
 
@@ -0,0 +1,58 @@
+"""
+Async view-lar üçün verilənlər bazası qatı.
+
+Django ORM async deyil, ona görə sorğular ASYNC_DB_THREADS ölçülü ayrıca
+thread pool-da icra olunur. Pool-un ölçüsü bir prosesin eyni anda aça biləcəyi
+DB bağlantılarının sayını da məhdudlaşdırır. Bir sorğu daxilində bir-birindən
+asılı olmayan hissələr `asyncio.gather` ilə paralel gözlənilir.
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix="async-db"
+)
+
+
+def _call(func, args, kwargs):
+    # Pool thread-lərində request_started/finished siqnalları yoxdur,
+    # köhnəlmiş bağlantılar hər çağırışdan sonra bağlanır.
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args, **kwargs):
+    """Sinxron ORM kodunu pool-da icra edib nəticəsini gözləmək"""
+    loop = asyncio.get_running_loop()
+    # contextvars (sorğu sayğacı, serializer vaxtı, moviesapi.replicas) pool
+    # thread-inə ötürülür
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        executor, context.run, functools.partial(_call, func, args, kwargs)
+    )
+
+
+def _authenticate(request):
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    return drf_request.user
+
+
+async def get_user(request):
+    """
+    REST_FRAMEWORK-dakı autentifikasiya sinifləri ilə istifadəçini tapmaq.
+
+    Yanlış token üçün rest_framework.exceptions.AuthenticationFailed qaldırılır.
+    """
+    return await run_db(_authenticate, request)
@@ -0,0 +1,143 @@
+"""
+Cavabların gzip/brotli ilə sıxılması.
+
+Gövdəsi keşdən gələn cavablar (`home/` və kataloq) `cache_compressed` ilə
+işarələnir; onların sıxılmış variantı keşdə gövdənin hash-ı, kodlaşdırma və
+səviyyə ilə saxlanılır və təkrar sıxılmır. Qalan cavablar keşə yazılmadan
+yerindəcə sıxılır: hər unikal gövdəni hash-layıb saxlamaq keşi doldurardı.
+Səviyyə endpoint-in URL adına görə COMPRESSION_LEVELS-də dəyişdirilə bilər.
+"""
+import gzip
+import hashlib
+import re
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from .metrics import record_cache
+from .middleware import HybridMiddleware, get_url_name
+
+try:
+    import brotli
+except ImportError:  # Brotli quraşdırılmayıbsa yalnız gzip
+    brotli = None
+
+_ENCODING_RE = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def get_accepted_encodings(header):
+    """Accept-Encoding başlığından q > 0 olan kodlaşdırmalar"""
+    accepted = set()
+    for part in header.split(","):
+        match = _ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = get_accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def get_level(url_name, encoding):
+    levels = settings.COMPRESSION_LEVELS.get(url_name, {})
+    return levels.get(encoding, settings.COMPRESSION_DEFAULT_LEVELS[encoding])
+
+
+def compress(body, encoding, level):
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    buffer = BytesIO()
+    with gzip.GzipFile(mode="wb", compresslevel=level, fileobj=buffer, mtime=0) as fp:
+        fp.write(body)
+    return buffer.getvalue()
+
+
+def get_compressed(body, encoding, level):
+    """Sıxılmış gövdə, əvvəl sıxılıbsa keşdən"""
+    digest = hashlib.sha1(body).hexdigest()
+    key = f"compressed:{encoding}:{level}:{digest}"
+    compressed = cache.get(key)
+    record_cache("compression", compressed is not None)
+    if compressed is None:
+        compressed = compress(body, encoding, level)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def cache_compressed(response):
+    """Cavabın gövdəsi view keşindən gəlir, sıxılmış variantı da keşlənsin"""
+    response.cache_compressed = True
+    return response
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type in settings.COMPRESSION_CONTENT_TYPES or content_type.startswith("text/")
+
+
+class CompressionMiddleware(HybridMiddleware):
+    """Accept-Encoding-ə görə gzip/brotli, kiçik gövdələr sıxılmır"""
+
+    def call(self, request):
+        response = self.get_response(request)
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+        return self.compress_response(request, response, encoding)
+
+    async def acall(self, request):
+        response = await self.get_response(request)
+        encoding = self.get_encoding(request, response)
+        if encoding is None:
+            return response
+        # sıxılma CPU işidir, event loop-u saxlamasın
+        return await sync_to_async(self.compress_response, thread_sensitive=False)(
+            request, response, encoding
+        )
+
+    def get_encoding(self, request, response):
+        if (
+            not settings.COMPRESSION_ENABLED
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or response.status_code != 200
+            or not is_compressible(response)
+        ):
+            return None
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return None
+        return choose_encoding(request)
+
+    def compress_response(self, request, response, encoding):
+        level = get_level(get_url_name(request), encoding)
+        if getattr(response, "cache_compressed", False):
+            compressed = get_compressed(response.content, encoding, level)
+        else:
+            compressed = compress(response.content, encoding, level)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # gövdə dəyişdi, ETag yalnız semantik bərabərliyi göstərir
+            response["ETag"] = "W/" + etag
+        return response
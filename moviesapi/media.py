@@ -0,0 +1,52 @@
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import serve
+
+from .storage import is_content_addressed
+
+
+def get_cache_control(path):
+    # Adında (və ya qovluğunda) məzmun hash-ı olan fayllar heç vaxt dəyişmir
+    if is_content_addressed(path):
+        return f"public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={settings.MEDIA_MAX_AGE}"
+
+
+def serve_media(request, path):
+    """
+    MEDIA_ROOT-dakı faylların verilməsi.
+
+    MEDIA_SENDFILE təyin olunduqda fayl baytları Python worker-indən keçmir:
+    cavab yalnız X-Accel-Redirect (nginx) və ya X-Sendfile (apache, lighttpd)
+    başlığını daşıyır, faylı veb server özü göndərir.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        # MEDIA_ROOT-dan kənara çıxan yol (../)
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    if settings.MEDIA_SENDFILE:
+        response = HttpResponse()
+        content_type, encoding = mimetypes.guess_type(fullpath)
+        response["Content-Type"] = content_type or "application/octet-stream"
+        if settings.MEDIA_SENDFILE == "x-accel-redirect":
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + path
+        else:
+            response["X-Sendfile"] = fullpath
+        response["Last-Modified"] = http_date(os.stat(fullpath).st_mtime)
+    else:
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+
+    response["Cache-Control"] = get_cache_control(path)
+    return response
@@ -0,0 +1,169 @@
+"""
+Prometheus metrikləri.
+
+Gunicorn worker-ləri arasında metriklər prometheus_client-in multiprocess
+rejimi ilə toplanır: hər proses öz mmap faylına yazır (proseslər arası kilid
+yoxdur), `/metrics` isə METRICS_MULTIPROC_DIR-dəki bütün faylları birləşdirir.
+Ölü worker-lərin faylları gunicorn.conf.py-dakı child_exit ilə təmizlənir.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+if settings.METRICS_MULTIPROC_DIR:
+    # prometheus_client bu dəyişəni import zamanı oxuyur
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.METRICS_MULTIPROC_DIR)
+    os.environ.setdefault("prometheus_multiproc_dir", settings.METRICS_MULTIPROC_DIR)
+
+from django.http import HttpResponse, HttpResponseForbidden  # noqa: E402
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY,
+    generate_latest, multiprocess,
+)
+
+from .middleware import HybridMiddleware  # noqa: E402
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    "moviesapi_request_duration_seconds", "Request latency by view",
+    ["view", "method"], buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "moviesapi_requests_total", "Requests by view and status",
+    ["view", "method", "status"],
+)
+DB_QUERIES = Histogram(
+    "moviesapi_db_queries_per_request", "SQL queries per request",
+    ["view"], buckets=QUERY_BUCKETS,
+)
+DB_TIME = Histogram(
+    "moviesapi_db_duration_seconds", "Time spent in SQL per request",
+    ["view"], buckets=LATENCY_BUCKETS,
+)
+SERIALIZER_TIME = Histogram(
+    "moviesapi_serializer_duration_seconds", "Time spent serializing per request",
+    ["view"], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "moviesapi_cache_requests_total", "Cache lookups by result",
+    ["cache", "result"],
+)
+
+# Sorğunun serializer vaxtı. Dəyər dəyişən obyektdir: moviesapi.aio
+# kontekstin surətini pool thread-lərinə ötürür, oradakı serializer-lər də
+# eyni sayğaca yazır.
+_serializer_time = contextvars.ContextVar("serializer_time", default=None)
+_serializer_depth = contextvars.ContextVar("serializer_depth", default=0)
+
+
+class SerializerTime:
+    """Bir sorğunun bir neçə thread-dən toplanan serializer vaxtı"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = 0.0
+
+    def add(self, seconds):
+        with self.lock:
+            self.seconds += seconds
+
+
+def record_cache(name, hit):
+    """Keş müraciətinin nəticəsini qeyd etmək (hit/miss nisbəti üçün)"""
+    CACHE_REQUESTS.labels(name, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Serializer vaxtını hazırkı sorğuya əlavə etmək.
+
+    İç-içə serializer-lər (məs. rekursiv rəylər) yalnız ən xarici səviyyədə
+    ölçülür ki, vaxt iki dəfə sayılmasın.
+    """
+    depth = _serializer_depth.get()
+    token = _serializer_depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _serializer_depth.reset(token)
+        total = _serializer_time.get()
+        if depth == 0 and total is not None:
+            total.add(time.perf_counter() - start)
+
+
+class MetricsSerializerMixin:
+    """to_representation vaxtını metriklərə yazan serializer mixini"""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+def get_view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    view_class = getattr(match.func, "view_class", None)
+    if view_class is not None:
+        return view_class.__name__
+    return getattr(match.func, "__name__", match.view_name or "unknown")
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """Sorğuların gecikmə, SQL və serializer metrikləri"""
+
+    def call(self, request):
+        total = SerializerTime()
+        token = _serializer_time.set(total)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _serializer_time.reset(token)
+        return self.observe(request, response, total, time.perf_counter() - start)
+
+    async def acall(self, request):
+        total = SerializerTime()
+        token = _serializer_time.set(total)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _serializer_time.reset(token)
+        return self.observe(request, response, total, time.perf_counter() - start)
+
+    def observe(self, request, response, total, elapsed):
+        view = get_view_name(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+        SERIALIZER_TIME.labels(view).observe(total.seconds)
+
+        recorder = getattr(request, "query_recorder", None)
+        if recorder is not None:
+            DB_QUERIES.labels(view).observe(recorder.count)
+            DB_TIME.labels(view).observe(recorder.duration)
+        return response
+
+
+def get_registry():
+    if not settings.METRICS_MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """Metriklərin Prometheus mətn formatında göstərilməsi (daxili endpoint)"""
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,246 @@
+import asyncio
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger("moviesapi.queries")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+
+
+class QueryBudgetExceeded(Exception):
+    """Endpoint icazə verilən SQL sorğu sayını keçdi"""
+
+
+def fingerprint(sql):
+    """SQL sorğusunu parametrlərsiz formaya salmaq (N+1 aşkar etmək üçün)"""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return " ".join(sql.split())
+
+
+class QueryRecorder:
+    """connection.execute_wrapper üçün sorğu sayğacı"""
+
+    def __init__(self):
+        # Async view-larda bir neçə thread eyni sayğaca yazır (moviesapi.aio)
+        self.lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            with self.lock:
+                self.duration += elapsed
+                self.count += 1
+                self.fingerprints[key] += 1
+
+    def duplicates(self):
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+# Hazırkı sorğunun sayğacı; contextvars ilə sync_to_async və moviesapi.aio
+# thread-lərinə də ötürülür.
+_recorder = contextvars.ContextVar("query_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    # Siyahının əvvəlinə: execute_wrapper() bloku çıxışda sonuncunu silir
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def connection_did_create(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+connection_created.connect(connection_did_create)
+
+
+def get_url_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.view_name
+
+
+class HybridMiddleware:
+    """
+    Həm WSGI, həm ASGI zəncirində işləyən middleware bazası.
+
+    Async zəncirdə yalnız sinxron olan middleware-i Django
+    sync_to_async(thread_sensitive=True) ilə bükür və bütün sorğular bir
+    thread-də növbəyə düzülür. Alt siniflər `call` (sync) və `acall` (async)
+    metodlarını təyin edir.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Django middleware-in async olmasını asyncio.iscoroutinefunction ilə yoxlayır
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.acall(request)
+        return self.call(request)
+
+    def call(self, request):
+        return self.get_response(request)
+
+    async def acall(self, request):
+        return await self.get_response(request)
+
+
+class QueryBudgetMiddleware(HybridMiddleware):
+    """
+    Hər sorğu üçün SQL sorğularının sayını, DB vaxtını və təkrarlanan
+    sorğuları qeyd edir.
+
+    Nəticə `Server-Timing` başlığında və `moviesapi.queries` logunda görünür.
+    QUERY_BUDGETS-də URL adı üçün verilmiş limit keçildikdə xəbərdarlıq yazılır,
+    QUERY_BUDGET_STRICT aktiv olduqda isə QueryBudgetExceeded qaldırılır
+    (testlərdə regressiyanı tutmaq üçün).
+    """
+
+    def call(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        # middleware yüklənməzdən əvvəl açılmış bağlantılar üçün
+        for connection in connections.all():
+            install_query_recorder(connection)
+        recorder = request.query_recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def acall(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return await self.get_response(request)
+        recorder = request.query_recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def finish(self, request, response, recorder, total):
+        url_name = get_url_name(request)
+        duplicates = recorder.duplicates()
+        response["Server-Timing"] = ", ".join((
+            'db;dur={:.1f};desc="{} queries"'.format(recorder.duration * 1000, recorder.count),
+            'dup;desc="{} duplicated"'.format(sum(count for _, count in duplicates)),
+            "app;dur={:.1f}".format(total * 1000),
+        ))
+
+        budget = settings.QUERY_BUDGETS.get(url_name, settings.QUERY_BUDGET_DEFAULT)
+        exceeded = budget is not None and recorder.count > budget
+        level = logging.WARNING if exceeded else logging.DEBUG
+        if logger.isEnabledFor(level):
+            record = {
+                "method": request.method,
+                "path": request.path,
+                "url_name": url_name,
+                "status": response.status_code,
+                "queries": recorder.count,
+                "db_ms": round(recorder.duration * 1000, 2),
+                "total_ms": round(total * 1000, 2),
+                "budget": budget,
+                "duplicates": [
+                    {"sql": sql[:300], "count": count} for sql, count in duplicates[:5]
+                ],
+            }
+            logger.log(level, json.dumps(record), extra={"query_stats": record})
+
+        if exceeded and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(
+                f"{url_name or request.path} ran {recorder.count} queries, budget is {budget}"
+            )
+        return response
+
+
+class ConnectionHealthMiddleware(HybridMiddleware):
+    """
+    Daimi DB bağlantılarını sorğudan əvvəl yoxlamaq.
+
+    CONN_MAX_AGE > 0 olduqda bağlantı server tərəfindən bağlana bilər
+    (idle timeout, failover); Django bunu yalnız sorğu xəta verəndə görür.
+    DB_HEALTH_CHECK_INTERVAL saniyədən çox istifadə olunmayan bağlantı
+    `is_usable()` ilə yoxlanılır və ölüdürsə bağlanır (lazım olanda yenisi açılır).
+
+    Async zəncirdə yoxlama edilmir: event loop thread-inin bağlantısı yoxdur,
+    moviesapi.aio thread-ləri isə hər çağırışdan sonra close_old_connections
+    edir.
+    """
+
+    def call(self, request):
+        now = time.monotonic()
+        for connection in connections.all():
+            if connection.connection is None or connection.in_atomic_block:
+                continue
+            # (bağlantının id-si, son yoxlama vaxtı) DatabaseWrapper-də saxlanılır
+            key = id(connection.connection)
+            checked = getattr(connection, "health_checked", None)
+            if checked and checked[0] == key and now - checked[1] < settings.DB_HEALTH_CHECK_INTERVAL:
+                continue
+            if not connection.is_usable():
+                connection.close()
+                continue
+            connection.health_checked = (key, now)
+        return self.get_response(request)
+
+
+class StaticFilesMiddleware(HybridMiddleware, WhiteNoiseMiddleware):
+    """
+    Whitenoise middleware-i async zəncir üçün.
+
+    whitenoise 5.x yalnız sinxrondur; django_heroku onu zəncirin əvvəlinə
+    qoyur və ASGI-də bütün sorğular bir thread-dən keçirdi. Statik fayl
+    yaddaşdakı siyahıdan tapılır, qalan sorğular birbaşa ötürülür.
+    """
+
+    def __init__(self, get_response):
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        HybridMiddleware.__init__(self, get_response)
+
+    def call(self, request):
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def acall(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
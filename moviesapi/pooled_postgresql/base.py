@@ -0,0 +1,153 @@
+"""
+Proses daxilində bağlantı pool-u olan PostgreSQL backend-i.
+
+Thread-li və async worker-lərdə (moviesapi.aio) hər thread-in öz daimi
+bağlantısını saxlamaq əvəzinə bağlantılar pool-dan götürülür və Django
+bağlantını bağlayanda pool-a qaytarılır. Uzun müddət pool-da qalan bağlantı
+verilməzdən əvvəl `SELECT 1` ilə yoxlanılır. Pool doludursa bağlantı TIMEOUT
+saniyəyə qədər gözlənilir.
+
+DATABASES-də: 'ENGINE': 'moviesapi.pooled_postgresql', 'CONN_MAX_AGE': 0,
+'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 20, 'CHECK_AFTER': 30, 'TIMEOUT': 5}.
+"""
+import threading
+import time
+from collections import deque
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Sağlamlığı yoxlanılan thread-safe pool.
+
+    Qaytarılan bağlantılar MAX_SIZE-a qədər boş növbədə saxlanılır (psycopg2
+    pool-u isə yalnız MIN_SIZE-a qədər saxlayır, qalanını bağlayır). Bütün
+    bağlantılar istifadədə olanda checkout `timeout` saniyəyə qədər gözləyir.
+    """
+
+    def __init__(self, min_size, max_size, check_after, timeout, **conn_params):
+        self.max_size = max_size
+        self.check_after = check_after
+        self.timeout = timeout
+        self.conn_params = conn_params
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+        for _ in range(min_size):
+            self.idle.append((self.connect(), time.monotonic()))
+            self.size += 1
+
+    def connect(self):
+        return psycopg2.connect(**self.conn_params)
+
+    def is_alive(self, connection, returned_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def checkout(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise psycopg2.OperationalError(
+                            f"connection pool exhausted ({self.max_size} in use)"
+                        )
+                    self.condition.wait(remaining)
+                if self.idle:
+                    # sonuncu qaytarılan: ən az ehtimalla köhnəlmiş bağlantı
+                    connection, returned_at = self.idle.pop()
+                else:
+                    connection, returned_at = None, None
+                    self.size += 1
+
+            if connection is None:
+                try:
+                    return self.connect()
+                except Exception:
+                    self.release()
+                    raise
+            if self.is_alive(connection, returned_at):
+                return connection
+            self.discard(connection)
+
+    def checkin(self, connection):
+        broken = connection.closed or (
+            connection.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN
+        )
+        if not broken and connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                broken = True
+        if broken:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        self.release()
+
+    def release(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params):
+        with _pools_lock:
+            connection_pool = _pools.get(self.alias)
+            if connection_pool is None:
+                options = self.settings_dict.get("POOL", {})
+                connection_pool = _pools[self.alias] = ConnectionPool(
+                    options.get("MIN_SIZE", 1),
+                    options.get("MAX_SIZE", 20),
+                    options.get("CHECK_AFTER", 30),
+                    options.get("TIMEOUT", 5),
+                    **conn_params,
+                )
+        return connection_pool
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool(conn_params).checkout()
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                _pools[self.alias].checkin(self.connection)
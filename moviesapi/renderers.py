@@ -0,0 +1,55 @@
+"""
+MessagePack renderer və parser.
+
+Mobil müştərilər `Accept: application/msgpack` (və ya ?format=msgpack) ilə
+JSON əvəzinə daha yığcam binar cavab ala, `Content-Type: application/msgpack`
+ilə sorğu göndərə bilər.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+MEDIA_TYPE = "application/msgpack"
+
+
+def encode_default(obj):
+    """msgpack-in tanımadığı tipləri JSONRenderer kimi sətrə çevirmək"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Cavabı MessagePack formatında qaytarmaq"""
+
+    media_type = MEDIA_TYPE
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """MessagePack formatında göndərilən sorğu gövdəsi"""
+
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,232 @@
+"""
+Oxuma sorğularının replikalara yönləndirilməsi.
+
+ReplicaMiddleware təhlükəsiz metodlu (GET, HEAD, OPTIONS) sorğuları replikaya
+icazəli kimi işarələyir, ReplicaRouter isə belə sorğuların oxumalarını
+REPLICA_DATABASES-dən birinə göndərir. Replika sorğunun ilk oxumasında bir
+dəfə seçilir və sorğunun bütün oxumaları ondan gedir: bir cavabın hissələri
+fərqli gecikməli replikalardan yığılmır. Yazmalar, tranzaksiya daxilindəki
+oxumalar və sorğudan kənar kod (komandalar, worker-lər) həmişə `default`-a
+gedir.
+
+Yazmadan sonra REPLICA_PIN_SECONDS ərzində həmin müştəri primary-yə
+bağlanır (cookie və Authorization başlığına görə keş açarı), ki, öz yazdığını
+replikanın gecikməsi səbəbindən itirməsin.
+
+Replikalar fon thread-ində yoxlanılır, sorğu thread-i ping gözləmir.
+Yoxlamalar arasında sıradan çıxan replika bağlantı qurularkən (connect_timeout
+ilə) və ya sorğu zamanı OperationalError ilə aşkar olunur: replika növbəti
+yoxlamaya qədər istifadə olunmur, təhlükəsiz sorğu isə primary-də təkrarlanır.
+"""
+import contextvars
+import hashlib
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, InterfaceError, OperationalError, connections
+
+from .middleware import HybridMiddleware
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Replikaya icazəli sorğuda ReplicaChoice, qalan hallarda None
+use_replica = contextvars.ContextVar("use_replica", default=None)
+
+
+class ReplicaPool:
+    """Replikaların sağlamlığı, gecikməsi və seçilməsi (proses daxilində)"""
+
+    def __init__(self, aliases):
+        self.aliases = list(aliases)
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+        self.latency = {}
+        self.down = set()
+        self.checked = None
+
+    def ping(self, alias):
+        start = time.perf_counter()
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        return time.perf_counter() - start
+
+    def check(self):
+        """REPLICA_CHECK_INTERVAL-da bir dəfə fon thread-ində yoxlamaq"""
+        now = time.monotonic()
+        if self.checked is not None and now - self.checked < settings.REPLICA_CHECK_INTERVAL:
+            return
+        with self.lock:
+            if self.checked is not None and now - self.checked < settings.REPLICA_CHECK_INTERVAL:
+                return
+            self.checked = now
+        threading.Thread(target=self.check_all, name="replica-check", daemon=True).start()
+
+    def check_all(self):
+        for alias in self.aliases:
+            try:
+                elapsed = self.ping(alias)
+            except Exception:
+                self.mark_down(alias)
+                continue
+            finally:
+                # bağlantılar bu thread-ə aiddir, thread bitəndə istifadəsiz qalır
+                connections[alias].close()
+            if alias in self.down:
+                logger.info("Replica %s is available again", alias)
+            self.down.discard(alias)
+            previous = self.latency.get(alias, elapsed)
+            # eksponensial sürüşən orta
+            self.latency[alias] = previous * 0.7 + elapsed * 0.3
+
+    def mark_down(self, alias):
+        if alias not in self.down:
+            logger.warning("Replica %s is unavailable", alias, exc_info=True)
+        self.down.add(alias)
+
+    def candidates(self):
+        healthy = [alias for alias in self.aliases if alias not in self.down]
+        if settings.REPLICA_POLICY == "least-latency":
+            return sorted(healthy, key=lambda alias: self.latency.get(alias, 0))
+        start = next(self.counter) % len(self.aliases)
+        ordered = self.aliases[start:] + self.aliases[:start]
+        return [alias for alias in ordered if alias not in self.down]
+
+    def choose(self):
+        """Bağlantısı qurula bilən replika və ya None (primary)"""
+        self.check()
+        for alias in self.candidates():
+            try:
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                self.mark_down(alias)
+                connections[alias].close()
+                continue
+            return alias
+        return None
+
+
+pool = ReplicaPool(settings.REPLICA_DATABASES)
+
+
+class ReplicaChoice:
+    """Sorğunun replikası; ilk oxumada bir dəfə seçilir (None - primary)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.chosen = False
+        self.alias = None
+
+    def get(self):
+        # moviesapi.aio thread-ləri eyni obyekti kontekstlə paylaşır
+        with self.lock:
+            if not self.chosen:
+                self.alias = pool.choose()
+                self.chosen = True
+            return self.alias
+
+
+class ReplicaRouter:
+    """Sorğu replikaya icazəlidirsə oxumaları replikaya yönləndirmək"""
+
+    def db_for_read(self, model, **hints):
+        choice = use_replica.get()
+        if not pool.aliases or choice is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return choice.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replikalar primary-nin surətidir
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def get_pin_key(request):
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    digest = hashlib.sha1(authorization.encode()).hexdigest()
+    return f"replica:pin:{digest}"
+
+
+def is_pinned(request):
+    if request.COOKIES.get(settings.REPLICA_PIN_COOKIE):
+        return True
+    key = get_pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+class ReplicaMiddleware(HybridMiddleware):
+    """Təhlükəsiz sorğuları replikaya icazələmək, yazmadan sonra primary-yə bağlamaq"""
+
+    def call(self, request):
+        if not pool.aliases:
+            return self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        response = self.run(request, safe and not is_pinned(request))
+        if getattr(request, "replica_failed", False):
+            # replika sorğu zamanı sıradan çıxdı: təhlükəsiz sorğu primary-də təkrarlanır
+            request.replica_failed = False
+            response = self.run(request, False)
+        return self.pin(request, response, safe)
+
+    async def acall(self, request):
+        if not pool.aliases:
+            return await self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        response = await self.arun(request, safe and not is_pinned(request))
+        if getattr(request, "replica_failed", False):
+            request.replica_failed = False
+            response = await self.arun(request, False)
+        return self.pin(request, response, safe)
+
+    def run(self, request, replica):
+        token = use_replica.set(ReplicaChoice() if replica else None)
+        try:
+            return self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+    async def arun(self, request, replica):
+        token = use_replica.set(ReplicaChoice() if replica else None)
+        try:
+            return await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+
+    def process_exception(self, request, exception):
+        choice = use_replica.get()
+        if choice is None or choice.alias is None:
+            return None
+        if not isinstance(exception, (OperationalError, InterfaceError)):
+            return None
+        pool.mark_down(choice.alias)
+        connections[choice.alias].close()
+        # təkrar cəhd seçimsiz (use_replica=None), yəni primary-də gedir
+        request.replica_failed = True
+        return None
+
+    def pin(self, request, response, safe):
+        if not safe:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, "1", max_age=seconds,
+                httponly=True, samesite="Lax", secure=request.is_secure(),
+            )
+            key = get_pin_key(request)
+            if key is not None:
+                cache.set(key, 1, seconds)
+        return response
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import dj_database_url
 import django_heroku
 import cloudinary
 
@@ -33,10 +34,91 @@ ALLOWED_HOSTS = ['*']
 
 MAX_REVIEW_LENGTH = 800
 REVIEW_ACTION_OPTIONS = ["like", "unlike", "reply"]
-CATALOG_SECTION_NAMES = ["new-added", "most-popular", "most-rated"]
+CATALOG_SECTION_NAMES = ["new-added", "most-popular", "most-rated", "trending"]
+MOVIES_BATCH_MAX_IDS = 100
+# home/ response is cached as one unit under the catalog version (movies.cache)
+HOME_CACHE_TIMEOUT = 300
+ADMIN_INLINE_REVIEWS_PER_PAGE = 50
+
+# Similar movies (movies.similarity, build_similar_movies command)
+SIMILAR_MOVIES_TOP_K = 20
+SIMILAR_MOVIES_CHUNK_SIZE = 256
+SIMILAR_MOVIES_MIN_SCORE = 0.01
+SIMILAR_MOVIES_WEIGHTS = {
+    'ratings': 1.0,
+    'watchlists': 0.5,
+    'genres': 0.3,
+    'directors': 0.3,
+}
+
+# Recommendations (movies.recommendations, train_recommendations command).
+# Factor files are memory-mapped by every worker, so the directory must be
+# on a disk shared by all of them.
+RECOMMENDATIONS_DIR = os.environ.get(
+    'RECOMMENDATIONS_DIR', os.path.join(BASE_DIR, 'recommendations')
+)
+RECOMMENDATIONS_FACTORS = 32
+RECOMMENDATIONS_ITERATIONS = 15
+RECOMMENDATIONS_REGULARIZATION = 0.1
+RECOMMENDATIONS_RELOAD_INTERVAL = 60
+RECOMMENDATIONS_COUNT = 20
+RECOMMENDATIONS_MAX_COUNT = 100
+
+# Trending (movies.trending, update_trending command)
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_BUCKET_SECONDS = 600
+TRENDING_WEIGHTS = {
+    'rating': 1.0,
+    'review': 2.0,
+    'like': 0.5,
+    'watchlist': 1.5,
+}
+
+# Change feed (movies.changes)
+CHANGE_FEED_PAGE_SIZE = 500
+CHANGE_FEED_MAX_PAGE_SIZE = 5000
+CHANGE_FEED_RETENTION_DAYS = 30
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# SQL query budget per URL name (see moviesapi.middleware.QueryBudgetMiddleware).
+# With QUERY_BUDGET_STRICT on, exceeding a budget raises QueryBudgetExceeded,
+# which makes the test client fail the test.
+
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', 'true').lower() == 'true'
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGETS = {
+    'home': 12,
+    'home-page-video': 3,
+    'genres': 3,
+    'platforms': 3,
+    'new-movies': 20,
+    'catalog-movies': 30,
+    'movies': 25,
+    'movie-detail': 15,
+    'movie-similar': 3,
+    'movies-batch': 12,
+    'recommendations': 5,
+    'movie-reviews': 60,
+    'search-movie': 15,
+    'directors': 4,
+    'director-detail': 3,
+    'user-watchlist': 30,
+    'check-username': 2,
+    'check-email': 2,
+    'async-home-page-video': 4,
+    'async-new-movies': 20,
+    'async-catalog-movies': 30,
+    'async-movie-detail': 15,
+    'async-movie-reviews': 60,
+    'async-search-movie': 15,
+}
+
+# Async views: ORM calls run in a bounded thread pool (moviesapi.aio); the
+# pool size also caps the DB connections a single process opens for them.
+ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', 8))
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -50,6 +132,7 @@ INSTALLED_APPS = [
     'movies.apps.MoviesConfig',
     'accounts.apps.AccountsConfig',
     'profiles.apps.ProfilesConfig',
+    'jobs.apps.JobsConfig',
     # third package
     'djoser',
     'drf_yasg',
@@ -64,6 +147,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'moviesapi.compression.CompressionMiddleware',
+    'moviesapi.middleware.ConnectionHealthMiddleware',
+    'moviesapi.middleware.QueryBudgetMiddleware',
+    'moviesapi.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -74,6 +161,53 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# API SCHEMA SETTINGS (moviesapi.yasg)
+# Run `manage.py generate_schema` at build time; workers serve the files with
+# an ETag. SCHEMA_LIVE=true rebuilds the schema on every request; it only
+# applies with DEBUG and is off unless set explicitly.
+
+SCHEMA_DIR = os.environ.get('SCHEMA_DIR', os.path.join(BASE_DIR, 'schema'))
+SCHEMA_LIVE = DEBUG and os.environ.get('SCHEMA_LIVE', 'false').lower() == 'true'
+SCHEMA_CACHE_SECONDS = 3600
+SWAGGER_SETTINGS = {'SPEC_URL': 'schema-json'}
+REDOC_SETTINGS = {'SPEC_URL': 'schema-json'}
+
+# RESPONSE COMPRESSION SETTINGS (moviesapi.compression)
+# Compressed bodies are cached by body hash, so responses served from the
+# view caches (home/, catalog) are compressed once per cache entry.
+
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = 860
+COMPRESSION_CACHE_TIMEOUT = 300
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/msgpack',
+    'application/yaml',
+]
+COMPRESSION_DEFAULT_LEVELS = {'gzip': 6, 'br': 4}
+# Per-endpoint overrides by URL name: cached/heavy pages get a higher level,
+# since they are compressed once and served many times.
+COMPRESSION_LEVELS = {
+    'home': {'gzip': 9, 'br': 9},
+    'catalog-movies': {'gzip': 9, 'br': 9},
+    'movies': {'gzip': 6, 'br': 5},
+    'movie-reviews': {'gzip': 6, 'br': 5},
+    'changes': {'gzip': 4, 'br': 3},
+}
+
+# PROMETHEUS METRICS SETTINGS
+# Under gunicorn, METRICS_MULTIPROC_DIR must point to a directory shared by
+# all workers (see gunicorn.conf.py); leave it empty for a single process.
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'moviesapi.metrics.MetricsMiddleware')
+
 ROOT_URLCONF = 'moviesapi.urls'
 
 TEMPLATES = [
@@ -140,6 +274,31 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# Resized variants of uploaded images (see movies.images)
+IMAGE_VARIANT_WIDTHS = [160, 320, 640, 1024]
+IMAGE_VARIANT_FORMATS = ['webp', 'avif']  # written only when Pillow supports them
+IMAGE_VARIANT_QUALITY = 80
+
+# Background jobs (see jobs.queue), run with `manage.py run_jobs --loop`
+JOBS_PROCESSES = int(os.environ.get('JOBS_PROCESSES', 2))
+JOBS_BATCH_SIZE = 5
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+JOBS_POLL_INTERVAL = 2
+
+
+# CACHE SETTINGS
+# Catalog cache keys are versioned (movies.cache). With several gunicorn
+# workers use a shared backend (memcached, database) so that invalidation
+# reaches every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 
 # Database PostgreSQL
 
@@ -162,16 +321,111 @@ CLOUDINARY_STORAGE = {
 
 if DEBUG == False:
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+else:
+    DEFAULT_FILE_STORAGE = 'moviesapi.storage.HashedMediaStorage'
 
 
 # HEROKU SETTINGS
 
 django_heroku.settings(locals())
 
+# django_heroku prepends the sync-only whitenoise middleware; the hybrid
+# subclass keeps the ASGI middleware chain async.
+MIDDLEWARE = tuple(
+    'moviesapi.middleware.StaticFilesMiddleware'
+    if name == 'whitenoise.middleware.WhiteNoiseMiddleware' else name
+    for name in MIDDLEWARE
+)
+
+
+# READ REPLICAS
+# DATABASE_REPLICA_URLS is a comma-separated list of database URLs. Reads of
+# GET/HEAD/OPTIONS requests go to a healthy replica (moviesapi.replicas);
+# after a write the client stays on the primary for REPLICA_PIN_SECONDS.
+# Replicas are pinged in a background thread every REPLICA_CHECK_INTERVAL
+# seconds; a replica that refuses connections (REPLICA_CONNECT_TIMEOUT) or
+# fails mid-request is skipped and the read falls back to the primary.
+
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get('REPLICA_CONNECT_TIMEOUT', 2))
+REPLICA_DATABASES = []
+for _index, _url in enumerate(
+    url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url
+):
+    _alias = 'replica{}'.format(_index + 1)
+    DATABASES[_alias] = dj_database_url.parse(_url)
+    DATABASES[_alias]['TEST'] = {'MIRROR': 'default'}
+    if 'postgresql' in DATABASES[_alias]['ENGINE']:
+        DATABASES[_alias].setdefault('OPTIONS', {})['connect_timeout'] = REPLICA_CONNECT_TIMEOUT
+    REPLICA_DATABASES.append(_alias)
+
+DATABASE_ROUTERS = ['moviesapi.replicas.ReplicaRouter']
+REPLICA_POLICY = os.environ.get('REPLICA_POLICY', 'round-robin')  # or 'least-latency'
+REPLICA_CHECK_INTERVAL = 10
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+
+# DATABASE CONNECTIONS
+# DB_CONN_MODE:
+#   'persistent' - each worker thread keeps its connection for DB_CONN_MAX_AGE
+#                  seconds (sync gunicorn workers);
+#   'pool'       - connections come from an in-process pool and are returned
+#                  after every request (threaded/async workers,
+#                  moviesapi.pooled_postgresql); up to DB_POOL_MAX_SIZE stay
+#                  open and a checkout waits DB_POOL_TIMEOUT seconds when all
+#                  are in use;
+#   'none'       - a new connection per request.
+# Idle connections are re-checked by ConnectionHealthMiddleware (persistent)
+# or by the pool after DB_HEALTH_CHECK_INTERVAL seconds.
+
+DB_CONN_MODE = os.environ.get('DB_CONN_MODE', 'persistent')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+DB_HEALTH_CHECK_INTERVAL = int(os.environ.get('DB_HEALTH_CHECK_INTERVAL', 30))
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', ASYNC_DB_THREADS + 4))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 5))
+
+for _db in DATABASES.values():
+    if DB_CONN_MODE == 'pool' and 'postgresql' in _db['ENGINE']:
+        _db['ENGINE'] = 'moviesapi.pooled_postgresql'
+        _db['CONN_MAX_AGE'] = 0
+        _db['POOL'] = {
+            'MIN_SIZE': DB_POOL_MIN_SIZE,
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            'CHECK_AFTER': DB_HEALTH_CHECK_INTERVAL,
+            'TIMEOUT': DB_POOL_TIMEOUT,
+        }
+    else:
+        _db['CONN_MAX_AGE'] = DB_CONN_MAX_AGE if DB_CONN_MODE == 'persistent' else 0
+
+
+# STATIC AND MEDIA SERVING
+# Hashed static names with gzip/brotli copies built by collectstatic
+# (brotli needs the Brotli package). Whitenoise serves them with immutable
+# cache headers. Media from MEDIA_ROOT is served by moviesapi.media. With
+# MEDIA_SENDFILE set to 'x-accel-redirect' (nginx) or 'x-sendfile', the web
+# server streams the bytes instead of the Python worker.
+
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+MEDIA_SERVE = DEBUG or os.environ.get('MEDIA_SERVE', 'false').lower() == 'true'
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_MAX_AGE = 60 * 60
+
 
 # EMAIL AND AWS SETTINGS
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Mails are written to the QueuedEmail table and delivered by
+# `manage.py send_queued_emails --loop` through QUEUED_EMAIL_BACKEND
+EMAIL_BACKEND = 'accounts.backends.QueuedEmailBackend'
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+QUEUED_EMAIL_BATCH_SIZE = 50
+QUEUED_EMAIL_WORKERS = 2
+QUEUED_EMAIL_MAX_ATTEMPTS = 5
+QUEUED_EMAIL_RETRY_DELAY = 60  # seconds, doubled after every failed attempt
+QUEUED_EMAIL_POLL_INTERVAL = 5
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -189,6 +443,19 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_PASS')
 # DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 
 
+# LOGGING SETTINGS
+# django_heroku.settings() above already defines LOGGING; extend it instead
+# of replacing it.
+
+LOGGING = locals().get('LOGGING') or {'version': 1, 'disable_existing_loggers': False}
+LOGGING.setdefault('handlers', {}).setdefault('console', {'class': 'logging.StreamHandler'})
+LOGGING.setdefault('loggers', {})['moviesapi.queries'] = {
+    'handlers': ['console'],
+    'level': os.environ.get('QUERY_LOG_LEVEL', 'WARNING'),
+    'propagate': False,
+}
+
+
 # CORS SETTINGS
 
 CORS_ORIGIN_WHITELIST = [
@@ -204,12 +471,24 @@ CORS_ORIGIN_WHITELIST = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.ProfileJWTAuthentication',
+        'accounts.authentication.ProfileTokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    # Accept: application/msgpack -> MessagePack (moviesapi.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'moviesapi.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'moviesapi.renderers.MessagePackParser',
+    ),
 }
 
 
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+# Qovluq adı artıq məzmun hash-ıdır (movies.images)
+CONTENT_ADDRESSED_DIRS = ("derivatives/",)
+
+
+def is_content_addressed(name):
+    return bool(HASHED_NAME_RE.search(name)) or name.startswith(CONTENT_ADDRESSED_DIRS)
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """
+    Media fayllarını adına məzmun hash-ı əlavə edərək saxlayır.
+
+    `poster.jpg` -> `poster.1a2b3c4d5e6f.jpg`. Eyni məzmunlu fayl yenidən
+    yüklənsə, mövcud fayl istifadə olunur. Ad dəyişmədiyi üçün belə fayllar
+    `Cache-Control: immutable` ilə verilə bilər (moviesapi.media).
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        if not is_content_addressed(name):
+            name = self.get_hashed_name(name, content)
+            if self.exists(name):
+                return name
+        return super().save(name, content, max_length=max_length)
+
+    def get_hashed_name(self, name, content):
+        digest = hashlib.sha1()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        root, ext = os.path.splitext(name)
+        return f"{root}.{digest.hexdigest()[:12]}{ext}"
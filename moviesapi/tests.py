@@ -0,0 +1,389 @@
+import asyncio
+import datetime
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import msgpack
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections, router, transaction
+from django.http import Http404, HttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from movies.benchmarks import generate_dataset
+from movies.models import Movie
+from .compression import CompressionMiddleware, cache_compressed
+from .media import serve_media
+from .middleware import QueryBudgetExceeded, fingerprint
+from .renderers import MEDIA_TYPE, MessagePackParser, MessagePackRenderer
+from .replicas import ReplicaChoice, ReplicaMiddleware, ReplicaPool, use_replica
+from .yasg import generate_schema
+
+SMALL_DATASET = dict(
+    movies=5, genres=3, directors=3, platforms=2, users=3, ratings_per_movie=2,
+    reviews_per_movie=1, replies_per_review=1, likes_per_review=1, watchlist_per_user=1,
+)
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+            fingerprint("SELECT * FROM t WHERE id IN (4) AND name = 'y'"),
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("genres"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={"genres": 0})
+    def test_strict_budget_fails_request(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("genres"))
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_endpoints_within_budget(self):
+        for name in ("genres", "platforms", "movies", "directors", "home"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+
+    def test_middleware_chain_is_async(self):
+        # bir sinxron middleware bütün ASGI sorğularını bir thread-ə yığır
+        for path in settings.MIDDLEWARE:
+            with self.subTest(path=path):
+                self.assertTrue(getattr(import_string(path), "async_capable", False))
+
+    async def test_concurrent_async_requests_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_home_video():
+            # sorğular növbəyə düzülsə ikinci heç vaxt gəlmir: BrokenBarrierError
+            barrier.wait()
+            return {}
+
+        url = reverse("async-home-page-video")
+        with mock.patch("movies.async_views.get_home_video", get_home_video):
+            responses = await asyncio.gather(
+                self.async_client.get(url), self.async_client.get(url)
+            )
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+
+
+@override_settings(REPLICA_POLICY="round-robin")
+class ReplicaRouterTests(TransactionTestCase):
+    databases = {"default", "replica1", "replica2"}
+    replica_aliases = ("replica1", "replica2")
+
+    @classmethod
+    def setUpClass(cls):
+        # İki replika test bazasının güzgüsü kimi yalnız bu testlər üçün
+        # qoşulur; test bazası artıq yaradılıb, MIRROR olduğu üçün flush olunmur.
+        for alias in cls.replica_aliases:
+            connections.databases[alias] = dict(
+                connections.databases["default"], TEST={"MIRROR": "default"}
+            )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in cls.replica_aliases:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+
+    def setUp(self):
+        cache.clear()
+        self.pool = ReplicaPool(["replica1", "replica2"])
+        # fon yoxlaması test zamanı işə düşməsin
+        self.pool.checked = time.monotonic()
+        patcher = mock.patch("moviesapi.replicas.pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def route(self, request):
+        """ReplicaMiddleware-dən keçən sorğunun oxuduğu baza"""
+        aliases = []
+
+        def get_response(request):
+            aliases.append(Movie.objects.all().db)
+            return HttpResponse()
+
+        response = ReplicaMiddleware(get_response)(request)
+        return aliases[-1], response
+
+    def reads(self, count):
+        """Bir sorğu ərzində `count` oxumanın getdiyi bazalar"""
+        token = use_replica.set(ReplicaChoice())
+        try:
+            return [Movie.objects.all().db for _ in range(count)]
+        finally:
+            use_replica.reset(token)
+
+    def test_replica_is_chosen_once_per_request(self):
+        requests = [self.reads(3) for _ in range(4)]
+        # sorğu daxilində bir replika, sorğular arasında round-robin
+        self.assertEqual(
+            requests, [["replica1"] * 3, ["replica2"] * 3, ["replica1"] * 3, ["replica2"] * 3]
+        )
+
+    def test_writes_and_transactions_use_primary(self):
+        token = use_replica.set(ReplicaChoice())
+        try:
+            self.assertEqual(router.db_for_write(Movie), "default")
+            with transaction.atomic():
+                self.assertEqual(Movie.objects.all().db, "default")
+        finally:
+            use_replica.reset(token)
+        self.assertEqual(Movie.objects.all().db, "default")
+
+    def test_safe_request_reads_replica(self):
+        alias, _ = self.route(self.factory.get("/"))
+        self.assertIn(alias, self.pool.aliases)
+        alias, _ = self.route(self.factory.post("/"))
+        self.assertEqual(alias, "default")
+
+    def test_write_pins_client_to_primary(self):
+        _, response = self.route(self.factory.post("/", HTTP_AUTHORIZATION="Token abc"))
+
+        request = self.factory.get("/")
+        request.COOKIES[settings.REPLICA_PIN_COOKIE] = response.cookies[settings.REPLICA_PIN_COOKIE].value
+        self.assertEqual(self.route(request)[0], "default")
+        # cookie saxlamayan API müştərisi Authorization başlığına görə bağlanır
+        self.assertEqual(self.route(self.factory.get("/", HTTP_AUTHORIZATION="Token abc"))[0], "default")
+        self.assertIn(self.route(self.factory.get("/", HTTP_AUTHORIZATION="Token xyz"))[0], self.pool.aliases)
+
+    def test_unreachable_replica_falls_back(self):
+        connection = connections["replica1"]
+        settings_dict = connection.settings_dict
+        connection.close()
+        connection.settings_dict = dict(settings_dict, HOST="127.0.0.1", PORT="1")
+        try:
+            self.assertEqual(self.reads(2), ["replica2"] * 2)
+            self.assertEqual(self.pool.down, {"replica1"})
+            self.assertEqual(self.reads(1), ["replica2"])
+
+            self.pool.down.add("replica2")
+            self.assertEqual(self.reads(1), ["default"])
+        finally:
+            connection.close()
+            connection.settings_dict = settings_dict
+
+    def test_replica_failure_retries_on_primary(self):
+        aliases = []
+        middleware = None
+
+        def get_response(request):
+            # Django handler-i view xətasında process_exception çağırır və 500 qaytarır
+            alias = Movie.objects.all().db
+            aliases.append(alias)
+            if alias != "default":
+                middleware.process_exception(request, OperationalError("server closed the connection"))
+                return HttpResponse(status=500)
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(self.factory.get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(aliases[-1], "default")
+        self.assertEqual(self.pool.down, {aliases[0]})
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "PostgreSQL pool")
+class ConnectionPoolTests(TransactionTestCase):
+
+    def make_pool(self, **kwargs):
+        from .pooled_postgresql.base import ConnectionPool
+
+        options = dict(min_size=1, max_size=2, check_after=30, timeout=0.2)
+        options.update(kwargs)
+        pool = ConnectionPool(**options, **connection.get_connection_params())
+        self.addCleanup(lambda: [conn.close() for conn, _ in pool.idle])
+        return pool
+
+    def test_returned_connections_are_reused(self):
+        pool = self.make_pool()
+        first, second = pool.checkout(), pool.checkout()
+        pool.checkin(first)
+        pool.checkin(second)
+        # MIN_SIZE=1 olsa da hər ikisi saxlanılır
+        self.assertEqual(len(pool.idle), 2)
+        reused = pool.checkout()
+        self.assertIn(reused, (first, second))
+        self.assertEqual(pool.size, 2)
+        pool.checkin(reused)
+
+    def test_checkout_waits_for_checkin(self):
+        pool = self.make_pool(timeout=5)
+        first, second = pool.checkout(), pool.checkout()
+        timer = threading.Timer(0.1, pool.checkin, (first,))
+        timer.start()
+        self.assertIs(pool.checkout(), first)
+        timer.join()
+        pool.checkin(first)
+        pool.checkin(second)
+
+    def test_checkout_times_out(self):
+        pool = self.make_pool()
+        held = [pool.checkout(), pool.checkout()]
+        import psycopg2
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.checkout()
+        for conn in held:
+            pool.checkin(conn)
+
+    def test_broken_connection_is_replaced(self):
+        pool = self.make_pool()
+        broken = pool.checkout()
+        broken.close()
+        pool.checkin(broken)
+        self.assertEqual(pool.size, 0)
+        fresh = pool.checkout()
+        self.assertFalse(fresh.closed)
+        pool.checkin(fresh)
+
+
+@override_settings(COMPRESSION_ENABLED=True)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+    def compress(self, response):
+        with mock.patch("moviesapi.compression.get_compressed") as get_compressed:
+            get_compressed.return_value = b"cached"
+            response = CompressionMiddleware(lambda request: response)(self.request)
+        return response, get_compressed.called
+
+    def make_response(self):
+        return HttpResponse(b'{"title": "movie"}' * 100, content_type="application/json")
+
+    def test_uncached_response_is_compressed_in_place(self):
+        response, cached = self.compress(self.make_response())
+        self.assertFalse(cached)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_view_cached_response_uses_compression_cache(self):
+        response, cached = self.compress(cache_compressed(self.make_response()))
+        self.assertTrue(cached)
+        self.assertEqual(response.content, b"cached")
+
+
+class SchemaTests(TestCase):
+
+    @override_settings(DEBUG=True, SCHEMA_LIVE=True)
+    def test_live_schema(self):
+        for name in ("schema-json", "schema-yaml"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("ETag", response)
+
+    @override_settings(DEBUG=False, SCHEMA_LIVE=True)
+    def test_live_schema_needs_debug(self):
+        with mock.patch("moviesapi.yasg.generate_schema", wraps=generate_schema) as generate:
+            for _ in range(2):
+                self.assertEqual(self.client.get(reverse("schema-json")).status_code, 200)
+        # fayl yoxdursa proses üçün ən çox bir dəfə qurulur
+        self.assertLessEqual(generate.call_count, 1)
+
+
+class MediaTests(SimpleTestCase):
+
+    def test_path_traversal_is_not_found(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(MEDIA_ROOT=root):
+            for path in ("../settings.py", "a/../../settings.py"):
+                with self.subTest(path=path), self.assertRaises(Http404):
+                    serve_media(RequestFactory().get("/"), path)
+
+
+class MessagePackTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(**SMALL_DATASET)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_round_trip(self):
+        data = {
+            "id": 1, "title": "Kino", "score": 7.5, "draft": False, "poster": None,
+            "genres": [{"id": 2, "name": "Dram"}], "tags": ("a", "b"),
+            "price": Decimal("9.90"), "key": uuid.UUID(int=1),
+            "premiere": datetime.date(2021, 5, 1),
+            "timestamp": datetime.datetime(2021, 5, 1, 12, 30),
+        }
+        content = MessagePackRenderer().render(data)
+        self.assertIsInstance(content, bytes)
+        self.assertEqual(MessagePackParser().parse(BytesIO(content)), dict(
+            data, tags=["a", "b"], price="9.90", key=str(uuid.UUID(int=1)),
+            premiere="2021-05-01", timestamp="2021-05-01T12:30:00",
+        ))
+        self.assertEqual(MessagePackRenderer().render(None), b"")
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(TypeError):
+            MessagePackRenderer().render({"value": object()})
+
+    def test_invalid_body_is_parse_error(self):
+        for body in (b"\xc1", msgpack.packb(1) + b"\x01"):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                MessagePackParser().parse(BytesIO(body))
+
+    def test_response_matches_json(self):
+        url = reverse("movie-detail", args=[Movie.published.first().pk])
+        expected = self.client.get(url).json()
+        for kwargs in ({"HTTP_ACCEPT": MEDIA_TYPE}, {"data": {"format": "msgpack"}}):
+            with self.subTest(**kwargs):
+                response = self.client.get(url, **kwargs)
+                self.assertEqual(response["Content-Type"], MEDIA_TYPE)
+                self.assertEqual(msgpack.unpackb(response.content, raw=False), expected)
+
+    def test_request_body(self):
+        class EchoView(APIView):
+            authentication_classes = []
+            permission_classes = []
+
+            def post(self, request):
+                return Response(request.data)
+
+        data = {"movie": 1, "star": 5, "content": "Əla"}
+        request = RequestFactory().post(
+            "/", msgpack.packb(data), content_type=MEDIA_TYPE, HTTP_ACCEPT=MEDIA_TYPE
+        )
+        response = EchoView.as_view()(request).render()
+        self.assertEqual(msgpack.unpackb(response.content, raw=False), data)
+
+        request = RequestFactory().post("/", b"\xc1", content_type=MEDIA_TYPE)
+        self.assertEqual(EchoView.as_view()(request).status_code, 400)
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.contrib import admin
-from django.conf.urls.static import static
 from django.urls import path, include, re_path
+from .media import serve_media
 from .yasg import urlpatterns as doc_urls
 
 
@@ -20,5 +20,11 @@ urlpatterns = [
 
 urlpatterns += doc_urls
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+if settings.METRICS_ENABLED:
+    from .metrics import metrics_view
+    urlpatterns.insert(0, path('metrics', metrics_view, name='metrics'))
+
+if settings.MEDIA_SERVE:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
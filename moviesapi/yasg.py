@@ -1,24 +1,146 @@
-from django.urls import path, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
+"""
+API sxeminin (OpenAPI) hazır artefaktdan verilməsi.
+
+Sxem `generate_schema` komandası ilə build zamanı SCHEMA_DIR-ə JSON və YAML
+kimi yazılır. Worker-lər faylı bir dəfə oxuyub yaddaşda saxlayır və ETag ilə
+verir; swagger və redoc səhifələri sxemi bu ünvandan yükləyir, özləri view
+və serializer-ləri yoxlamır. Sxem yalnız DEBUG-da və SCHEMA_LIVE=true
+olanda hər sorğuda yenidən qurulur.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import path
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
 from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
 
+logger = logging.getLogger(__name__)
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Django Movie",
-        default_version="v1",
-        description="Test Description",
-        license=openapi.License(name="BSD License"),
+api_info = openapi.Info(
+    title="Django Movie",
+    default_version="v1",
+    description=(
+        "Test Description\n\n"
+        "Every endpoint also speaks MessagePack: send `Accept: application/msgpack` "
+        "(or `?format=msgpack`) for binary responses and "
+        "`Content-Type: application/msgpack` for request bodies."
     ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
+    license=openapi.License(name="BSD License"),
 )
 
+SCHEMA_FORMATS = {
+    "json": (OpenAPICodecJson, "application/json"),
+    "yaml": (OpenAPICodecYaml, "application/yaml"),
+}
+
+UI_RENDERERS = {"swagger": SwaggerUIRenderer, "redoc": ReDocRenderer}
+
+_artifacts = {}
+_artifacts_lock = threading.Lock()
+
+
+def generate_schema(request=None):
+    generator = OpenAPISchemaGenerator(api_info)
+    return generator.get_schema(request=request, public=True)
+
+
+def encode_schema(schema, fmt):
+    codec_class, _ = SCHEMA_FORMATS[fmt]
+    return codec_class(validators=[]).encode(schema)
+
+
+def get_schema_path(fmt, directory=None):
+    return os.path.join(directory or settings.SCHEMA_DIR, f"openapi.{fmt}")
+
+
+def write_schema(directory=None, formats=SCHEMA_FORMATS):
+    """Sxemi bir dəfə qurub hər formatda atomar yazmaq, yazılmış fayllar"""
+    directory = directory or settings.SCHEMA_DIR
+    os.makedirs(directory, exist_ok=True)
+    schema = generate_schema()
+    paths = []
+    for fmt in formats:
+        filename = get_schema_path(fmt, directory)
+        with open(filename + ".tmp", "wb") as fp:
+            fp.write(encode_schema(schema, fmt))
+        os.replace(filename + ".tmp", filename)
+        paths.append(filename)
+    return paths
+
+
+def _make_artifact(body):
+    return body, '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def is_live():
+    """Sxem hər sorğuda qurulsunmu; production-da SCHEMA_LIVE nəzərə alınmır"""
+    return settings.DEBUG and settings.SCHEMA_LIVE
+
+
+def get_artifact(fmt):
+    """(gövdə, ETag); fayl yoxdursa sxem proses üçün bir dəfə qurulur"""
+    if is_live():
+        # request=None: generator DRF Request gözləyir, burada isə adi HttpRequest var
+        return _make_artifact(encode_schema(generate_schema(), fmt))
+    artifact = _artifacts.get(fmt)
+    if artifact is None:
+        with _artifacts_lock:
+            artifact = _artifacts.get(fmt)
+            if artifact is None:
+                try:
+                    with open(get_schema_path(fmt), "rb") as fp:
+                        body = fp.read()
+                except FileNotFoundError:
+                    logger.warning(
+                        "Pregenerated %s schema not found in %s, run generate_schema",
+                        fmt, settings.SCHEMA_DIR,
+                    )
+                    body = encode_schema(generate_schema(), fmt)
+                artifact = _artifacts[fmt] = _make_artifact(body)
+    return artifact
+
+
+@require_safe
+def schema_file(request, fmt):
+    body, etag = get_artifact(fmt)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=SCHEMA_FORMATS[fmt][1])
+    response["ETag"] = etag
+    if is_live():
+        patch_cache_control(response, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.SCHEMA_CACHE_SECONDS)
+    return response
+
+
+# UI şablonlarına sxemdən yalnız başlıq və versiya lazımdır
+_ui_schema = openapi.Swagger(info=api_info, paths=openapi.Paths(paths={}))
+
+
+@require_safe
+def schema_ui(request, ui):
+    # köhnə `?format=openapi` ünvanı üçün
+    if request.GET.get("format") == "openapi":
+        return schema_file(request, "json")
+    renderer = UI_RENDERERS[ui]()
+    html = renderer.render(_ui_schema, renderer_context={"request": request})
+    return HttpResponse(html, content_type="text/html; charset=utf-8")
+
 
 urlpatterns = [
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger.json', schema_file, {'fmt': 'json'}, name='schema-json'),
+    path('swagger.yaml', schema_file, {'fmt': 'yaml'}, name='schema-yaml'),
+    path('swagger/', schema_ui, {'ui': 'swagger'}, name='schema-swagger-ui'),
+    path('', schema_ui, {'ui': 'redoc'}, name='schema-redoc'),
 ]
 
 
@@ -13,4 +13,6 @@ class WatchlistAdmin(admin.ModelAdmin):
     inlines = [WatchlistTimeAdmin]
 
 
-admin.site.register(Profile)
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_select_related = ("user",)
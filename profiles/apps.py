@@ -3,6 +3,3 @@ from django.apps import AppConfig
 
 class ProfilesConfig(AppConfig):
     name = 'profiles'
-
-    def ready(self):
-        import profiles.signals
@@ -1,6 +1,6 @@
 from django.db import models
 from django.conf import settings
-from movies.models import Movie
+from movies.models import Movie, AtomicSaveMixin
 
 User = settings.AUTH_USER_MODEL
 
@@ -15,7 +15,7 @@ class Profile(models.Model):
         return self.user.username
 
 
-class WatchlistTime(models.Model):
+class WatchlistTime(AtomicSaveMixin, models.Model):
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
     watchlist = models.ForeignKey("Watchlist", on_delete=models.CASCADE)
     timestamp = models.DateTimeField(auto_now_add=True)